@@ -0,0 +1,4 @@
+"""
+KONG 离线性能基准套件
+详见 benchmarks/README.md
+"""
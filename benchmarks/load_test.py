@@ -0,0 +1,340 @@
+"""
+KONG 服务压测工具
+使用 fuzz_test 编排器（delay_ms=0，不消耗 LLM）驱动 /api/v1/infer，
+按可配置的并发上限与到达速率发压，输出延迟分位数、吞吐、错误率与服务端 RSS 曲线。
+用于部署前评估线程池大小与 worker 数量。
+
+用法：
+    # 自动拉起本地 uvicorn（2 个 worker），以 20 req/s 的开环速率压测 30 秒
+    python benchmarks/load_test.py --spawn --workers 2 --rate 20 --duration 30 --concurrency 32
+
+    # 压测已运行的服务（闭环：每个并发槽位请求完成后立即发起下一次）
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --requests 500 --concurrency 16 --server-pid 12345
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+project_root = Path(__file__).parent.parent.absolute()
+
+# send_fn 返回 (是否成功, 状态标签)，状态标签为 HTTP 状态码或异常类型名
+SendFn = Callable[[], Tuple[bool, str]]
+
+
+# ==================== 统计 ====================
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """最近秩法分位数（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    data = sorted(values)
+    if not data:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "mean_ms": 0.0}
+    return {
+        "p50_ms": round(percentile(data, 50) * 1000, 2),
+        "p95_ms": round(percentile(data, 95) * 1000, 2),
+        "p99_ms": round(percentile(data, 99) * 1000, 2),
+        "max_ms": round(data[-1] * 1000, 2),
+        "mean_ms": round(sum(data) / len(data) * 1000, 2),
+    }
+
+
+# ==================== 服务端 RSS 采样 ====================
+
+def _proc_rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _proc_children(pid: int) -> List[int]:
+    """扫描 /proc 获取全部子孙进程（uvicorn --workers 会 fork 子进程）"""
+    parents: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm 字段可能包含空格，从最后一个 ')' 之后解析
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            parents.setdefault(ppid, []).append(int(entry))
+        except (OSError, ValueError, IndexError):
+            continue
+    result, stack = [], [pid]
+    while stack:
+        for child in parents.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def process_tree_rss_kb(pid: int) -> int:
+    """进程树总 RSS (KB)，非 Linux 平台返回 0"""
+    if not os.path.isdir("/proc"):
+        return 0
+    return sum(_proc_rss_kb(p) for p in [pid] + _proc_children(pid))
+
+
+class RssSampler(threading.Thread):
+    """后台按固定间隔采样服务端进程树 RSS"""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict[str, Any]] = []
+        self._halt = threading.Event()
+        self._t0 = time.perf_counter()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.samples.append({
+                "t_s": round(time.perf_counter() - self._t0, 2),
+                "rss_kb": process_tree_rss_kb(self.pid),
+            })
+            self._halt.wait(self.interval)
+
+    def stop(self) -> List[Dict[str, Any]]:
+        self._halt.set()
+        self.join(timeout=self.interval + 1)
+        return self.samples
+
+
+# ==================== 发压 ====================
+
+def make_infer_sender(url: str, node_count: int = 50, max_loops: int = 3, timeout: float = 60.0) -> SendFn:
+    """构造 /api/v1/infer 请求函数（每个线程复用一个 keep-alive Session）"""
+    import requests
+
+    local = threading.local()
+    endpoint = f"{url.rstrip('/')}/api/v1/infer"
+    payload = {
+        "goal": "Load Test Goal",
+        "text": "This is a dummy text for load testing.",
+        "orchestrator": "fuzz_test",
+        "params": {"delay_ms": 0, "node_count": node_count, "max_loops": max_loops},
+    }
+
+    def send() -> Tuple[bool, str]:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        try:
+            resp = session.post(endpoint, json=payload, timeout=timeout)
+            return resp.status_code == 200, str(resp.status_code)
+        except Exception as e:
+            return False, type(e).__name__
+
+    return send
+
+
+def run_load(
+    send: SendFn,
+    concurrency: int = 8,
+    rate: float = 0.0,
+    total_requests: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    执行压测
+
+    Args:
+        send: 单次请求函数
+        concurrency: 最大在途请求数（线程池大小）
+        rate: 开环到达速率 (req/s)；为 0 时按闭环方式尽可能快地发压
+        total_requests / duration: 终止条件，至少指定其一
+
+    开环模式下，延迟从“计划发送时刻”起算，包含客户端排队时间（避免协同遗漏），
+    同时单独报告纯服务耗时 service_latency。
+    """
+    if total_requests is None and duration is None:
+        raise ValueError("total_requests 与 duration 至少指定一个")
+
+    lock = threading.Lock()
+    latencies: List[float] = []
+    service_latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+
+    def task(scheduled: float):
+        nonlocal errors
+        started = time.perf_counter()
+        ok, status = send()
+        done = time.perf_counter()
+        with lock:
+            latencies.append(done - scheduled)
+            service_latencies.append(done - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not ok:
+                errors += 1
+
+    slots = threading.BoundedSemaphore(concurrency)
+
+    def closed_loop_task(scheduled: float):
+        try:
+            task(scheduled)
+        finally:
+            slots.release()
+
+    t0 = time.perf_counter()
+    deadline = t0 + duration if duration is not None else None
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load") as pool:
+        while True:
+            if total_requests is not None and sent >= total_requests:
+                break
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                break
+            if rate > 0:
+                scheduled = t0 + sent / rate
+                if scheduled > now:
+                    time.sleep(scheduled - now)
+                # 开环：按时提交，超出并发上限的请求在线程池队列中排队
+                pool.submit(task, scheduled)
+            else:
+                slots.acquire()
+                pool.submit(closed_loop_task, time.perf_counter())
+            sent += 1
+    elapsed = time.perf_counter() - t0
+
+    completed = len(latencies)
+    return {
+        "requests": completed,
+        "errors": errors,
+        "error_rate": round(errors / completed, 4) if completed else 0.0,
+        "status_codes": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency": summarize_latencies(latencies),
+        "service_latency": summarize_latencies(service_latencies),
+    }
+
+
+# ==================== 本地服务 ====================
+
+def spawn_server(port: int, workers: int = 1, startup_timeout: float = 60.0) -> subprocess.Popen:
+    """以子进程方式启动本地 uvicorn，并等待 /health 就绪"""
+    import requests
+    import socket
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        if sock.connect_ex(("127.0.0.1", port)) == 0:
+            raise RuntimeError(f"端口 {port} 已被占用，请使用 --port 指定其他端口")
+
+    env = os.environ.copy()
+    paths = [project_root / "core", project_root / "server" / "python", project_root / "server" / "python" / "python_service"]
+    env["PYTHONPATH"] = os.pathsep.join([str(p) for p in paths] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+    env.setdefault("OPENROUTER_API_KEY", "sk-load-test")
+
+    cmd = [sys.executable, "-m", "uvicorn", "python_service.main:app",
+           "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=str(project_root / "server" / "python"), env=env)
+
+    health = f"http://127.0.0.1:{port}/api/v1/health"
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn 启动失败 (exit={proc.returncode})")
+        try:
+            if requests.get(health, timeout=1.0).status_code == 200:
+                return proc
+        except Exception:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"uvicorn 在 {startup_timeout}s 内未就绪")
+
+
+def _print_report(report: Dict[str, Any]):
+    lat, svc = report["latency"], report["service_latency"]
+    print("\n📊 压测结果:")
+    print(f"  请求数: {report['requests']}  错误: {report['errors']} ({report['error_rate']:.2%})  状态码: {report['status_codes']}")
+    print(f"  吞吐: {report['throughput_rps']} req/s  耗时: {report['elapsed_s']}s")
+    print(f"  延迟 p50/p95/p99/max: {lat['p50_ms']} / {lat['p95_ms']} / {lat['p99_ms']} / {lat['max_ms']} ms")
+    print(f"  服务耗时 p50/p95/p99: {svc['p50_ms']} / {svc['p95_ms']} / {svc['p99_ms']} ms")
+    rss = report.get("rss")
+    if rss:
+        print(f"  服务端 RSS: 起始 {rss['start_kb'] / 1024:.1f} MB → 峰值 {rss['peak_kb'] / 1024:.1f} MB → 结束 {rss['end_kb'] / 1024:.1f} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="KONG /infer 压测工具 (fuzz_test 编排器)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="服务地址（--spawn 时忽略）")
+    parser.add_argument("--spawn", action="store_true", help="自动拉起本地 uvicorn")
+    parser.add_argument("--port", type=int, default=8765, help="--spawn 时使用的端口")
+    parser.add_argument("--workers", type=int, default=1, help="--spawn 时的 uvicorn worker 数")
+    parser.add_argument("--server-pid", type=int, help="已运行服务的 PID（用于 RSS 采样）")
+    parser.add_argument("--concurrency", type=int, default=8, help="最大在途请求数")
+    parser.add_argument("--rate", type=float, default=0.0, help="开环到达速率 req/s（0 为闭环）")
+    parser.add_argument("--requests", type=int, help="请求总数")
+    parser.add_argument("--duration", type=float, help="压测时长（秒）")
+    parser.add_argument("--node-count", type=int, default=50, help="每次请求 G_B 的节点数")
+    parser.add_argument("--max-loops", type=int, default=3, help="fuzz_test 模拟循环次数")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单请求超时（秒）")
+    parser.add_argument("--rss-interval", type=float, default=1.0, help="RSS 采样间隔（秒）")
+    parser.add_argument("--output", type=Path, help="结果 JSON 路径")
+    args = parser.parse_args(argv)
+
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    proc = None
+    url, pid = args.url, args.server_pid
+    if args.spawn:
+        print(f"🚀 启动本地 uvicorn: port={args.port}, workers={args.workers}")
+        proc = spawn_server(args.port, args.workers)
+        url, pid = f"http://127.0.0.1:{args.port}", proc.pid
+
+    sampler = RssSampler(pid, args.rss_interval) if pid else None
+    try:
+        if sampler:
+            sampler.start()
+        mode = f"open-loop {args.rate} req/s" if args.rate > 0 else "closed-loop"
+        print(f"🔥 压测 {url}: {mode}, concurrency={args.concurrency}, node_count={args.node_count}")
+        send = make_infer_sender(url, node_count=args.node_count, max_loops=args.max_loops, timeout=args.timeout)
+        report = run_load(send, concurrency=args.concurrency, rate=args.rate,
+                          total_requests=args.requests, duration=args.duration)
+    finally:
+        samples = sampler.stop() if sampler else []
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    report["config"] = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+    if samples:
+        values = [s["rss_kb"] for s in samples]
+        report["rss"] = {"start_kb": values[0], "peak_kb": max(values), "end_kb": values[-1], "samples": samples}
+
+    _print_report(report)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 结果已写入: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+KONG 基准测试运行器
+运行 benchmarks/suite.py 中的用例，结果写入 JSON，并可与已保存的基线对比以发现性能回归。
+
+用法：
+    python benchmarks/run_benchmarks.py                        # 1k / 10k / 100k 全量
+    python benchmarks/run_benchmarks.py --sizes 1000 --cases graph.clone serialize.graph_to_dict
+    python benchmarks/run_benchmarks.py --save-baseline        # 将本次结果保存为基线
+    python benchmarks/run_benchmarks.py --compare              # 与基线对比，存在回归时退出码为 1
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent.absolute()))
+
+from benchmarks.suite import CASES, DEFAULT_SIZES, compare, run_suite
+
+BENCH_DIR = Path(__file__).parent.absolute()
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "results" / "baseline.json"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _print_result(name: str, size: int, res: Dict[str, Any]):
+    if res["status"] == "ok":
+        print(f"  ✓ {name:<26} n={size:<7} median={res['median_ms']:>10.2f} ms  min={res['min_ms']:>10.2f} ms")
+    else:
+        print(f"  - {name:<26} n={size:<7} {res['status']}: {res['reason']}")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]):
+    print("\n📊 与基线对比:")
+    if not rows:
+        print("  (无可比较的档位)")
+    for row in rows:
+        mark = {"regression": "❌", "improved": "🚀", "ok": "✓"}[row["status"]]
+        print(f"  {mark} {row['case']:<26} n={row['size']:<7} "
+              f"{row['baseline_ms']:>10.2f} → {row['current_ms']:>10.2f} ms  (x{row['ratio']})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="KONG 离线基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="图规模（节点数）")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="仅运行指定用例")
+    parser.add_argument("--repeat", type=int, default=3, help="每个档位的重复次数")
+    parser.add_argument("--no-limit", action="store_true", help="忽略用例的 max_size 限制")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="结果 JSON 路径")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线 JSON 路径")
+    parser.add_argument("--save-baseline", action="store_true", help="将本次结果保存为基线")
+    parser.add_argument("--compare", action="store_true", help="与基线对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="回归判定阈值（相对基线的增幅）")
+    parser.add_argument("--list", action="store_true", help="列出所有用例")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, case in CASES.items():
+            limit = f" (max_size={case.max_size})" if case.max_size else ""
+            print(f"  {name:<26} {case.description}{limit}")
+        return 0
+
+    print(f"🚀 运行基准测试: sizes={args.sizes}, repeat={args.repeat}")
+    results = run_suite(
+        sizes=args.sizes, cases=args.cases, repeat=args.repeat,
+        no_limit=args.no_limit, on_result=_print_result,
+    )
+    report = {"environment": _environment(), "sizes": args.sizes, "repeat": args.repeat, "results": results}
+
+    exit_code = 0
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"⚠️ 基线不存在: {args.baseline}（先使用 --save-baseline 生成）")
+        else:
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            rows = compare(results, baseline.get("results", {}), tolerance=args.tolerance)
+            report["comparison"] = {
+                "baseline": str(args.baseline),
+                "baseline_commit": baseline.get("environment", {}).get("commit"),
+                "tolerance": args.tolerance,
+                "rows": rows,
+            }
+            _print_comparison(rows)
+            if any(r["status"] == "regression" for r in rows):
+                print("\n❌ 检测到性能回归")
+                exit_code = 1
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\n💾 结果已写入: {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"📌 基线已保存: {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+基准用例定义
+基于确定性的 ExampleGeneratorAppliance 与 FuzzTestOrchestratorAppliance 图生成器，
+覆盖 Graph 基础操作、GraphFusion.fuse、SemanticDeduplicator.deduplicate（桩编码器）、
+判停评估与 graph_to_dict 序列化。
+
+每个用例由 setup(size) 构造输入并返回待计时的无参函数，构造过程不计入耗时。
+"""
+
+import gc
+import random
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 获取项目根目录并注入核心路径
+project_root = Path(__file__).parent.parent.absolute()
+for _p in (project_root / "server" / "python", project_root / "core"):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+import numpy as np
+
+from kgforge.models import Graph
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SEED = 42
+
+
+class BenchmarkCase:
+    """基准用例：max_size 用于跳过超线性用例的超大规模档位（None 表示不限）"""
+
+    def __init__(self, name: str, setup: Callable[[int], Callable[[], Any]], description: str = "", max_size: Optional[int] = None):
+        self.name = name
+        self.setup = setup
+        self.description = description
+        self.max_size = max_size
+
+
+CASES: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark(name: str, description: str = "", max_size: Optional[int] = None):
+    """注册基准用例"""
+    def decorator(setup):
+        CASES[name] = BenchmarkCase(name, setup, description, max_size)
+        return setup
+    return decorator
+
+
+# ==================== 数据生成 ====================
+
+def build_star_graph(size: int) -> Graph:
+    """ExampleGenerator 生成的星形图（size 个叶子 + 1 个根）"""
+    from kgforge.components.extractors.modules.example_generator_appliance import ExampleGeneratorAppliance
+    return ExampleGeneratorAppliance(config={"node_count": size}).extract("benchmark seed text")
+
+
+def build_fuzz_graph(size: int, prefix: str = "B", seed: int = SEED) -> Graph:
+    """FuzzTest 生成器的随机树形图（固定随机种子，保证可复现）"""
+    from kgforge.components.orchestration.modules.fuzz_test_orchestrator_appliance import FuzzTestOrchestratorAppliance
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return FuzzTestOrchestratorAppliance(config={})._create_mock_graph(prefix, size)
+    finally:
+        random.setstate(state)
+
+
+class HashingEncoder:
+    """
+    桩编码器：替代 SentenceTransformer，按标签哈希分桶生成确定性向量。
+    同桶标签向量相同（相似度为 1），用于稳定触发合并路径且不依赖模型下载。
+    """
+
+    def __init__(self, buckets: int, dim: int = 64):
+        self.buckets = max(1, buckets)
+        self.dim = dim
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            bucket = zlib.crc32(str(text).encode("utf-8")) % self.buckets
+            out[i] = np.random.default_rng(bucket).standard_normal(self.dim)
+        return out
+
+
+def _stub_deduplicator(buckets: int):
+    from kgforge.components.processors.utils.semantic_deduplicator import SemanticDeduplicator
+    dedup = SemanticDeduplicator(similarity_threshold=0.99)
+    dedup.model = HashingEncoder(buckets)
+    dedup._initialized = True
+    return dedup
+
+
+# ==================== Graph 基础操作 ====================
+
+@benchmark("graph.build", "ExampleGenerator 构造星形图")
+def _graph_build(size: int):
+    return lambda: build_star_graph(size)
+
+
+@benchmark("graph.clone", "Graph.clone 深拷贝")
+def _graph_clone(size: int):
+    graph = build_fuzz_graph(size)
+    return graph.clone
+
+
+@benchmark("graph.neighbors", "100 次 get_neighbors + get_node_degree")
+def _graph_neighbors(size: int):
+    graph = build_fuzz_graph(size)
+    ids = random.Random(SEED).sample(list(graph.nodes), min(100, len(graph.nodes)))
+
+    def run():
+        for nid in ids:
+            graph.get_neighbors(nid)
+            graph.get_node_degree(nid)
+    return run
+
+
+@benchmark("graph.merge_node", "100 次 merge_node")
+def _graph_merge(size: int):
+    graph = build_fuzz_graph(size)
+    ids = [f"B_NODE_{i}" for i in range(min(200, size))]
+    pairs = list(zip(ids[1::2], ids[0::2]))[:100]
+
+    def run():
+        for source, target in pairs:
+            graph.merge_node(source, target)
+    return run
+
+
+@benchmark("graph.dict_roundtrip", "Graph.to_dict + Graph.from_dict")
+def _graph_roundtrip(size: int):
+    graph = build_fuzz_graph(size)
+    return lambda: Graph.from_dict(graph.to_dict())
+
+
+# ==================== 融合 / 去重 ====================
+
+@benchmark("fusion.fuse", "GraphFusion.fuse（G_B 与 G_T 各 size/2，桩编码器）", max_size=5_000)
+def _fusion_fuse(size: int):
+    from kgforge.components.fusions.utils.graph_fusion import GraphFusion
+    graph_b = build_fuzz_graph(size // 2, "B")
+    graph_t = build_fuzz_graph(size - size // 2, "T", seed=SEED + 1)
+    fusion = GraphFusion(deduplicator=_stub_deduplicator(size))
+    return lambda: fusion.fuse(graph_b, graph_t)
+
+
+@benchmark("dedup.deduplicate", "SemanticDeduplicator.deduplicate（桩编码器）", max_size=5_000)
+def _dedup(size: int):
+    dedup = _stub_deduplicator(size)
+    graph = build_fuzz_graph(size)
+    return lambda: dedup.deduplicate(graph)
+
+
+# ==================== 判停 ====================
+
+@benchmark("halting.rule_based", "RuleBasedHalting.should_halt（节点评估 + 全局判停）", max_size=10_000)
+def _halting(size: int):
+    from kgforge.components.halting.modules.rule_based_halting_appliance import RuleBasedHaltingAppliance
+    halting = RuleBasedHaltingAppliance(config={"max_nodes": size * 10})
+    graph = build_fuzz_graph(size)
+    return lambda: halting.should_halt(graph, goal="benchmark", depth=0, iteration=0)
+
+
+# ==================== 序列化 ====================
+
+@benchmark("serialize.graph_to_dict", "schemas.graph_schema.graph_to_dict（API 输出）")
+def _serialize(size: int):
+    from python_service.schemas.graph_schema import graph_to_dict
+    graph = build_fuzz_graph(size)
+    for node in graph.nodes.values():
+        node.set_metric("ablation_value", 1.0)
+        node.set_state("status", "LOOP")
+    return lambda: graph_to_dict(graph)
+
+
+# ==================== 执行 ====================
+
+def _time_once(fn: Callable[[], Any]) -> float:
+    """单次计时（计时期间关闭 GC，与 timeit 一致）"""
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run_case(case: BenchmarkCase, size: int, repeat: int = 3, no_limit: bool = False) -> Dict[str, Any]:
+    """运行单个用例的单个规模档位，每次重复都重新 setup（用例可能原地修改输入）"""
+    if case.max_size is not None and size > case.max_size and not no_limit:
+        return {"status": "skipped", "reason": f"size > max_size ({case.max_size})"}
+
+    timings = []
+    try:
+        for _ in range(repeat):
+            fn = case.setup(size)
+            timings.append(_time_once(fn))
+    except ImportError as e:
+        return {"status": "skipped", "reason": f"missing dependency: {e}"}
+    except Exception as e:
+        return {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+
+    return {
+        "status": "ok",
+        "repeat": repeat,
+        "min_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "max_ms": round(max(timings) * 1000, 3),
+    }
+
+
+def run_suite(
+    sizes: Optional[List[int]] = None,
+    cases: Optional[List[str]] = None,
+    repeat: int = 3,
+    no_limit: bool = False,
+    on_result: Optional[Callable[[str, int, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    运行基准套件
+    Returns:
+        {case_name: {str(size): 结果}}
+    """
+    sizes = sizes or DEFAULT_SIZES
+    selected = [CASES[name] for name in cases] if cases else list(CASES.values())
+
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for case in selected:
+        results[case.name] = {}
+        for size in sizes:
+            res = run_case(case, size, repeat=repeat, no_limit=no_limit)
+            results[case.name][str(size)] = res
+            if on_result:
+                on_result(case.name, size, res)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    与基线对比（按 median_ms），仅比较两边均为 ok 的档位。
+    ratio > 1 + tolerance 记为 regression，< 1 - tolerance 记为 improved。
+    """
+    rows = []
+    for name, by_size in current.items():
+        for size, res in by_size.items():
+            base = baseline.get(name, {}).get(size)
+            if not base or base.get("status") != "ok" or res.get("status") != "ok":
+                continue
+            base_ms, cur_ms = base["median_ms"], res["median_ms"]
+            ratio = cur_ms / base_ms if base_ms > 0 else float("inf")
+            if ratio > 1 + tolerance:
+                status = "regression"
+            elif ratio < 1 - tolerance:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append({
+                "case": name,
+                "size": int(size),
+                "baseline_ms": base_ms,
+                "current_ms": cur_ms,
+                "ratio": round(ratio, 3),
+                "status": status,
+            })
+    return rows
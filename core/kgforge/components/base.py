@@ -55,6 +55,9 @@ import threading
 
 class BaseOrchestrator(BaseAppliance, IOrchestrator):
     """编排器辅助基类 (Motherboard)"""
+
+    # 运行中读写 kgforge.utils.checkpoint 检查点的编排器置为 True，服务端只为这些编排器开启检查点作用域
+    supports_checkpoints = False
     
     def __init__(self, config: Optional[Dict[str, Any]] = None, **kwargs):
         super().__init__(config)
@@ -5,15 +5,23 @@ GPT 目标分解器 (Core Implementation)
 纯粹的业务逻辑类，不依赖系统协议
 """
 
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
+import hashlib
 import json
 import os
-from openai import OpenAI
+import threading
+from kgforge.utils.lazy_import import lazy_import
 from kgforge.models import Graph, Node, Edge
 from kgforge.utils import get_logger
+from kgforge.utils.llm_limiter import estimate_tokens, get_limiter
+from kgforge.utils.llm_metrics import instrument_openai
 
 logger = get_logger(__name__)
 
+# openai SDK 导入较重，首次创建客户端时才加载
+openai = lazy_import("openai", hint="GPT 展开器")
+
 # 局部默认配置 (Local implementation defaults)
 DEFAULT_GPT_MODEL = "openai/gpt-4"
 DEFAULT_GPT_MAX_NODES = 10
@@ -21,6 +29,32 @@ DEFAULT_GPT_MAX_SUBNODES = 5
 DEFAULT_GPT_TEMPERATURE = 0.7
 DEFAULT_API_BASE_URL = "https://openrouter.ai/api/v1"
 
+# OpenAI 客户端（含 httpx 连接池与 SSL 上下文）构建开销约数十毫秒，按 (api_key, base_url) 进程内复用；
+# 客户端本身线程安全。重试由共享限流器负责（见 kgforge/utils/llm_limiter.py），关闭 SDK 自带的重试；
+# 缓存的是计量包装后的客户端（见 kgforge/utils/llm_metrics.py）。
+# 请求可携带任意 api_key，缓存按 LRU 限制条目数，键为哈希（不在内存中按明文 key 索引）
+CLIENT_CACHE_SIZE = 8
+_CLIENT_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_CLIENT_LOCK = threading.Lock()
+
+
+def _client_key(api_key: str, base_url: str) -> str:
+    return hashlib.sha256(f"{api_key}\0{base_url}".encode("utf-8")).hexdigest()
+
+
+def get_shared_client(api_key: str, base_url: str):
+    """获取（或创建）共享的 OpenAI 客户端；被淘汰的客户端仍可由持有者继续使用"""
+    key = _client_key(api_key, base_url)
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is not None:
+            _CLIENT_CACHE.move_to_end(key)
+            return client
+        client = _CLIENT_CACHE[key] = instrument_openai(openai.OpenAI(api_key=api_key, base_url=base_url, max_retries=0))
+        while len(_CLIENT_CACHE) > CLIENT_CACHE_SIZE:
+            _CLIENT_CACHE.popitem(last=False)
+    return client
+
 class GPTExpander:
     """GPT 目标分解器核心逻辑"""
     
@@ -44,7 +78,9 @@ class GPTExpander:
         if base_url is None:
             base_url = DEFAULT_API_BASE_URL
         
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = get_shared_client(api_key, base_url)
+        # 同一 base_url/model 的所有实验共享 RPM/TPM 额度与并发上限
+        self.limiter = get_limiter(base_url, model)
     
     def expand_goal(self, goal: str, max_nodes: Optional[int] = None) -> Graph:
         """[Text -> Graph] 将文本目标转化为初始图 (G_T)"""
@@ -167,21 +203,25 @@ class GPTExpander:
 
     def _call_llm_and_build_graph(self, prompt: str, context_label: str) -> Graph:
         """调用 LLM 并构建图"""
+        messages = [
+            {
+                "role": "system",
+                "content": "你是一个系统架构师，擅长将复杂需求分解为结构化的系统层级图。"
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个系统架构师，擅长将复杂需求分解为结构化的系统层级图。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=self.temperature,
-                response_format={"type": "json_object"}
+            response = self.limiter.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    response_format={"type": "json_object"}
+                ),
+                estimated_tokens=estimate_tokens(messages, self.limiter.completion_tokens),
             )
         except Exception as e:
             error_msg = (
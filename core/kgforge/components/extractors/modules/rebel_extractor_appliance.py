@@ -9,14 +9,17 @@ import re
 from dataclasses import dataclass
 from typing import List, Optional, Tuple, Any, Dict
 
-import torch
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from kgforge.utils.lazy_import import lazy_import
 
 from kgforge.models import Edge, Graph, Node
 from kgforge.utils import get_logger
 from kgforge.components.base import BaseExtractor
 from kgforge.protocols import IPreloadable, IConfigurable
 
+# 重型依赖延迟导入：组件发现与 CLI 不触发 torch/transformers 加载
+torch = lazy_import("torch", hint="REBEL 抽取器")
+transformers = lazy_import("transformers", hint="REBEL 抽取器")
+
 logger = get_logger(__name__)
 
 # 局部默认配置
@@ -129,10 +132,12 @@ class RebelExtractorAppliance(BaseExtractor, IPreloadable, IConfigurable):
         try:
             logger.info(f"正在加载 REBEL 模型: {self.model_name} (设备: {self.device})...")
             # logger.info("注意：首次运行需要下载模型（约1.5GB），请确保网络连接正常")
-            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            self.tokenizer = transformers.AutoTokenizer.from_pretrained(self.model_name)
+            self.model = transformers.AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
             self.model.to(self.device)
             self.model.eval()
+            # 仅推理：冻结参数，避免 autograd 元数据写入权重所在内存页（prefork 共享权重时保持只读）
+            self.model.requires_grad_(False)
             self._initialized = True
             logger.info("REBEL 模型加载完成")
         except Exception as e:
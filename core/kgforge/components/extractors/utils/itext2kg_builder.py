@@ -60,6 +60,9 @@ def build_itext2kg_extractor(params: Optional[Dict[str, Any]] = None):
     }
     if base_url:
         llm_kwargs["base_url"] = base_url
+    # token/延迟计量（见 kgforge/utils/llm_callbacks.py）
+    from kgforge.utils.llm_callbacks import LLMUsageCallback
+    llm_kwargs["callbacks"] = [LLMUsageCallback(model=chat_model)]
     
     try:
         llm_model = ChatOpenAI(api_key=api_key, **llm_kwargs)
@@ -0,0 +1,88 @@
+from typing import Any, Dict
+from kgforge.components.base import BaseOrchestrator
+from kgforge.components.orchestration.utils.dag_core import DagCore
+
+
+class DagOrchestratorAppliance(BaseOrchestrator):
+    """
+    DAG 编排器 (System Integration Wrapper)
+
+    阶段及其数据依赖由 stages 参数声明（留空为默认流水线），互不依赖的阶段并发执行：
+    G_B(extractor) 与 G_T(expander) 并行 -> G_F(fusion) -> G_P(processor，可选)
+    """
+    name = "dag"
+    display_name = "DAG 并行编排器"
+
+    def __init__(self, config: Dict[str, Any] = None, **kwargs):
+        super().__init__(config or {}, **kwargs)
+        self.stages = kwargs.get("stages") or None
+        self.max_workers = int(kwargs.get("max_workers", 4))
+        self.memoize = bool(kwargs.get("memoize", False))
+        self.output = kwargs.get("output") or None
+        self.core = None
+
+    @classmethod
+    def get_required_slots(cls) -> Dict[str, str]:
+        """声明所需组件的插槽及类型要求"""
+        return {
+            "extractor": "IExtractor",
+            "expander": "IExpander",
+            "fusion": "IFusion",
+            "processor": "IProcessor"
+        }
+
+    @classmethod
+    def get_component_spec(cls) -> Dict[str, Any]:
+        """获取组件规范"""
+        return {
+            "id": "dag",
+            "name": "DAG 并行编排器",
+            "slots": {
+                "extractor": "IExtractor",
+                "expander": "IExpander",
+                "fusion": "IFusion",
+                "processor": "IProcessor"
+            },
+            "description": "按声明的阶段依赖图执行插槽组件，互不依赖的阶段在线程池中并发运行，开启 memoize 后阶段输出按输入内容哈希记忆复用",
+            "params": {
+                "stages": {
+                    "type": "string",
+                    "default": "",
+                    "description": "阶段声明 JSON 列表（name/slot/method/inputs/params/optional/memoize），method 限插槽协议方法，留空为默认流水线"
+                },
+                "output": {
+                    "type": "string",
+                    "default": "",
+                    "description": "作为最终结果的阶段名，留空取拓扑序最后一个阶段"
+                },
+                "max_workers": {
+                    "type": "integer",
+                    "default": 4,
+                    "description": "并发执行阶段的线程数"
+                },
+                "memoize": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "相同组件与输入的阶段直接复用此前输出（LLM 扩展器输出不确定，默认关闭）"
+                }
+            }
+        }
+
+    def run(self, goal: str, text: str, verbose: bool = True, **kwargs) -> Any:
+        """
+        运行编排流程
+
+        Args:
+            goal: 目标/Query
+            text: 输入文本
+        """
+        # 懒初始化：阶段声明在首次运行时校验，组件已由工厂注入
+        if not self.core:
+            self.core = DagCore(
+                components=self.components,
+                stages=self.stages,
+                max_workers=self.max_workers,
+                memoize=self.memoize,
+                output=self.output,
+            )
+        return self.core.run(goal=goal, text=text, check_cancellation=self.check_cancellation)
@@ -8,6 +8,7 @@ class DynamicHaltingOrchestratorAppliance(BaseOrchestrator):
     """
     name = "dynamic_halting"
     display_name = "动态判停闭环编排器"
+    supports_checkpoints = True
 
     def __init__(self, config: Dict[str, Any] = None, **kwargs):
         mapped_config = (config or {}).copy()
@@ -55,6 +56,11 @@ class DynamicHaltingOrchestratorAppliance(BaseOrchestrator):
                     "type": "integer",
                     "default": 10,
                     "description": "最大迭代次数"
+                },
+                "speculative": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "推测展开：判停评估的同时提前发起下一轮展开，判停则丢弃（多数轮次继续时可隐藏判停耗时）"
                 }
             }
         }
@@ -30,6 +30,7 @@ class FuzzTestOrchestratorAppliance(BaseOrchestrator):
         self.delay_ms = int(kwargs.get("delay_ms", 1000))
         self.max_nodes = int(kwargs.get("max_nodes", 20))
         self.max_loops = int(kwargs.get("max_loops", 5))
+        self.node_count = int(kwargs.get("node_count", 5))
     
     @classmethod
     def get_required_slots(cls) -> Dict[str, str]:
@@ -52,6 +53,11 @@ class FuzzTestOrchestratorAppliance(BaseOrchestrator):
                     "type": "integer",
                     "default": 5,
                     "description": "模拟循环次数"
+                },
+                "node_count": {
+                    "type": "integer",
+                    "default": 5,
+                    "description": "G_B 模拟节点数（压测时用于放大图规模）"
                 }
             }
         }
@@ -94,7 +100,7 @@ class FuzzTestOrchestratorAppliance(BaseOrchestrator):
             # 1. Mock G_B (Bottom-Up)
             logger.info("Step 1: 模拟 Bottom-Up 抽取 (G_B)...")
             self._sleep(self.delay_ms)
-            graph_b = self._create_mock_graph("B", 5)
+            graph_b = self._create_mock_graph("B", self.node_count)
             result.log_graph("G_B", graph_b)
             logger.telemetry({"intermediate_stats": {"G_B": {"node_count": len(graph_b.nodes), "edge_count": len(graph_b.edges), "source": "mock_extractor"}}})
             
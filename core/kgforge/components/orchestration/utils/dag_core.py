@@ -0,0 +1,303 @@
+"""
+DAG 编排核心 (DAG Core)
+按声明的阶段依赖图执行组件调用：输入就绪的阶段并发提交到线程池，阶段输出按 (组件, 方法, 输入内容哈希) 记忆。
+
+阶段声明（列表，或等价的 JSON 字符串）：
+    {"name": "G_B", "slot": "extractor", "method": "extract", "inputs": ["text"]}
+    {"name": "G_F", "slot": "fusion", "method": "fuse", "inputs": ["G_B", "G_T"], "params": {...}}
+
+- inputs 按位置传给组件方法；可引用内置源 goal / text 或其他阶段名
+- method 只能是插槽接口的协议方法（见 SLOT_METHODS），不允许调用组件的任意属性
+- optional 阶段在插槽未配置时跳过，输出直接沿用第一个输入
+- 记忆默认关闭：扩展器等 LLM 组件输出不确定，复用旧输出会掩盖重复运行的差异
+- 被多个下游阶段消费的图会为每个消费者克隆一份，并发阶段之间不共享可变对象
+- 使用线程池而非进程池：组件持有已加载的模型与客户端连接，无法廉价地跨进程传递；
+  耗时的模型推理与 HTTP 调用会释放 GIL
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from kgforge.models.experiment_result import ExperimentResult
+from kgforge.models.graph import Graph
+from kgforge.utils import get_logger
+from kgforge.utils.profiling import profile_session, profile_span
+
+logger = get_logger(__name__)
+
+SOURCES = ("goal", "text")
+DEFAULT_STAGES = [
+    {"name": "G_B", "slot": "extractor", "method": "extract", "inputs": ["text"]},
+    {"name": "G_T", "slot": "expander", "method": "expand_goal", "inputs": ["goal"]},
+    {"name": "G_F", "slot": "fusion", "method": "fuse", "inputs": ["G_B", "G_T"]},
+    {"name": "G_P", "slot": "processor", "method": "process", "inputs": ["G_F"], "optional": True},
+]
+# 插槽 -> 允许调用的协议方法（IExtractor / IExpander / IFusion / IProcessor）
+SLOT_METHODS = {
+    "extractor": ("extract",),
+    "expander": ("expand_goal", "expand_graph"),
+    "fusion": ("fuse",),
+    "processor": ("process",),
+}
+# 阶段输出记忆的条目上限（进程级，跨运行共享）
+STAGE_MEMO_SIZE = 128
+CANCEL_POLL_SECONDS = 0.5
+
+
+@dataclass
+class StageSpec:
+    name: str
+    slot: str
+    method: str
+    inputs: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    optional: bool = False
+    # None 跟随编排器的 memoize 开关；True/False 为阶段级覆盖
+    memoize: Optional[bool] = None
+
+
+def _build_spec(raw: Any) -> StageSpec:
+    """校验单个阶段声明的字段与插槽方法"""
+    if not isinstance(raw, dict):
+        raise ValueError(f"阶段声明必须是对象: {raw!r}")
+    allowed = {f.name for f in fields(StageSpec)}
+    unknown = set(raw) - allowed
+    if unknown:
+        raise ValueError(f"阶段声明包含未知字段: {', '.join(sorted(unknown))}")
+    missing = {"name", "slot", "method"} - set(raw)
+    if missing:
+        raise ValueError(f"阶段声明缺少字段: {', '.join(sorted(missing))}")
+    spec = StageSpec(**raw)
+    methods = SLOT_METHODS.get(spec.slot)
+    if methods is None:
+        raise ValueError(f"阶段 {spec.name} 的插槽未知: {spec.slot}")
+    if spec.method not in methods:
+        raise ValueError(f"阶段 {spec.name} 的方法不属于插槽 {spec.slot} 的协议: {spec.method}")
+    return spec
+
+
+def parse_stages(stages: Any) -> List[StageSpec]:
+    """解析阶段声明并按拓扑序返回；非法字段/方法、重名、未知输入、环均抛 ValueError"""
+    if not stages:
+        stages = DEFAULT_STAGES
+    if isinstance(stages, str):
+        stages = json.loads(stages)
+    if not isinstance(stages, list):
+        raise ValueError("阶段声明必须是列表")
+    specs = [_build_spec(s) for s in stages]
+
+    by_name: Dict[str, StageSpec] = {}
+    for spec in specs:
+        if spec.name in by_name or spec.name in SOURCES:
+            raise ValueError(f"阶段名重复或与内置源冲突: {spec.name}")
+        by_name[spec.name] = spec
+    for spec in specs:
+        for name in spec.inputs:
+            if name not in by_name and name not in SOURCES:
+                raise ValueError(f"阶段 {spec.name} 的输入未声明: {name}")
+
+    ordered: List[StageSpec] = []
+    done = set(SOURCES)
+    pending = list(specs)
+    while pending:
+        ready = [s for s in pending if all(name in done for name in s.inputs)]
+        if not ready:
+            raise ValueError(f"阶段依赖存在环: {', '.join(s.name for s in pending)}")
+        for spec in ready:
+            ordered.append(spec)
+            done.add(spec.name)
+            pending.remove(spec)
+    return ordered
+
+
+def content_hash(value: Any) -> str:
+    """阶段输入的内容哈希；图忽略随机生成的 graph_id"""
+    if isinstance(value, Graph):
+        payload = value.to_dict()
+        payload.pop("graph_id", None)
+    else:
+        payload = value
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def component_key(component: Any) -> str:
+    """组件身份：类路径 + 配置（同配置的池化实例共享记忆）"""
+    cls = type(component)
+    config = getattr(component, "config", None) or {}
+    return f"{cls.__module__}.{cls.__qualname__}:{content_hash(config)}"
+
+
+def _clone(value: Any) -> Any:
+    return value.clone() if hasattr(value, "clone") else value
+
+
+class StageMemo:
+    """阶段输出的 LRU 记忆；写入与命中都返回克隆，调用方可原地修改"""
+
+    def __init__(self, max_entries: int = STAGE_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            value = self._data[key]
+        return True, _clone(value)
+
+    def put(self, key: Hashable, value: Any):
+        value = _clone(value)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# 单例
+stage_memo = StageMemo()
+
+
+class DagCore:
+    """
+    DAG 编排核心
+    components: 插槽名 -> 组件实例
+    """
+
+    def __init__(
+        self,
+        components: Dict[str, Any],
+        stages: Any = None,
+        max_workers: int = 4,
+        memoize: bool = False,
+        output: Optional[str] = None,
+        memo: Optional[StageMemo] = None,
+    ):
+        self.components = components
+        self.stages = parse_stages(stages)
+        self.max_workers = max(1, int(max_workers))
+        self.memoize = memoize
+        self.memo = memo or stage_memo
+        self.output = output or self.stages[-1].name
+        if self.output not in {s.name for s in self.stages}:
+            raise ValueError(f"输出阶段未声明: {self.output}")
+        for spec in self.stages:
+            if not spec.optional and spec.slot not in components:
+                raise ValueError(f"阶段 {spec.name} 所需插槽未配置: {spec.slot}")
+        # 每个阶段输出的消费者数（>1 时按消费者克隆）
+        self._consumers: Dict[str, int] = {}
+        for spec in self.stages:
+            for name in spec.inputs:
+                self._consumers[name] = self._consumers.get(name, 0) + 1
+
+    def run(self, goal: str, text: str, check_cancellation: Optional[Callable[[], None]] = None, **kwargs) -> ExperimentResult:
+        """执行整张阶段图，并将阶段剖析树写入 metadata.profile"""
+        with profile_session("dag") as prof:
+            result = self._run(goal, text, check_cancellation)
+        result.log_profile(prof)
+        return result
+
+    def _run(self, goal: str, text: str, check_cancellation: Optional[Callable[[], None]]) -> ExperimentResult:
+        result = ExperimentResult(graph=Graph(graph_id="dag_result"))
+        result.set_metadata("goal", goal)
+        result.set_metadata("engine", "DagOrchestrator")
+        result.set_metadata("configs", {
+            "stages": [s.name for s in self.stages],
+            "max_workers": self.max_workers,
+            "memoize": self.memoize,
+        })
+
+        outputs: Dict[str, Any] = {"goal": goal, "text": text}
+        pending = list(self.stages)
+        t0 = time.perf_counter()
+        busy_ms = 0.0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag-stage") as pool:
+            running: Dict[Any, StageSpec] = {}
+            try:
+                while pending or running:
+                    if check_cancellation:
+                        check_cancellation()
+                    for spec in [s for s in pending if all(name in outputs for name in s.inputs)]:
+                        pending.remove(spec)
+                        args = [self._take(outputs, name) for name in spec.inputs]
+                        # 工作线程继承上下文：实验 ID、日志缓冲、剖析会话
+                        future = pool.submit(copy_context().run, self._run_stage, spec, args)
+                        running[future] = spec
+
+                    # 带超时等待，运行期间也能及时响应取消
+                    done, _ = wait(running, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        spec = running.pop(future)
+                        value, start, duration, cached = future.result()
+                        outputs[spec.name] = value
+                        busy_ms += duration
+                        self._record(result, spec, value, (start - t0) * 1000, duration, cached)
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        final = outputs[self.output]
+        if isinstance(final, Graph):
+            result.graph = final
+        wall_ms = (time.perf_counter() - t0) * 1000
+        result.record_metric("dag_wall_ms", round(wall_ms, 2))
+        result.record_metric("dag_stage_ms_total", round(busy_ms, 2))
+        result.finish(final_decision="COMPLETED", success=True)
+        return result
+
+    def _take(self, outputs: Dict[str, Any], name: str) -> Any:
+        value = outputs[name]
+        return _clone(value) if self._consumers.get(name, 0) > 1 else value
+
+    def _run_stage(self, spec: StageSpec, args: List[Any]) -> Tuple[Any, float, float, bool]:
+        """在工作线程中执行单个阶段：返回 (输出, 开始时刻, 耗时 ms, 是否命中记忆)"""
+        start = time.perf_counter()
+        component = self.components.get(spec.slot)
+        if component is None:
+            # 可选阶段未配置插槽：直通第一个输入
+            return (args[0] if args else None), start, 0.0, False
+
+        key = None
+        if self.memoize if spec.memoize is None else spec.memoize:
+            key = (component_key(component), spec.method, content_hash(spec.params),
+                   tuple(content_hash(a) for a in args))
+            hit, value = self.memo.get(key)
+            if hit:
+                return value, start, (time.perf_counter() - start) * 1000, True
+
+        with profile_span(spec.name):
+            value = getattr(component, spec.method)(*args, **spec.params)
+        if key is not None:
+            self.memo.put(key, value)
+        return value, start, (time.perf_counter() - start) * 1000, False
+
+    @staticmethod
+    def _record(result: ExperimentResult, spec: StageSpec, value: Any, start_ms: float, duration_ms: float, cached: bool):
+        result.log_stage_timing(spec.name, start_ms=start_ms, duration_ms=duration_ms, cached=cached)
+        details: Dict[str, Any] = {"stage": spec.name, "slot": spec.slot, "cached": cached}
+        if isinstance(value, Graph):
+            result.log_graph(spec.name, value)
+            details.update(node_count=len(value.nodes), edge_count=len(value.edges))
+            logger.telemetry({"intermediate_stats": {spec.name: {
+                "node_count": len(value.nodes), "edge_count": len(value.edges), "source": spec.slot}}})
+        result.log_step("dag_stage", details)
@@ -3,14 +3,24 @@
 纯粹的算法流程实现，不依赖系统协议
 """
 
+import hashlib
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextvars import copy_context
 from typing import Optional, Dict, Any, List, Callable
 from kgforge.protocols import IExtractor, IExpander, IFusion, IHalting
 from kgforge.models.graph import Graph
 from kgforge.models.experiment_result import ExperimentResult
 from kgforge.utils import get_logger
+from kgforge.utils.profiling import profile_session, profile_span
+from kgforge.utils.checkpoint import CheckpointHandle, current_checkpoint, decode_graph, encode_graph
 
 logger = get_logger(__name__)
 
+# 等待推测展开结果时检查取消信号的间隔（秒）
+SPECULATIVE_POLL_SECONDS = 0.5
+
 class DynamicHaltingCore:
     """
     动态判停算法核心逻辑
@@ -25,6 +35,7 @@ class DynamicHaltingCore:
         halting: IHalting,
         max_iterations: int = 5,
         max_depth: int = 3,
+        speculative: bool = False,
         **kwargs
     ):
         self.extractor = extractor
@@ -33,10 +44,21 @@ class DynamicHaltingCore:
         self.halting = halting
         self.max_iterations = max_iterations
         self.max_depth = max_depth
+        # 推测展开：判停评估的同时提前对当前图发起展开，判停为继续时直接使用其结果
+        self.speculative = bool(speculative)
         self.kwargs = kwargs
 
     def run(self, goal: str, text: str, verbose: bool = True, check_cancellation: Optional[Callable[[], None]] = None, **kwargs) -> ExperimentResult:
-        """运行动态判停算法全链路"""
+        """运行动态判停算法全链路，并将阶段剖析树写入 metadata.profile"""
+        with profile_session("dynamic_halting") as prof:
+            result = self._run(goal, text, verbose=verbose, check_cancellation=check_cancellation, **kwargs)
+        result.log_profile(prof)
+        return result
+
+    def _run(self, goal: str, text: str, verbose: bool = True, check_cancellation: Optional[Callable[[], None]] = None, **kwargs) -> ExperimentResult:
+        # 级别未开启时 verbose 分支整体短路，避免在循环中构造日志字符串
+        warn = verbose and logger.isEnabledFor(logging.WARNING)
+        verbose = verbose and logger.isEnabledFor(logging.INFO)
         if verbose:
             logger.info(f"--- [Orchestrator: DynamicHalting] 开始任务 ---")
             logger.info(f"目标: {goal}")
@@ -55,35 +77,49 @@ class DynamicHaltingCore:
         
         current_graph = None
         final_decision_val = "CONTINUE"
+        iterations = 0
+        depth = 0
+        checkpoint = current_checkpoint()
+        # 已写入检查点增量日志的阶段图名与追踪步数，每轮只追加新增部分
+        saved = {"graphs": set(), "trace": 0}
+        speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-expand") if self.speculative else None
         
         try:
-            # 2. Bottom-Up 抽取 (G_B)
-            if verbose: logger.info("步骤 1: 执行 Bottom-Up 抽取 (G_B)...")
-            graph_b = self.extractor.extract(text)
-            result.log_graph("G_B", graph_b)
-            result.log_step("bottom_up_extraction", {"node_count": len(graph_b.nodes)})
-            # Telemetry Broadcast
-            logger.telemetry({"intermediate_stats": {"G_B": {"node_count": len(graph_b.nodes), "edge_count": len(graph_b.edges), "depth": 0, "source": "extractor"}}})
+            restored = self._restore_checkpoint(checkpoint, result, goal, text, saved)
+            if restored is not None:
+                current_graph, iterations, depth, final_decision_val = restored
+                if verbose: logger.info(f"从检查点恢复: 已完成 {iterations} 轮迭代 (深度 {depth})")
+            else:
+                # 2. Bottom-Up 抽取 (G_B)
+                if verbose: logger.info("步骤 1: 执行 Bottom-Up 抽取 (G_B)...")
+                with profile_span("extract"):
+                    graph_b = self.extractor.extract(text)
+                result.log_graph("G_B", graph_b)
+                result.log_step("bottom_up_extraction", {"node_count": len(graph_b.nodes)})
+                # Telemetry Broadcast
+                logger.telemetry({"intermediate_stats": {"G_B": {"node_count": len(graph_b.nodes), "edge_count": len(graph_b.edges), "depth": 0, "source": "extractor"}}})
             
-            # 3. Top-Down 展开 (G_T)
-            if verbose: logger.info("步骤 2: 执行 Top-Down 展开 (G_T)...")
-            graph_t = self.expander.expand_goal(goal)
-            result.log_graph("G_T", graph_t)
-            result.log_step("top_down_expansion", {"node_count": len(graph_t.nodes)})
-            # Telemetry Broadcast
-            logger.telemetry({"intermediate_stats": {"G_T": {"node_count": len(graph_t.nodes), "edge_count": len(graph_t.edges), "depth": 0, "source": "expander"}}})
-            
-            # 4. 融合 (G_F)
-            if verbose: logger.info("步骤 3: 语义图融合 (G_F)...")
-            current_graph = self.fusion.fuse(graph_b, graph_t)
-            result.log_graph("G_F", current_graph)
-            result.log_step("initial_fusion", {"node_count": len(current_graph.nodes)})
-            # Telemetry Broadcast
-            logger.telemetry({"intermediate_stats": {"G_F": {"node_count": len(current_graph.nodes), "edge_count": len(current_graph.edges), "depth": 0, "source": "fusion"}}})
+                # 3. Top-Down 展开 (G_T)
+                if verbose: logger.info("步骤 2: 执行 Top-Down 展开 (G_T)...")
+                with profile_span("expand_goal"):
+                    graph_t = self.expander.expand_goal(goal)
+                result.log_graph("G_T", graph_t)
+                result.log_step("top_down_expansion", {"node_count": len(graph_t.nodes)})
+                # Telemetry Broadcast
+                logger.telemetry({"intermediate_stats": {"G_T": {"node_count": len(graph_t.nodes), "edge_count": len(graph_t.edges), "depth": 0, "source": "expander"}}})
             
+                # 4. 融合 (G_F)
+                if verbose: logger.info("步骤 3: 语义图融合 (G_F)...")
+                with profile_span("fuse"):
+                    current_graph = self.fusion.fuse(graph_b, graph_t)
+                result.log_graph("G_F", current_graph)
+                result.log_step("initial_fusion", {"node_count": len(current_graph.nodes)})
+                # Telemetry Broadcast
+                logger.telemetry({"intermediate_stats": {"G_F": {"node_count": len(current_graph.nodes), "edge_count": len(current_graph.edges), "depth": 0, "source": "fusion"}}})
+                # 初始三步通常是整个运行中最贵的部分，先落一次检查点
+                self._save_checkpoint(checkpoint, saved, result, goal, text, current_graph, 0, 0, final_decision_val)
+
             # 5. 迭代闭环自适应展开
-            iterations = 0
-            depth = 0
             
             while iterations < self.max_iterations and depth < self.max_depth:
                 if check_cancellation:
@@ -92,8 +128,12 @@ class DynamicHaltingCore:
                 iterations += 1
                 if verbose: logger.info(f"迭代 {iterations}: 评估图状态及判停准则...")
                 
+                # 5.0 推测展开：与判停评估并行，基于评估前的快照
+                speculation = self._start_speculation(speculator, current_graph) if speculator else None
+                
                 # 5.1 评估
-                decision = self.halting.should_halt(current_graph, goal=goal, iteration=iterations, depth=depth)
+                with profile_span("halting"):
+                    decision = self.halting.should_halt(current_graph, goal=goal, iteration=iterations, depth=depth)
                 final_decision_val = decision.decision.value
                 
                 result.log_step("halting_evaluation", {
@@ -107,12 +147,17 @@ class DynamicHaltingCore:
                 
                 # 5.2 退出判断
                 if final_decision_val in ["HALT", "DROP", "HITL"]:
+                    if speculation:
+                        self._record_speculation(result, iterations, "discarded")
                     break
                 
                 # 5.3 执行展开 LOOP
                 if verbose: logger.info("  [Expander] 调用 LLM 进行智能全图上下文扩展...")
                 
-                increment_graph = self.expander.expand_graph(current_graph)
+                increment_graph = self._take_speculation(result, speculation, current_graph, iterations, check_cancellation) if speculation else None
+                if increment_graph is None:
+                    with profile_span("expand_graph"):
+                        increment_graph = self.expander.expand_graph(current_graph)
                 
                 # 清理增量图中的悬空边（在记录快照前）
                 # 这些边可能引用了在语义去重中被删除的节点
@@ -127,7 +172,7 @@ class DynamicHaltingCore:
                     if (source_in_increment or source_in_current) and (target_in_increment or target_in_current):
                         valid_edges.append(edge)
                     else:
-                        if verbose:
+                        if warn:
                             logger.warning(f"  [Expander] 增量图包含悬空边: {edge.source}->{edge.target}, 已过滤")
                 
                 increment_graph.edges = valid_edges
@@ -138,35 +183,36 @@ class DynamicHaltingCore:
                 # 合并逻辑
                 parent_id = increment_graph.metadata.get("parent_node_id")
                 
-                # 将增量合入主图（节点优先）
-                for node in increment_graph.nodes.values():
-                    if node.id not in current_graph.nodes:
-                        current_graph.add_node(node)
+                with profile_span("merge"):
+                    # 将增量合入主图（节点优先）
+                    for node in increment_graph.nodes.values():
+                        if node.id not in current_graph.nodes:
+                            current_graph.add_node(node)
                 
-                # 合并边（确保 source 和 target 都存在）
-                skipped_edges = 0
-                for edge in increment_graph.edges:
-                    # 检查边的两端节点是否都存在
-                    source_exists = edge.source in current_graph.nodes
-                    target_exists = edge.target in current_graph.nodes
+                    # 合并边（确保 source 和 target 都存在）
+                    skipped_edges = 0
+                    for edge in increment_graph.edges:
+                        # 检查边的两端节点是否都存在
+                        source_exists = edge.source in current_graph.nodes
+                        target_exists = edge.target in current_graph.nodes
                     
-                    if source_exists and target_exists:
-                        try:
-                            current_graph.add_edge(edge)
-                        except Exception as e:
-                            if verbose:
-                                logger.warning(f"  [Merge] 跳过重复边: {edge.source}->{edge.target} ({e})")
+                        if source_exists and target_exists:
+                            try:
+                                current_graph.add_edge(edge)
+                            except Exception as e:
+                                if warn:
+                                    logger.warning(f"  [Merge] 跳过重复边: {edge.source}->{edge.target} ({e})")
+                                skipped_edges += 1
+                        else:
+                            if warn:
+                                missing = []
+                                if not source_exists: missing.append(f"source={edge.source}")
+                                if not target_exists: missing.append(f"target={edge.target}")
+                                logger.warning(f"  [Merge] 跳过悬空边: {edge.source}->{edge.target} (缺失: {', '.join(missing)})")
                             skipped_edges += 1
-                    else:
-                        if verbose:
-                            missing = []
-                            if not source_exists: missing.append(f"source={edge.source}")
-                            if not target_exists: missing.append(f"target={edge.target}")
-                            logger.warning(f"  [Merge] 跳过悬空边: {edge.source}->{edge.target} (缺失: {', '.join(missing)})")
-                        skipped_edges += 1
                 
-                if verbose and skipped_edges > 0:
-                    logger.info(f"  [Merge] 共跳过 {skipped_edges} 条无效边")
+                    if verbose and skipped_edges > 0:
+                        logger.info(f"  [Merge] 共跳过 {skipped_edges} 条无效边")
                 
                 # 更新父节点状态
                 if parent_id and parent_id in current_graph.nodes:
@@ -178,18 +224,22 @@ class DynamicHaltingCore:
                 result.log_step("graph_increment_merged", {
                     "iteration": iterations,
                     "new_nodes": len(increment_graph.nodes),
-                    "parent_node": parent_id
+                    "parent_node": parent_id,
+                    "speculative": bool(increment_graph.metadata.get("speculative"))
                 })
                 # Telemetry Broadcast (Loop Update)
                 logger.telemetry({"intermediate_stats": {f"LOOP_{iterations}": {"node_count": len(current_graph.nodes), "edge_count": len(current_graph.edges), "depth": depth, "source": "loop_merge"}}})
                 
                 depth += 1
+                self._save_checkpoint(checkpoint, saved, result, goal, text, current_graph, iterations, depth, final_decision_val)
             
             # 6. 收尾与保存
             result.graph = current_graph
             result.record_metric("total_iterations", iterations)
             result.record_metric("final_node_count", len(current_graph.nodes))
             result.finish(final_decision=final_decision_val, success=True)
+            if checkpoint:
+                checkpoint.complete()
 
         except Exception as e:
             logger.error(f"编排器运行异常: {e}")
@@ -197,8 +247,141 @@ class DynamicHaltingCore:
             traceback.print_exc()
             result.record_metric("error", str(e))
             result.finish(final_decision="ERROR", success=False)
+        finally:
+            # 展开器实例可能来自请求级实例池，返回前必须等进行中的推测展开结束，避免归还后仍被后台线程使用
+            if speculator:
+                speculator.shutdown(wait=True, cancel_futures=True)
 
         if verbose:
             logger.info(f"--- [Orchestrator] 运行结束. 最终状态: {final_decision_val} ---")
             
         return result
+
+    # --- 推测展开 ---
+
+    def _speculative_expand(self, snapshot: Graph):
+        start = time.perf_counter()
+        with profile_span("expand_graph"):
+            graph = self.expander.expand_graph(snapshot)
+        return graph, (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _structure_fingerprint(graph: Graph) -> str:
+        """图结构指纹（节点与边）；判停写入的评分/状态不计入"""
+        nodes = sorted(graph.nodes)
+        edges = sorted((e.source, e.target, str(e.attr("relation"))) for e in graph.edges)
+        return hashlib.sha1(repr((nodes, edges)).encode("utf-8")).hexdigest()
+
+    def _start_speculation(self, speculator: ThreadPoolExecutor, current_graph: Graph) -> Dict[str, Any]:
+        """
+        克隆当前图并提交展开。快照中的节点评分来自上一轮判停（新节点尚无评分），
+        展开器据此挑选的父节点即“最可能”的候选；判停改动了图结构时作废。
+        """
+        snapshot = current_graph.clone()
+        return {
+            "future": speculator.submit(copy_context().run, self._speculative_expand, snapshot),
+            "fingerprint": self._structure_fingerprint(snapshot),
+        }
+
+    def _take_speculation(self, result: ExperimentResult, speculation: Dict[str, Any], current_graph: Graph,
+                          iterations: int, check_cancellation: Optional[Callable[[], None]]) -> Optional[Graph]:
+        """判停为继续：取推测结果；图结构在评估期间被修改时作废，返回 None 由调用方重新展开"""
+        future: Future = speculation["future"]
+        if self._structure_fingerprint(current_graph) != speculation["fingerprint"]:
+            self._record_speculation(result, iterations, "stale")
+            # 重新展开与推测展开不能在同一展开器实例上并发
+            if not future.cancel():
+                self._wait_speculation(future, check_cancellation)
+            return None
+        wait_start = time.perf_counter()
+        graph, expand_ms = self._wait_speculation(future, check_cancellation).result()
+        wait_ms = (time.perf_counter() - wait_start) * 1000
+        graph.metadata["speculative"] = True
+        self._record_speculation(result, iterations, "used", hidden_ms=round(max(expand_ms - wait_ms, 0.0), 2))
+        return graph
+
+    @staticmethod
+    def _wait_speculation(future: Future, check_cancellation: Optional[Callable[[], None]]) -> Future:
+        """等待推测展开结束（期间响应取消）；展开本身的异常留在 future 中"""
+        while True:
+            try:
+                future.exception(timeout=SPECULATIVE_POLL_SECONDS)
+                return future
+            except FutureTimeout:
+                if check_cancellation:
+                    check_cancellation()
+
+    @staticmethod
+    def _record_speculation(result: ExperimentResult, iterations: int, outcome: str, hidden_ms: float = 0.0):
+        """记录推测展开的去向（used / discarded / stale）与被隐藏的展开耗时"""
+        metrics = result.get_metrics()
+        counts = metrics.setdefault("speculative", {"used": 0, "discarded": 0, "stale": 0, "hidden_ms": 0.0})
+        counts[outcome] += 1
+        counts["hidden_ms"] = round(counts["hidden_ms"] + hidden_ms, 2)
+        result.log_step("speculative_expansion", {"iteration": iterations, "outcome": outcome, "hidden_ms": hidden_ms})
+
+    # --- 检查点 ---
+
+    @staticmethod
+    def _text_digest(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _save_checkpoint(self, checkpoint: Optional[CheckpointHandle], saved: Dict[str, Any], result: ExperimentResult,
+                         goal: str, text: str, current_graph: Graph, iterations: int, depth: int, final_decision: str):
+        """
+        写入一轮迭代后的可恢复状态；失败只记日志，不影响运行
+        状态文件只含主图与计数；已登记的阶段图与追踪步骤登记后不再变化，作为增量追加
+        """
+        if checkpoint is None:
+            return
+        # 阶段图中与主图是同一对象的（G_F）只记引用，恢复后保持同一对象
+        deltas = [{"graph": name, "data": "@current" if g is current_graph else encode_graph(g)}
+                  for name, g in result.get_graphs().items() if name not in saved["graphs"]]
+        trace = result.get_trace()
+        deltas.extend({"step": step} for step in trace[saved["trace"]:])
+        history = getattr(self.halting, "decision_history", None)
+        try:
+            checkpoint.save({
+                "engine": "dynamic_halting",
+                "goal": goal,
+                "text_sha1": self._text_digest(text),
+                "iteration": iterations,
+                "depth": depth,
+                "final_decision": final_decision,
+                "current_graph": encode_graph(current_graph),
+                "halting": {"decision_history": history if isinstance(history, list) else None},
+            }, deltas=deltas)
+        except Exception as e:
+            logger.warning(f"检查点写入失败（继续运行）: {e}")
+            return
+        saved["graphs"].update(d["graph"] for d in deltas if "graph" in d)
+        saved["trace"] = len(trace)
+
+    def _restore_checkpoint(self, checkpoint: Optional[CheckpointHandle], result: ExperimentResult, goal: str, text: str,
+                            saved: Dict[str, Any]):
+        """读取检查点并恢复结果容器；返回 (current_graph, iterations, depth, final_decision)，无可用检查点时返回 None"""
+        state = checkpoint.load() if checkpoint else None
+        if state is None:
+            return None
+        if state.get("engine") != "dynamic_halting" or state.get("goal") != goal or state.get("text_sha1") != self._text_digest(text):
+            logger.warning(f"检查点 {checkpoint.run_id} 与本次输入不一致，从头运行")
+            return None
+
+        current_graph = decode_graph(state["current_graph"])
+        # 按增量记录重新登记阶段图（流式监听器也会再次收到这些阶段）与追踪轨迹
+        trace = []
+        for record in state.get("deltas", []):
+            if "graph" in record:
+                data = record["data"]
+                result.log_graph(record["graph"], current_graph if data == "@current" else decode_graph(data))
+                saved["graphs"].add(record["graph"])
+            elif "step" in record:
+                trace.append(record["step"])
+        result.restore_trace(trace)
+        saved["trace"] = len(trace)
+        history = (state.get("halting") or {}).get("decision_history")
+        if history is not None and isinstance(getattr(self.halting, "decision_history", None), list):
+            self.halting.decision_history = list(history)
+        result.log_step("resumed_from_checkpoint", {"iteration": state["iteration"], "depth": state["depth"]})
+        result.set_metadata("resumed_from", {"iteration": state["iteration"], "saved_at": state.get("saved_at")})
+        return current_graph, state["iteration"], state["depth"], state.get("final_decision", "CONTINUE")
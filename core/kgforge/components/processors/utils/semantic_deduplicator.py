@@ -5,12 +5,17 @@
 纯粹的业务逻辑类，不依赖系统协议
 """
 
+from __future__ import annotations
+
 from typing import List, Dict, Tuple, Set, Any
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from kgforge.models import Graph, Node
 from kgforge.utils import get_logger
+from kgforge.utils.lazy_import import lazy_import
+
+# 重型依赖延迟导入：首次计算 embedding / 相似度时才加载
+np = lazy_import("numpy")
+sentence_transformers = lazy_import("sentence_transformers", hint="语义去重")
+sklearn_pairwise = lazy_import("sklearn.metrics.pairwise", hint="语义去重")
 
 logger = get_logger(__name__)
 
@@ -45,7 +50,7 @@ class SemanticDeduplicator:
         
         try:
             logger.info(f"正在加载 embedding 模型: {self.model_name}...")
-            self.model = SentenceTransformer(self.model_name, device=self.device)
+            self.model = sentence_transformers.SentenceTransformer(self.model_name, device=self.device)
             self._initialized = True
             logger.info("Embedding 模型加载完成")
         except Exception as e:
@@ -95,7 +100,7 @@ class SemanticDeduplicator:
         if len(embedding_matrix) == 0:
             return []
 
-        similarity_matrix = cosine_similarity(embedding_matrix)
+        similarity_matrix = sklearn_pairwise.cosine_similarity(embedding_matrix)
         
         for i, node_id1 in enumerate(node_ids):
             for j, node_id2 in enumerate(node_ids[i+1:], start=i+1):
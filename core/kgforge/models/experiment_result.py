@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import time
 from kgforge.models.graph import Graph
+from kgforge.utils.stage_stream import emit_stage
 
 @dataclass
 class ExperimentResult:
@@ -29,8 +30,9 @@ class ExperimentResult:
     # --- 数据填报接口 (The Interfaces) ---
 
     def log_graph(self, stage_name: str, graph: Graph):
-        """记录某个阶段的图快照或增量图"""
+        """记录某个阶段的图快照或增量图，并推送给当前上下文的阶段监听器（见 kgforge.utils.stage_stream）"""
         self._graphs[stage_name] = graph
+        emit_stage(stage_name, graph)
 
     def log_step(self, action: str, details: Optional[Dict[str, Any]] = None):
         """记录算法执行的一个步骤（追踪轨迹）"""
@@ -42,14 +44,30 @@ class ExperimentResult:
             entry.update(details)
         self._trace.append(entry)
 
+    def restore_trace(self, entries: List[Dict[str, Any]]):
+        """恢复历史追踪轨迹（如从检查点读取），保留原时间戳"""
+        self._trace.extend(entries)
+
     def record_metric(self, key: str, value: Any):
         """记录一个量化指标"""
         self._metrics[key] = value
 
+    def log_stage_timing(self, stage_name: str, start_ms: float, duration_ms: float, **details: Any):
+        """记录阶段耗时（相对编排开始的起点与持续时间），汇总于 metrics.stage_timings"""
+        self._metrics.setdefault("stage_timings", {})[stage_name] = {
+            "start_ms": round(start_ms, 2),
+            "duration_ms": round(duration_ms, 2),
+            **details,
+        }
+
     def set_metadata(self, key: str, value: Any):
         """设置环境或上下文元数据"""
         self._metadata[key] = value
 
+    def log_profile(self, profile: Any):
+        """记录阶段剖析树（Span 或其字典形式），存放于 metadata.profile"""
+        self._metadata["profile"] = profile.to_dict() if hasattr(profile, "to_dict") else profile
+
     def finish(self, final_decision: Any, success: bool = True):
         """标记实验完成并记录最终结论"""
         self._status = "success" if success else "failed"
@@ -159,7 +159,7 @@ class Node(GraphElement):
     def __repr__(self): return f"Node(id={self.id}, label={self.label})"
 
     def to_dict(self):
-        return {
+        data = {
             "id": self.id,
             "status": self._exec_status,  # 提升为顶层字段
             "attributes": self._attrs,
@@ -168,6 +168,9 @@ class Node(GraphElement):
             "metadata": self._metadata,
             "has_subgraph": self.subgraph is not None
         }
+        if self.subgraph is not None:
+            data["subgraph"] = self.subgraph.to_dict()
+        return data
 
 
 class Edge(GraphElement):
@@ -211,8 +214,10 @@ class Edge(GraphElement):
             "id": self.id,
             "source": self.source,
             "target": self.target,
+            "status": self._exec_status,
             "attributes": self._attrs,
             "metrics": self._metrics,
+            "state": self._state,
             "metadata": self._metadata
         }
 
@@ -343,6 +348,9 @@ class Graph:
             node._metrics.update(nd.get("metrics", {}))
             node._state.update(nd.get("state", {}))
             node._metadata.update(nd.get("metadata", {}))
+            node.status(nd.get("status") or "")
+            if nd.get("subgraph"):
+                node.subgraph = cls.from_dict(nd["subgraph"])
             g.add_node(node)
 
         for ed in data.get("edges", []):
@@ -351,7 +359,9 @@ class Graph:
             edge = Edge(source=ed["source"], target=ed["target"], relation=relation, edge_id=edge_id)
             edge._attrs.update(ed.get("attributes", {}))
             edge._metrics.update(ed.get("metrics", {}))
+            edge._state.update(ed.get("state", {}))
             edge._metadata.update(ed.get("metadata", {}))
+            edge.status(ed.get("status") or "")
             g.add_edge(edge)
 
         return g
@@ -4,7 +4,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Any, Dict, List, Type
+from typing import Optional, Any, Dict, Iterator, List, Type
 
 META_REGISTRY = []
 
@@ -129,6 +129,14 @@ class IOrchestrator(IDescribable, ABC):
         """运行编排逻辑"""
         pass
 
+    def run_stream(self, goal: str, text: str, **kwargs) -> Iterator["StageEvent"]:
+        """
+        流式运行：每记录一个阶段图即产出 StageEvent("stage")，结束时产出 StageEvent("result")。
+        默认实现把 run() 放到后台线程并监听 log_graph；原生支持增量产出的编排器可覆盖。
+        """
+        from kgforge.utils.stage_stream import stream_run
+        return stream_run(lambda: self.run(goal, text, **kwargs))
+
 
 # 自动发现并注册所有组件协议接口
 # 规则：继承自 IDescribable 且 定义了 'category' 属性的类
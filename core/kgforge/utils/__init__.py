@@ -2,3 +2,4 @@ from .logger import get_logger, setup_logger, profiler
 from .constants import *
 from .path_utils import get_library_root, get_resource_path
 from .graph_utils import print_graph_summary
+from .profiling import profile_span, profile_session, profiled
@@ -0,0 +1,208 @@
+"""
+运行检查点 (Run Checkpoint)
+长时间编排（如动态判停循环）在每轮迭代后把可恢复状态写入检查点，进程重启或瞬时失败（限流、网络）后从最后一轮继续，
+已完成的抽取与 LLM 展开不必重做。
+
+文件格式：
+- <run_id>.ckpt.gz：最新一轮的状态（gzip 压缩的 JSON，图按 Graph.to_dict 编码），先写临时文件再原子替换
+- <run_id>.delta.jsonl：只追加的增量记录（已登记的阶段图、追踪步骤），每次保存只写新增部分，
+  避免每轮重写全部历史；状态中的 delta_bytes 记录与之对应的有效长度，崩溃后多出的尾部在读取与续写时丢弃
+- <run_id>.meta.json：调用方附带的元数据（如原始请求，用于恢复时重建管线）
+
+失败或取消的运行保留检查点供恢复，由 CheckpointStore.prune 按保留期与总大小清理。
+
+用法（服务端按实验 ID 开启作用域，编排器核心读取当前作用域）：
+    with checkpoint_scope(CheckpointStore(root), run_id, resume=True):
+        orchestrator.run(goal, text)
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from kgforge.models.graph import Graph
+
+FORMAT_VERSION = 2
+COMPRESS_LEVEL = 3
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+_SUFFIXES = (".ckpt.gz", ".delta.jsonl", ".meta.json")
+
+
+def encode_graph(graph: Graph) -> Dict[str, Any]:
+    return graph.to_dict()
+
+
+def decode_graph(data: Dict[str, Any]) -> Graph:
+    return Graph.from_dict(data)
+
+
+class CheckpointStore:
+    """按 run_id 存取检查点文件"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, run_id: str, suffix: str) -> Path:
+        return self.root / f"{_UNSAFE.sub('_', run_id)}{suffix}"
+
+    def path(self, run_id: str) -> Path:
+        return self._path(run_id, ".ckpt.gz")
+
+    def save(self, run_id: str, state: Dict[str, Any]) -> Path:
+        path = self.path(run_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+        payload = json.dumps({**state, "version": FORMAT_VERSION, "saved_at": time.time()},
+                             ensure_ascii=False, default=str).encode("utf-8")
+        with gzip.open(tmp, "wb", compresslevel=COMPRESS_LEVEL) as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return path
+
+    def append_deltas(self, run_id: str, records: List[Dict[str, Any]], offset: int) -> int:
+        """截断到 offset 后追加增量记录，返回新的有效长度"""
+        path = self._path(run_id, ".delta.jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        exists = path.exists()
+        with open(path, "r+b" if exists else "wb") as f:
+            f.seek(offset if exists else 0)
+            f.truncate()
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def load_deltas(self, run_id: str, length: int) -> List[Dict[str, Any]]:
+        """读取前 length 字节内的增量记录"""
+        if not length:
+            return []
+        try:
+            with open(self._path(run_id, ".delta.jsonl"), "rb") as f:
+                data = f.read(length)
+        except OSError:
+            return []
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with gzip.open(self.path(run_id), "rb") as f:
+                state = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError, EOFError):
+            return None
+        return state if state.get("version") == FORMAT_VERSION else None
+
+    def delete(self, run_id: str):
+        for suffix in _SUFFIXES:
+            try:
+                self._path(run_id, suffix).unlink()
+            except FileNotFoundError:
+                pass
+
+    def prune(self, max_age_seconds: Optional[float] = None, max_total_bytes: Optional[int] = None,
+              keep: Optional[str] = None) -> List[str]:
+        """删除超过保留期的运行，再按最近写入时间从旧到新删除直到总大小不超过上限；返回删除的 run_id"""
+        if not self.root.exists():
+            return []
+        runs: Dict[str, List[float]] = {}  # run_id -> [最近写入时间, 总字节数]
+        for path in self.root.iterdir():
+            suffix = next((sfx for sfx in _SUFFIXES if path.name.endswith(sfx)), None)
+            if suffix is None:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entry = runs.setdefault(path.name[:-len(suffix)], [0.0, 0])
+            entry[0] = max(entry[0], stat.st_mtime)
+            entry[1] += stat.st_size
+        if keep is not None:
+            runs.pop(_UNSAFE.sub("_", keep), None)
+
+        removed = []
+        now = time.time()
+        total = sum(size for _, size in runs.values())
+        for run_id, (mtime, size) in sorted(runs.items(), key=lambda item: item[1][0]):
+            expired = max_age_seconds is not None and now - mtime > max_age_seconds
+            oversize = max_total_bytes is not None and total > max_total_bytes
+            if not (expired or oversize):
+                continue
+            self.delete(run_id)
+            total -= size
+            removed.append(run_id)
+        return removed
+
+    def save_meta(self, run_id: str, meta: Dict[str, Any]):
+        path = self._path(run_id, ".meta.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+
+    def load_meta(self, run_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(run_id, ".meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """已有检查点概要（不解压，只读文件信息）"""
+        out = []
+        for path in sorted(self.root.glob("*.ckpt.gz"), key=lambda p: -p.stat().st_mtime) if self.root.exists() else []:
+            stat = path.stat()
+            out.append({"run_id": path.name[:-len(".ckpt.gz")], "bytes": stat.st_size, "saved_at": stat.st_mtime})
+        return out
+
+
+class CheckpointHandle:
+    """当前运行的检查点句柄：resume 为 True 时 load() 返回已有状态（含 deltas 增量记录）"""
+
+    def __init__(self, store: CheckpointStore, run_id: str, resume: bool = False, keep_completed: bool = False):
+        self.store = store
+        self.run_id = run_id
+        self.resume = resume
+        self.keep_completed = keep_completed
+        self._delta_bytes = 0
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        state = self.store.load(self.run_id) if self.resume else None
+        if state is not None:
+            self._delta_bytes = int(state.get("delta_bytes") or 0)
+            state["deltas"] = self.store.load_deltas(self.run_id, self._delta_bytes)
+        return state
+
+    def save(self, state: Dict[str, Any], deltas: Optional[List[Dict[str, Any]]] = None):
+        """先追加自上次保存以来的增量，再原子替换状态文件"""
+        if deltas or not self._delta_bytes:
+            self._delta_bytes = self.store.append_deltas(self.run_id, deltas or [], self._delta_bytes)
+        self.store.save(self.run_id, {**state, "delta_bytes": self._delta_bytes})
+
+    def complete(self):
+        """运行正常结束：默认删除检查点"""
+        if not self.keep_completed:
+            self.store.delete(self.run_id)
+
+
+_current: ContextVar[Optional[CheckpointHandle]] = ContextVar("kgforge_checkpoint", default=None)
+
+
+@contextmanager
+def checkpoint_scope(store: CheckpointStore, run_id: str, resume: bool = False, keep_completed: bool = False):
+    token = _current.set(CheckpointHandle(store, run_id, resume=resume, keep_completed=keep_completed))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def current_checkpoint() -> Optional[CheckpointHandle]:
+    """当前上下文的检查点句柄；未开启时为 None，编排器据此跳过检查点"""
+    return _current.get()
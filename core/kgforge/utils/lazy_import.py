@@ -0,0 +1,68 @@
+"""
+延迟导入 (Lazy Import)
+重型可选依赖（torch / transformers / sentence_transformers / sklearn / openai）在模块顶层
+以代理对象引入，首次访问属性时才真正 import。这样组件发现、CLI 与服务启动都不会承担其导入开销。
+
+用法：
+    torch = lazy_import("torch")
+    transformers = lazy_import("transformers", hint="REBEL 抽取器")
+
+    def load():
+        return transformers.AutoTokenizer.from_pretrained(...)   # 此时才导入 transformers
+"""
+
+import importlib
+import importlib.util
+import types
+from typing import Optional
+
+
+class LazyModule(types.ModuleType):
+    """模块代理：首次属性访问时导入真实模块，之后所有访问直接转发"""
+
+    def __init__(self, name: str, hint: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_hint"] = hint
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            try:
+                module = importlib.import_module(self.__name__)
+            except ImportError as e:
+                hint = self.__dict__["_lazy_hint"]
+                needed_by = f"（{hint} 需要）" if hint else ""
+                raise ImportError(f"可选依赖 '{self.__name__}' 不可用{needed_by}: {e}") from e
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, item: str):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, hint: Optional[str] = None) -> LazyModule:
+    """返回模块的延迟代理（缺失的依赖在首次使用时才抛出 ImportError）"""
+    return LazyModule(name, hint)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """代理是否已触发真实导入（非代理对象恒为 True）"""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
+
+
+def is_available(name: str) -> bool:
+    """不导入模块，仅检查其是否可被找到"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
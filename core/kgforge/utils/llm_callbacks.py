@@ -0,0 +1,50 @@
+"""
+LangChain 调用计量回调
+单独成模块：只有使用 LangChain 的组件（iText2KG）导入本模块，OpenAI 直连路径不加载 langchain_core。
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from .llm_metrics import record_llm_call
+
+try:
+    from langchain_core.callbacks import BaseCallbackHandler
+except ImportError:  # 未安装 LangChain 时仍可导入本模块
+    BaseCallbackHandler = object
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """挂载到 LangChain 聊天模型（callbacks=[...]），按 run_id 计时并读取 token_usage / usage_metadata"""
+
+    def __init__(self, model: Optional[str] = None):
+        super().__init__()
+        self.model = model
+        self._starts: Dict[Any, float] = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id=None, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+        self._starts[run_id] = time.perf_counter()
+
+    def _elapsed_ms(self, run_id) -> float:
+        start = self._starts.pop(run_id, None)
+        return (time.perf_counter() - start) * 1000 if start is not None else 0.0
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        output = getattr(response, "llm_output", None) or {}
+        usage = output.get("token_usage") or {}
+        prompt, completion = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        if not usage:
+            # 新版 LangChain 把用量放在消息的 usage_metadata 上
+            for generations in getattr(response, "generations", None) or []:
+                for generation in generations:
+                    meta = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt += meta.get("input_tokens", 0)
+                    completion += meta.get("output_tokens", 0)
+        record_llm_call(output.get("model_name") or self.model, prompt_tokens=prompt, completion_tokens=completion,
+                        latency_ms=self._elapsed_ms(run_id))
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs):
+        record_llm_call(self.model, latency_ms=self._elapsed_ms(run_id), error=True)
@@ -0,0 +1,253 @@
+"""
+LLM 调用限流与重试 (Shared LLM Limiter)
+进程内所有实验共享同一组限流器，按 (base_url, model) 各一个：
+
+- 令牌桶：RPM（请求数/分钟）与 TPM（token 数/分钟）。调用前按提示词长度预估 token 预约额度，
+  返回后按 usage.total_tokens 多退少补；额度不足时排队等待（预约制，先到先得）
+- 并发上限：max_concurrency 个在途请求
+- 重试：429 / 5xx / 连接错误按带抖动的指数退避重试；响应带 Retry-After 时以其为准，
+  429 还会让共享同一限流器的所有调用一起暂停，避免并发实验各自撞墙
+- 统计：请求数、token 数、重试与限流次数、排队等待耗时（见 limiter_stats，服务端 /llm/limits）
+
+限额取自服务端 modules.yaml 的 llm 段（不在服务环境中运行时使用 DEFAULTS）；隔离 worker 各自一份限流器。
+"""
+
+import email.utils
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .llm_metrics import record_llm_retry
+from .logger import get_logger
+from .profiling import profile_span
+
+logger = get_logger(__name__)
+
+DEFAULTS = {
+    "rpm": 60,                  # 0 / null 表示不限
+    "tpm": 150000,
+    "max_concurrency": 8,
+    "max_retries": 5,
+    "base_delay": 1.0,          # 退避基数（秒），第 n 次重试上限为 base_delay * 2^n
+    "max_delay": 60.0,
+    "completion_tokens": 1024,  # 预估的输出 token 数（未设置 max_tokens 时）
+}
+# 中英混合提示词的粗略换算；预估只用于预约，返回后按实际用量校正
+CHARS_PER_TOKEN = 3
+_CONNECTION_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+def limits_config() -> Dict[str, Any]:
+    """llm 段：顶层为默认值，limits 下按模型名覆盖，如 {"openai/gpt-4": {"rpm": 20}}"""
+    try:
+        from python_service.config.loader import get_config
+        return get_config().get("llm") or {}
+    except ImportError:
+        return {}
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], completion_tokens: int = DEFAULTS["completion_tokens"]) -> int:
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return math.ceil(chars / CHARS_PER_TOKEN) + completion_tokens
+
+
+class TokenBucket:
+    """按分钟速率补充的令牌桶，容量为一分钟的额度；允许透支，透支部分由后续调用者排队偿还"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """预约 amount 个令牌，返回需要等待的秒数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount: float):
+        """校正预约（amount 为负表示补扣）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期）/ retry-after-ms 响应头"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    code = status_code(error)
+    if code is not None:
+        return code == 429 or code >= 500
+    return isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in _CONNECTION_ERRORS
+
+
+class LLMLimiter:
+    """单个 (base_url, model) 的限流器"""
+
+    def __init__(self, name: str, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, max_retries: int = DEFAULTS["max_retries"],
+                 base_delay: float = DEFAULTS["base_delay"], max_delay: float = DEFAULTS["max_delay"],
+                 completion_tokens: int = DEFAULTS["completion_tokens"], model: Optional[str] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.model = model or name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.completion_tokens = completion_tokens
+        self._sleep = sleep
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "tokens": 0, "retries": 0, "throttled": 0, "failed": 0,
+                       "waiting": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待：full jitter 指数退避"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def pause(self, seconds: float):
+        """暂停所有共享此限流器的调用（收到 429 时）"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _acquire(self, estimated_tokens: int):
+        """排队直到可以发出请求：暂停期、RPM/TPM 预约、并发槽位"""
+        start = time.monotonic()
+        self._count(waiting=1)
+        try:
+            with profile_span("llm_queue"):
+                delay = max(self._paused_until - start, 0.0)
+                if self.requests:
+                    delay = max(delay, self.requests.reserve(1))
+                if self.tokens:
+                    delay = max(delay, self.tokens.reserve(estimated_tokens))
+                if delay > 0:
+                    self._sleep(delay)
+                if self._slots:
+                    self._slots.acquire()
+        finally:
+            waited_ms = (time.monotonic() - start) * 1000
+            with self._lock:
+                self._stats["waiting"] -= 1
+                if waited_ms >= 1:
+                    self._stats["waited"] += 1
+                    self._stats["wait_ms_total"] += waited_ms
+                    self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], waited_ms)
+
+    def call(self, fn: Callable[[], Any], estimated_tokens: int = 0) -> Any:
+        """在限流下执行 fn；可重试错误按退避重试，重试耗尽或不可重试时原样抛出"""
+        attempt = 0
+        while True:
+            self._acquire(estimated_tokens)
+            try:
+                response = fn()
+            except Exception as e:
+                if self.tokens:
+                    self.tokens.refund(estimated_tokens)
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._count(failed=1)
+                    raise
+                delay = retry_after(e)
+                delay = self.backoff(attempt) if delay is None else min(delay, self.max_delay) + random.uniform(0, 0.1 * self.base_delay)
+                if status_code(e) == 429:
+                    # 下一次（包括其他实验的）调用在 _acquire 中等待暂停期结束
+                    self._count(throttled=1)
+                    self.pause(delay)
+                else:
+                    self._sleep(delay)
+                attempt += 1
+                self._count(retries=1)
+                record_llm_retry(self.model)
+                logger.warning(f"[LLM] {self.name} 调用失败 ({e.__class__.__name__}, status={status_code(e)})，"
+                               f"{delay:.1f}s 后第 {attempt} 次重试")
+                continue
+            finally:
+                if self._slots:
+                    self._slots.release()
+
+            used = getattr(getattr(response, "usage", None), "total_tokens", None)
+            if isinstance(used, int):
+                if self.tokens:
+                    self.tokens.refund(estimated_tokens - used)
+            else:
+                used = estimated_tokens
+            self._count(requests=1, tokens=used)
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["wait_ms_avg"] = round(stats["wait_ms_total"] / stats["waited"], 2) if stats["waited"] else 0.0
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 2)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 2)
+        stats["limits"] = {
+            "rpm": self.requests.capacity if self.requests else None,
+            "tpm": self.tokens.capacity if self.tokens else None,
+            "max_concurrency": self.max_concurrency,
+        }
+        return stats
+
+
+_LIMITERS: Dict[Tuple[str, str], LLMLimiter] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_limiter(base_url: str, model: str) -> LLMLimiter:
+    """获取（或创建）该 (base_url, model) 的共享限流器"""
+    key = (base_url, model)
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        with _REGISTRY_LOCK:
+            limiter = _LIMITERS.get(key)
+            if limiter is None:
+                config = limits_config()
+                settings = {**DEFAULTS, **{k: v for k, v in config.items() if k in DEFAULTS},
+                            **((config.get("limits") or {}).get(model) or {})}
+                limiter = _LIMITERS[key] = LLMLimiter(f"{base_url}|{model}", model=model, **settings)
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {limiter.name: limiter.stats() for limiter in list(_LIMITERS.values())}
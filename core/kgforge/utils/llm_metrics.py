@@ -0,0 +1,221 @@
+"""
+LLM 调用计量 (LLM Accounting)
+记录每次 LLM 调用的模型、提示/输出 token、延迟、重试与错误：
+
+- 进程级：按模型的计数器与延迟直方图，服务端以 Prometheus 文本格式导出（GET /metrics）
+- 单次实验：在服务端运行时累加到 python_service.core.context 的当前实验，结束后写入 ExperimentResult 的 metrics.llm_usage
+- 埋点：instrument_openai(client) 包装 OpenAI 客户端；LangChain 模型挂载 LLMUsageCallback（kgforge/utils/llm_callbacks.py，
+  单独成模块，导入本模块不会加载 langchain_core）
+
+费用按 modules.yaml 的 llm.prices（每 1K token 美元，{"<model>": {prompt, completion}}）计算，未配置单价的模型不计费用。
+隔离 worker 中的调用只计入该实验的 llm_usage，不进入 API 进程的 /metrics。
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+METRIC_PREFIX = "prism_llm"
+
+
+def _prices() -> Dict[str, Dict[str, float]]:
+    from .llm_limiter import limits_config
+    return limits_config().get("prices") or {}
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    price = _prices().get(model)
+    if not price:
+        return None
+    return (prompt_tokens * float(price.get("prompt", 0)) + completion_tokens * float(price.get("completion", 0))) / 1000.0
+
+
+class LLMUsage:
+    """一组调用的按模型汇总（线程安全）"""
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model: str) -> Dict[str, Any]:
+        entry = self.models.get(model)
+        if entry is None:
+            entry = self.models[model] = {"calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0,
+                                          "completion_tokens": 0, "latency_ms_total": 0.0, "latency_ms_max": 0.0,
+                                          "cost_usd": None}
+        return entry
+
+    def add(self, model: str, prompt_tokens: int, completion_tokens: int, latency_ms: float,
+            error: bool = False, cost: Optional[float] = None):
+        with self._lock:
+            entry = self._entry(model)
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["latency_ms_total"] += latency_ms
+            entry["latency_ms_max"] = max(entry["latency_ms_max"], latency_ms)
+            if cost is not None:
+                entry["cost_usd"] = (entry["cost_usd"] or 0.0) + cost
+
+    def add_retry(self, model: str):
+        with self._lock:
+            self._entry(model)["retries"] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            by_model = {model: dict(entry) for model, entry in self.models.items()}
+        totals = {key: sum(e[key] for e in by_model.values())
+                  for key in ("calls", "errors", "retries", "prompt_tokens", "completion_tokens", "latency_ms_total")}
+        costs = [e["cost_usd"] for e in by_model.values() if e["cost_usd"] is not None]
+        for entry in list(by_model.values()) + [totals]:
+            entry["total_tokens"] = entry["prompt_tokens"] + entry["completion_tokens"]
+            entry["latency_ms_avg"] = round(entry["latency_ms_total"] / entry["calls"], 2) if entry["calls"] else 0.0
+            entry["latency_ms_total"] = round(entry["latency_ms_total"], 2)
+        totals["cost_usd"] = round(sum(costs), 6) if costs else None
+        return {**totals, "by_model": by_model}
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class LLMMetrics:
+    """进程级计量：LLMUsage 汇总 + 按模型的延迟直方图"""
+
+    def __init__(self):
+        self.usage = LLMUsage()
+        self._histograms: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, latency_ms: float):
+        with self._lock:
+            counts = self._histograms.setdefault(model, [0] * (len(LATENCY_BUCKETS_MS) + 1))
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if latency_ms <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+    def render_prometheus(self, prefix: str = METRIC_PREFIX) -> str:
+        usage = self.usage.to_dict()["by_model"]
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        family("calls_total", "counter", "LLM calls by model and outcome")
+        for model, e in usage.items():
+            lines.append(f'{prefix}_calls_total{{model="{_label(model)}",status="ok"}} {e["calls"] - e["errors"]}')
+            lines.append(f'{prefix}_calls_total{{model="{_label(model)}",status="error"}} {e["errors"]}')
+        family("tokens_total", "counter", "LLM tokens by model and type")
+        for model, e in usage.items():
+            lines.append(f'{prefix}_tokens_total{{model="{_label(model)}",type="prompt"}} {e["prompt_tokens"]}')
+            lines.append(f'{prefix}_tokens_total{{model="{_label(model)}",type="completion"}} {e["completion_tokens"]}')
+        family("retries_total", "counter", "LLM call retries by model")
+        for model, e in usage.items():
+            lines.append(f'{prefix}_retries_total{{model="{_label(model)}"}} {e["retries"]}')
+        family("cost_usd_total", "counter", "Estimated LLM cost in USD (models with configured prices)")
+        for model, e in usage.items():
+            if e["cost_usd"] is not None:
+                lines.append(f'{prefix}_cost_usd_total{{model="{_label(model)}"}} {e["cost_usd"]:.6f}')
+
+        family("latency_ms", "histogram", "LLM call latency in milliseconds")
+        with self._lock:
+            histograms = {model: list(counts) for model, counts in self._histograms.items()}
+        for model, counts in histograms.items():
+            label = _label(model)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_MS, counts):
+                cumulative += count
+                lines.append(f'{prefix}_latency_ms_bucket{{model="{label}",le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{prefix}_latency_ms_bucket{{model="{label}",le="+Inf"}} {cumulative}')
+            lines.append(f'{prefix}_latency_ms_sum{{model="{label}"}} {usage.get(model, {}).get("latency_ms_total", 0.0)}')
+            lines.append(f'{prefix}_latency_ms_count{{model="{label}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+# 进程级单例
+llm_metrics = LLMMetrics()
+
+
+def _experiment_usage() -> Optional[LLMUsage]:
+    try:
+        from python_service.core.context import get_current_llm_usage
+    except ImportError:  # 不在服务环境中运行（例如本地脚本）
+        return None
+    return get_current_llm_usage()
+
+
+def record_llm_call(model: str, prompt_tokens: int = 0, completion_tokens: int = 0, latency_ms: float = 0.0,
+                    error: bool = False):
+    """记录一次 LLM 调用（每次实际请求各记一次，失败的重试请求记为 error）"""
+    model = model or "unknown"
+    cost = call_cost(model, prompt_tokens, completion_tokens)
+    llm_metrics.usage.add(model, prompt_tokens, completion_tokens, latency_ms, error=error, cost=cost)
+    llm_metrics.observe(model, latency_ms)
+    usage = _experiment_usage()
+    if usage is not None:
+        usage.add(model, prompt_tokens, completion_tokens, latency_ms, error=error, cost=cost)
+
+
+def record_llm_retry(model: str):
+    model = model or "unknown"
+    llm_metrics.usage.add_retry(model)
+    usage = _experiment_usage()
+    if usage is not None:
+        usage.add_retry(model)
+
+
+# ==================== OpenAI 客户端包装 ====================
+
+class _InstrumentedCompletions:
+    def __init__(self, inner):
+        self._inner = inner
+
+    def create(self, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self._inner.create(**kwargs)
+        except Exception:
+            record_llm_call(kwargs.get("model"), latency_ms=(time.perf_counter() - start) * 1000, error=True)
+            raise
+        usage = getattr(response, "usage", None)
+        record_llm_call(
+            kwargs.get("model") or getattr(response, "model", None),
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        )
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class _InstrumentedChat:
+    def __init__(self, inner):
+        self._inner = inner
+        self.completions = _InstrumentedCompletions(inner.completions)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class InstrumentedOpenAI:
+    """OpenAI 客户端代理：chat.completions.create 计量，其余属性原样转发"""
+
+    def __init__(self, client):
+        self._client = client
+        self.chat = _InstrumentedChat(client.chat)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def instrument_openai(client) -> InstrumentedOpenAI:
+    return client if isinstance(client, InstrumentedOpenAI) else InstrumentedOpenAI(client)
@@ -3,18 +3,35 @@
 替换所有 print() 为标准的 logging，并提供数据持久化调试服务
 """
 
+import atexit
+import copy
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Any, Dict
 from .constants import DEFAULT_LOG_LEVEL, DEFAULT_LOG_FORMAT
 
+
+def _default_log_dir() -> Path:
+    """日志目录：KGFORGE_LOG_DIR 优先；源码仓库中为仓库根目录下的 logs/，否则为 ~/.kgforge/logs（不随当前工作目录变化）"""
+    configured = os.getenv("KGFORGE_LOG_DIR")
+    if configured:
+        return Path(configured).expanduser().resolve()
+    repo_root = Path(__file__).resolve().parents[3]
+    if (repo_root / "core" / "kgforge").is_dir():
+        return repo_root / "logs"
+    return Path.home() / ".kgforge" / "logs"
+
+
 # 确保默认日志目录存在
-DEFAULT_LOG_DIR = Path("logs")
-DEFAULT_LOG_DIR.mkdir(exist_ok=True)
+DEFAULT_LOG_DIR = _default_log_dir()
+DEFAULT_LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 class DataProfiler:
     """
@@ -28,14 +45,14 @@ class DataProfiler:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, output_dir: str = "logs/debug_snapshots"):
+    def __init__(self, output_dir: Optional[str] = None):
         """
         初始化数据记录器
         Args:
-            output_dir: 数据存储目录，默认为 logs/debug_snapshots
+            output_dir: 数据存储目录，默认为日志目录下的 debug_snapshots
         """
         if not hasattr(self, 'initialized'):
-            self.output_dir = Path(output_dir)
+            self.output_dir = Path(output_dir) if output_dir else DEFAULT_LOG_DIR / "debug_snapshots"
             self.output_dir.mkdir(parents=True, exist_ok=True)
             self.initialized = True
 
@@ -105,6 +122,105 @@ def register_global_handler(handler: logging.Handler):
                 if handler not in logger.handlers:
                     logger.addHandler(handler)
 
+def dispatch_to_global_handlers(record: logging.LogRecord):
+    """把日志记录（如子进程转发回来的）直接交给全局 Handler，不再写控制台/文件 sink"""
+    for handler in _GLOBAL_HANDLERS:
+        if record.levelno >= handler.level:
+            handler.handle(record)
+
+# ==================== 共享队列后端 ====================
+# KGFORGE_LOG_BACKEND=queue（默认）：所有 logger 共用一个 QueueHandler，由后台 QueueListener
+# 统一写入唯一的控制台与文件 sink，格式化在后台线程中进行。
+# KGFORGE_LOG_BACKEND=legacy：每个 logger 各自挂载 StreamHandler/FileHandler（旧行为）。
+LOG_BACKEND = os.getenv("KGFORGE_LOG_BACKEND", "queue").lower()
+DEFAULT_LOG_FILENAME = "system.log"
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    不在调用线程中格式化的 QueueHandler。
+    标准 QueueHandler.prepare 会提前 format 并拷贝 record，这里只做浅拷贝后入队，
+    由 listener 线程中的 sink 按需格式化；拷贝避免同一 record 上的其他 Handler（如全局 Handler）
+    后续的修改与入队副本互相影响。
+    """
+    def __init__(self, q, to_file: bool):
+        super().__init__(q)
+        self.to_file = to_file
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record._kgforge_to_file = self.to_file
+        return record
+
+
+class _QueueBackend:
+    """进程内唯一的队列日志后端（懒启动，atexit 时停止并刷新）"""
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.console_handler = _LazyQueueHandler(self.queue, to_file=False)
+        self.file_handler = _LazyQueueHandler(self.queue, to_file=True)
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self._lock = threading.Lock()
+
+    def _build_sinks(self):
+        formatter = logging.Formatter(DEFAULT_LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(formatter)
+        sinks = [console]
+        try:
+            file_sink = logging.FileHandler(DEFAULT_LOG_DIR / DEFAULT_LOG_FILENAME, encoding='utf-8')
+            file_sink.setFormatter(formatter)
+            file_sink.addFilter(lambda record: getattr(record, "_kgforge_to_file", True))
+            sinks.append(file_sink)
+        except Exception as e:
+            sys.stderr.write(f"Failed to setup shared file logging: {e}\n")
+        return sinks
+
+    def handler(self, to_file: bool) -> logging.Handler:
+        self.start()
+        return self.file_handler if to_file else self.console_handler
+
+    def start(self):
+        with self._lock:
+            if self.listener is None:
+                self.listener = logging.handlers.QueueListener(self.queue, *self._build_sinks())
+                self.listener.start()
+
+    def _reset_after_fork(self):
+        """fork 后子进程中 listener 线程不存在：换新队列与锁，下次使用时重新启动"""
+        self.queue = queue.SimpleQueue()
+        self.console_handler.queue = self.queue
+        self.file_handler.queue = self.queue
+        self._lock = threading.Lock()
+        was_running = self.listener is not None
+        self.listener = None
+        if was_running:
+            self.start()
+
+    def stop(self):
+        """停止 listener 并刷新队列中的剩余记录"""
+        with self._lock:
+            if self.listener is not None:
+                self.listener.stop()
+                for sink in self.listener.handlers:
+                    sink.close()
+                self.listener = None
+
+
+_queue_backend = _QueueBackend()
+atexit.register(_queue_backend.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_queue_backend._reset_after_fork)
+
+
+def flush_logs():
+    """等待队列后端写完所有已入队的日志（重启 listener 以便继续使用）"""
+    if _queue_backend.listener is not None:
+        _queue_backend.stop()
+        _queue_backend.start()
+
+
 def setup_logger(
     name: str,
     level: Optional[str] = None,
@@ -120,7 +236,9 @@ def setup_logger(
         level: 日志级别（默认从环境变量或常量读取）
         format_string: 日志格式字符串
         log_to_file: 是否输出到文件
-        log_filename: 文件名（如果启用会有 logs/ 前缀）
+        log_filename: 文件名（位于 DEFAULT_LOG_DIR 下）
+        
+    自定义 format_string 或 log_filename 时回退为独立 handler。
         
     Returns:
         配置好的 Logger 实例
@@ -135,6 +253,16 @@ def setup_logger(
     log_level = level or DEFAULT_LOG_LEVEL
     logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
     
+    # 共享队列后端：默认格式与默认文件名时挂载共享 QueueHandler，不再为每个 logger 打开文件
+    if LOG_BACKEND != "legacy" and format_string is None and log_filename == DEFAULT_LOG_FILENAME:
+        logger.addHandler(_queue_backend.handler(to_file=log_to_file))
+        # 全局 Handlers (如 Telemetry) 依赖调用线程的 contextvars，仍同步挂载
+        for h in _GLOBAL_HANDLERS:
+            if h not in logger.handlers:
+                logger.addHandler(h)
+        logger.propagate = False
+        return logger
+
     # 设置格式
     formatter = logging.Formatter(
         format_string or DEFAULT_LOG_FORMAT,
@@ -0,0 +1,157 @@
+"""
+阶段性能剖析 (Span Profiler)
+以嵌套 Span 的形式记录各阶段的墙钟时间、CPU 时间、峰值 RSS 增量与调用次数，
+并导出为火焰图风格的树形结构，供 ExperimentResult 与 API 响应使用。
+
+用法：
+    with profile_session("infer") as root:
+        with profile_span("extract"):
+            ...
+    tree = root.to_dict()
+
+未开启会话时 profile_span / profiled 均为空操作，可放心埋点在库代码中。
+"""
+
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows 无 resource 模块，RSS 统计降级为 0
+    resource = None
+
+
+def _peak_rss_kb() -> int:
+    """当前进程的峰值常驻内存 (KB)"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 返回字节，Linux 返回 KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# 同名 Span 的并发累加（如 DAG 编排器中的并行阶段）需要串行化
+_LOCK = threading.Lock()
+
+
+class Span:
+    """
+    剖析节点：同一父节点下的同名 Span 会被合并，调用次数与耗时累加。
+    """
+    __slots__ = ("name", "wall_time", "cpu_time", "peak_rss_delta_kb", "calls", "children", "_index")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_time: float = 0.0
+        self.cpu_time: float = 0.0
+        self.peak_rss_delta_kb: int = 0
+        self.calls: int = 0
+        self.children: List["Span"] = []
+        self._index: Dict[str, "Span"] = {}
+
+    def child(self, name: str) -> "Span":
+        """获取或创建同名子 Span"""
+        with _LOCK:
+            span = self._index.get(name)
+            if span is None:
+                span = Span(name)
+                self._index[name] = span
+                self.children.append(span)
+            return span
+
+    def record(self, wall: float, cpu: float, rss_delta_kb: int):
+        with _LOCK:
+            self.calls += 1
+            self.wall_time += wall
+            self.cpu_time += cpu
+            self.peak_rss_delta_kb += max(0, rss_delta_kb)
+
+    def find(self, name: str) -> Optional["Span"]:
+        """深度优先查找第一个同名 Span（便于测试与调试）"""
+        if self.name == name:
+            return self
+        for c in self.children:
+            hit = c.find(name)
+            if hit is not None:
+                return hit
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        children_wall = sum(c.wall_time for c in self.children)
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "self_ms": round(max(0.0, self.wall_time - children_wall) * 1000, 3),
+            "cpu_ms": round(self.cpu_time * 1000, 3),
+            "peak_rss_delta_kb": self.peak_rss_delta_kb,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+    def __repr__(self):
+        return f"Span(name={self.name}, calls={self.calls}, wall={self.wall_time:.4f}s)"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("kgforge_profile_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """当前上下文中活动的 Span（无会话时为 None）"""
+    return _current_span.get()
+
+
+@contextmanager
+def _measure(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    rss0 = _peak_rss_kb()
+    try:
+        yield span
+    finally:
+        span.record(time.perf_counter() - wall0, time.thread_time() - cpu0, _peak_rss_kb() - rss0)
+        _current_span.reset(token)
+
+
+@contextmanager
+def profile_span(name: str) -> Iterator[Optional[Span]]:
+    """
+    记录一个嵌套 Span。
+    若当前上下文没有活动的剖析会话，则不做任何记录并 yield None。
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with _measure(parent.child(name)) as span:
+        yield span
+
+
+@contextmanager
+def profile_session(name: str) -> Iterator[Span]:
+    """
+    开启剖析会话并 yield 其 Span。
+    若已处于某个会话中，则作为子 Span 嵌套，整棵树最终由最外层会话持有。
+    """
+    parent = _current_span.get()
+    span = parent.child(name) if parent is not None else Span(name)
+    with _measure(span):
+        yield span
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """装饰器形式的 profile_span，默认使用函数的 __qualname__ 作为 Span 名称"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
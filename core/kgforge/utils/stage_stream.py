@@ -0,0 +1,92 @@
+"""
+阶段流 (Stage Stream)
+编排器通过 ExperimentResult.log_graph 记录的每个阶段图，在记录的同时推送给当前上下文中注册的监听器，
+使服务端可以在编排运行期间逐阶段转发结果（SSE / 任务进度），而无需等待 run() 返回。
+
+用法：
+    with stage_sink(lambda name, graph: ...):
+        orchestrator.run(goal, text)
+
+    for event in orchestrator.run_stream(goal, text):   # IOrchestrator 的生成器协议
+        ...
+
+未注册监听器时 emit_stage 为空操作。监听器在编排器线程中同步调用，应尽快返回（需要快照时自行序列化）。
+"""
+
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+StageListener = Callable[[str, Any], None]
+
+_listeners: ContextVar[Tuple[StageListener, ...]] = ContextVar("stage_listeners", default=())
+
+
+@contextmanager
+def stage_sink(listener: StageListener):
+    """在当前上下文中注册阶段监听器（可嵌套，外层监听器同样收到事件）"""
+    token = _listeners.set(_listeners.get() + (listener,))
+    try:
+        yield
+    finally:
+        _listeners.reset(token)
+
+
+def emit_stage(name: str, graph: Any) -> None:
+    """通知当前上下文的全部监听器；监听器异常不影响编排执行"""
+    for listener in _listeners.get():
+        try:
+            listener(name, graph)
+        except Exception:
+            from kgforge.utils.logger import get_logger
+            get_logger(__name__).warning(f"Stage listener failed on {name}", exc_info=True)
+
+
+@dataclass
+class StageEvent:
+    """run_stream 产出的事件：kind 为 stage（阶段图）或 result（最终 ExperimentResult）"""
+    kind: str
+    stage: Optional[str] = None
+    graph: Any = None
+    result: Any = None
+
+
+def _clone(graph: Any) -> Any:
+    return graph.clone() if hasattr(graph, "clone") else graph
+
+
+def stream_run(run: Callable[[], Any], snapshot: Callable[[Any], Any] = _clone) -> Iterator[StageEvent]:
+    """
+    在后台线程中执行 run()，逐个产出其间记录的阶段，最后产出 result 事件；run() 的异常在迭代端重新抛出。
+    阶段图在编排器线程中经 snapshot 复制后再交给迭代端（编排器之后可能继续原地修改该图）。
+    后台线程继承调用方的上下文（实验 ID、剖析会话等）。
+    """
+    events: "queue.Queue" = queue.Queue()
+    done = object()
+    outcome = {}
+
+    def on_stage(name: str, graph: Any):
+        events.put(StageEvent("stage", stage=name, graph=snapshot(graph)))
+
+    def target():
+        try:
+            with stage_sink(on_stage):
+                outcome["result"] = run()
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            events.put(done)
+
+    ctx = copy_context()
+    threading.Thread(target=ctx.run, args=(target,), name="stage-stream", daemon=True).start()
+    while True:
+        event = events.get()
+        if event is done:
+            break
+        yield event
+    if "error" in outcome:
+        raise outcome["error"]
+    yield StageEvent("result", result=outcome.get("result"))
@@ -13,6 +13,8 @@ export const DEFAULT_SIMILARITY_THRESHOLD = 0.9;
 export const DEFAULT_API_TIMEOUT = 300000; // 5分钟（毫秒）
 export const DEFAULT_PYTHON_API_URL = process.env.PYTHON_API_URL || 'http://localhost:8000';
 export const DEFAULT_NODE_API_PORT = process.env.PORT || 3000;
+export const JOB_POLL_INTERVAL_MS = 1000; // 轮询 Python 异步任务状态的间隔
+export const JOB_REQUEST_TIMEOUT = 30000; // 单次提交/查询任务请求的超时（毫秒）
 
 // 判停策略默认值
 export const DEFAULT_HALTING_STRATEGY = 'RULE_BASED';
@@ -21,7 +21,7 @@ const PORT = process.env.PORT || 3000;
 
 // 中间件
 app.use(cors());
-app.use(express.json());
+app.use(express.json({ limit: '10mb' }));
 
 // 路由
 app.use('/api/experiments', experimentsRouter);
@@ -42,6 +42,23 @@ app.post('/api/internal/telemetry', (req, res) => {
   res.status(200).send('OK');
 });
 
+// 批量遥测转发 (StreamingEventHandler 默认使用该接口)
+// body: { events: [{ experimentId, type, payload, timestamp }, ...] }
+app.post('/api/internal/telemetry/batch', (req, res) => {
+  const events = Array.isArray(req.body?.events) ? req.body.events : [];
+  let accepted = 0;
+
+  for (const event of events) {
+    const { experimentId, type, payload, timestamp } = event || {};
+    if (experimentId && type && payload) {
+      broadcastEvent(experimentId, { type, payload, timestamp });
+      accepted += 1;
+    }
+  }
+
+  res.status(200).json({ accepted });
+});
+
 // 健康检查
 app.get('/health', (req, res) => {
   res.json({ status: 'healthy', service: 'node-api' });
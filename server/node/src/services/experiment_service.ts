@@ -5,7 +5,7 @@
 
 import { PrismaClient } from '@prisma/client';
 import axios from 'axios';
-import { DEFAULT_PYTHON_API_URL, DEFAULT_MAX_DEPTH, DEFAULT_MAX_NODES, DEFAULT_MAX_ITERATIONS } from '../config/constants';
+import { DEFAULT_PYTHON_API_URL, DEFAULT_MAX_DEPTH, DEFAULT_MAX_NODES, DEFAULT_MAX_ITERATIONS, JOB_POLL_INTERVAL_MS, JOB_REQUEST_TIMEOUT } from '../config/constants';
 import { logger } from '../utils/logger';
 
 const prisma = new PrismaClient();
@@ -88,8 +88,15 @@ export class ExperimentService {
         experiment_id: experimentId
       };
 
-      const response = await axios.post(`${PYTHON_API_URL}/api/v1/infer`, payload, { timeout: 300000 });
-      const result = response.data;
+      // 以异步任务提交并轮询结果，长时间推理不再受单个 HTTP 请求超时限制；
+      // 运行中每完成一个阶段即先行落库，结束时以最终结果中的同名阶段图替换
+      const persistedStages = new Set<string>();
+      const result = await this.runPythonJob(payload, async (stage, graph) => {
+        await prisma.experimentData.create({
+          data: { experimentId, category: 'graph', key: stage, value: safeStringify(graph) }
+        });
+        persistedStages.add(stage);
+      });
 
       // 1. 存储全量桶数据 (ExperimentData)
       const dataToCreate: any[] = [];
@@ -163,6 +170,11 @@ export class ExperimentService {
 
       await prisma.$transaction(async (tx) => {
         // 1. 存储全量桶数据 (ExperimentData)
+        if (persistedStages.size > 0) {
+          await tx.experimentData.deleteMany({
+            where: { experimentId, category: 'graph', key: { in: Array.from(persistedStages) } }
+          });
+        }
         if (dataToCreate.length > 0) {
           await tx.experimentData.createMany({ data: dataToCreate });
         }
@@ -230,6 +242,41 @@ export class ExperimentService {
     }
   }
 
+  /**
+   * 提交 Python 异步推理任务并轮询至结束，返回与 /infer 相同结构的结果。
+   * onStage：轮询中发现新完成的阶段时拉取其图快照并回调（失败只记日志，不影响任务）
+   */
+  private async runPythonJob(payload: any, onStage?: (stage: string, graph: any) => Promise<void>): Promise<any> {
+    const submit = await axios.post(`${PYTHON_API_URL}/api/v1/jobs`, payload, { timeout: JOB_REQUEST_TIMEOUT });
+    const jobId = submit.data.job_id;
+    const seenStages = new Set<string>();
+
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const { data: job } = await axios.get(`${PYTHON_API_URL}/api/v1/jobs/${jobId}`, { timeout: JOB_REQUEST_TIMEOUT });
+      if (onStage && job.status === 'running') {
+        for (const stage of (job.stages || []) as string[]) {
+          if (seenStages.has(stage)) continue;
+          seenStages.add(stage);
+          try {
+            const { data } = await axios.get(
+              `${PYTHON_API_URL}/api/v1/jobs/${jobId}/stages/${encodeURIComponent(stage)}`,
+              { timeout: JOB_REQUEST_TIMEOUT }
+            );
+            await onStage(stage, data.graph);
+          } catch (err: any) {
+            logger.warn(`Failed to persist stage ${stage} of job ${jobId}: ${err.message}`);
+          }
+        }
+      }
+      if (job.status === 'succeeded') return job.result;
+      if (job.status === 'cancelled') return job.result ?? { status: 'cancelled' };
+      if (job.status === 'failed') {
+        throw new Error(job.error?.message || `Job ${jobId} failed`);
+      }
+    }
+  }
+
   /**
    * 取消实验
    */
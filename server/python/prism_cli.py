@@ -6,7 +6,7 @@ from rich import print
 from rich.table import Table
 from rich.console import Console
 from rich.panel import Panel
-from typing import Optional
+from typing import List, Optional
 
 # Ensure project root is in sys.path
 # We assume this script is located at server/python/prism_cli.py
@@ -441,6 +441,173 @@ def run(
         console.print(f"[bold red]Error:[/bold red] Invalid JSON in {pipeline_file}.")
         raise typer.Exit(code=1)
 
+@app.command()
+def batch(
+    dataset_id: str = typer.Argument(..., help="Dataset ID (e.g. docred, fever)"),
+    split: str = typer.Argument(..., help="Dataset split (e.g. dev)"),
+    pipeline_file: Optional[Path] = typer.Option(None, "--pipeline", "-p", help="Pipeline JSON (orchestrator_id/components/component_params/parameters)"),
+    start: int = typer.Option(0, "--start", help="First sample index (inclusive)"),
+    end: Optional[int] = typer.Option(None, "--end", help="Last sample index (exclusive, defaults to split size)"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Parallel samples"),
+    executor: str = typer.Option("thread", "--executor", help="thread | process"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Output directory (re-use to resume)"),
+    shard_size: int = typer.Option(1000, "--shard-size", help="Samples per JSONL shard")
+):
+    """
+    Run a pipeline over a dataset split, writing sharded JSONL results.
+    Re-running with the same --output resumes from the completed samples.
+    """
+    import json
+    import threading
+    import time
+    from python_service.services.batch_runner import BatchConfig, BatchRunner
+
+    config = {}
+    if pipeline_file:
+        if not pipeline_file.exists():
+            console.print(f"[bold red]Error:[/bold red] File {pipeline_file} not found.")
+            raise typer.Exit(code=1)
+        config = json.loads(pipeline_file.read_text())
+
+    batch_config = BatchConfig(
+        dataset_id=dataset_id, split=split, start=start, end=end,
+        orchestrator=config.get("orchestrator_id") or config.get("orchestrator") or "dynamic_halting",
+        components=config.get("components", {}),
+        component_params=config.get("component_params", {}),
+        params=config.get("parameters") or config.get("params") or {},
+        api_key=config.get("api_key"),
+    )
+    try:
+        runner = BatchRunner(batch_config, output_dir=output, workers=workers, executor=executor, shard_size=shard_size)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    console.print(Panel(f"[bold]Dataset:[/bold] {dataset_id}/{split} [{start}, {end if end is not None else 'end'})\n"
+                        f"[bold]Orchestrator:[/bold] {batch_config.orchestrator}\n"
+                        f"[bold]Output:[/bold] {runner.output_dir}", title="Batch Run", border_style="blue"))
+
+    outcome = {}
+    worker = threading.Thread(target=lambda: outcome.update(runner.run()), daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(timeout=2.0)
+            p = runner.progress
+            done = p["skipped"] + p["succeeded"] + p["failed"]
+            console.print(f"[dim]{done}/{p['total']} done ({p['succeeded']} ok, {p['failed']} failed, {p['skipped']} resumed)[/dim]")
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopping after in-flight samples finish (re-run with the same --output to resume)...[/yellow]")
+        runner.cancel()
+        worker.join()
+
+    if not outcome:
+        console.print("[bold red]Batch run failed.[/bold red]")
+        raise typer.Exit(code=1)
+    p = outcome["progress"]
+    console.print(f"[bold green]✓ Batch {outcome['status']}[/bold green] → {outcome['output_dir']} "
+                  f"({p['succeeded']} ok, {p['failed']} failed, {p['skipped']} resumed)")
+
+@app.command("eval-docred")
+def eval_docred(
+    sweep_file: Path = typer.Argument(..., help="Sweep JSON: {split, start, end, configs: [{name, orchestrator_id, components, component_params, parameters}]}"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Parallel samples per config (1 keeps latency comparable)"),
+    output_root: Optional[Path] = typer.Option(None, "--output-root", "-o", help="Directory for per-config batch runs (re-use to resume)"),
+    graph_key: str = typer.Option("G_B", "--graph", help="Intermediate graph to score (falls back to the final graph)"),
+    metric: str = typer.Option("strict", "--metric", help="strict (relation must match) | pair (entity pair only)")
+):
+    """
+    Run each extraction config over a DocRED split, score it against the gold triples
+    and print a latency vs. F1 table with the Pareto front marked.
+    """
+    import json
+    from python_service.services.batch_runner import BatchConfig, BatchRunner, default_output_root
+    from python_service.services.docred_eval import evaluate_batch, pareto_table
+
+    if not sweep_file.exists():
+        console.print(f"[bold red]Error:[/bold red] File {sweep_file} not found.")
+        raise typer.Exit(code=1)
+    sweep = json.loads(sweep_file.read_text())
+    root = output_root or default_output_root() / f"eval-{sweep_file.stem}"
+
+    rows = []
+    for config in sweep.get("configs", []):
+        name = config["name"]
+        batch_config = BatchConfig(
+            dataset_id="docred", split=sweep.get("split", "dev"),
+            start=sweep.get("start", 0), end=sweep.get("end"),
+            orchestrator=config.get("orchestrator_id") or config.get("orchestrator") or "dynamic_halting",
+            components=config.get("components", {}),
+            component_params=config.get("component_params", {}),
+            params=config.get("parameters") or config.get("params") or {},
+            api_key=config.get("api_key"),
+        )
+        try:
+            with console.status(f"Running config [bold]{name}[/bold]..."):
+                BatchRunner(batch_config, output_dir=root / name, workers=workers).run()
+                scores = evaluate_batch(root / name, graph_key=graph_key)
+        except ValueError as e:
+            console.print(f"[bold red]Error ({name}):[/bold red] {e}")
+            raise typer.Exit(code=1)
+        rows.append({"name": name, "scores": scores})
+
+    table_rows = pareto_table(rows, metric=metric)
+    table = Table(title=f"DocRED {sweep.get('split', 'dev')} · latency vs. {metric} F1")
+    for column in ("Config", "p50 ms", "F1", "P", "R", "Failed", "Pareto"):
+        table.add_column(column)
+    for row in table_rows:
+        table.add_row(row["name"], str(row["latency_ms"]), f"{row['f1']:.4f}", f"{row['precision']:.4f}",
+                      f"{row['recall']:.4f}", str(row["failed"]), "★" if row["pareto"] else "")
+    console.print(table)
+
+    report = root / "pareto.json"
+    report.write_text(json.dumps({"table": table_rows, "scores": {r["name"]: r["scores"] for r in rows}}, indent=2))
+    console.print(f"[dim]Report written to {report}[/dim]")
+
+@app.command("fever-evidence")
+def fever_evidence(
+    dump: Optional[List[Path]] = typer.Option(None, "--dump", "-d", help="FEVER wiki-pages dump (directory or wiki-*.jsonl), repeatable"),
+    prefetch_split: Optional[str] = typer.Option(None, "--prefetch", help="Fetch the evidence pages referenced by this FEVER split"),
+    workers: int = typer.Option(8, "--workers", "-w", help="Parallel Wikipedia requests when prefetching"),
+    db: Optional[Path] = typer.Option(None, "--db", help="Evidence database path (defaults to modules.yaml evidence.fever_db)")
+):
+    """
+    Build the local FEVER evidence store: import a wiki-pages dump and/or prefetch pages for a split.
+    With PRISM_FEVER_OFFLINE=1 prefetch only reports how many pages are missing.
+    """
+    from python_service.services.evidence_store import EvidenceStore
+
+    store = EvidenceStore(db) if db else EvidenceStore()
+    if not dump and not prefetch_split:
+        console.print(store.stats())
+        return
+
+    if dump:
+        for path in dump:
+            if not path.exists():
+                console.print(f"[bold red]Error:[/bold red] {path} not found.")
+                raise typer.Exit(code=1)
+        with console.status("Importing wiki-pages dump...") as status:
+            count = store.import_dump(dump, progress=lambda n: status.update(f"Imported {n} page(s)..."))
+        console.print(f"[bold green]✓ Imported {count} page(s)[/bold green] → {store.path}")
+
+    if prefetch_split:
+        from python_service.services.dataset_service import DatasetService
+
+        svc = DatasetService()
+        try:
+            ds = svc._load_hf_split(svc.get_spec("fever"), prefetch_split)
+        except Exception as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            raise typer.Exit(code=1)
+        titles = [t for t in ds["evidence_wiki_url"] if t]
+        with console.status(f"Prefetching evidence for {len(set(titles))} page(s)..."):
+            report = store.prefetch(titles, workers=workers)
+        console.print(f"[bold green]✓ Prefetch[/bold green]: {report['missing']} missing, "
+                      f"{report['fetched']} fetched, {report['failed']} failed")
+        for title, error in list(report["errors"].items())[:10]:
+            console.print(f"[dim]  {title}: {error}[/dim]")
+
 @app.command()
 def logs(
     follow: bool = typer.Option(False, "--follow", "-f", help="Follow log output"),
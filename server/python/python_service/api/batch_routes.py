@@ -0,0 +1,103 @@
+"""
+Batch API
+
+数据集批量评测接口：
+- POST   /batches                    启动批量运行（指定 run_id 且输出目录已存在时续跑）
+- GET    /batches                    运行列表
+- GET    /batches/{run_id}           运行进度
+- GET    /batches/{run_id}/results   分页读取结果记录
+- DELETE /batches/{run_id}           停止提交新样本
+"""
+
+import itertools
+import re
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from python_service.services.batch_runner import (
+    BatchConfig, BatchRunner, DEFAULT_SHARD_SIZE, batch_registry, default_output_root, read_records,
+)
+from python_service.services.dataset_service import get_dataset_service
+
+router = APIRouter()
+
+# 单次批量运行的并发上限（每个 worker 为一个线程或一个加载全套模型的进程）
+MAX_WORKERS = 32
+
+
+class BatchRequest(BaseModel):
+    dataset_id: str
+    split: str
+    start: int = 0
+    end: Optional[int] = None
+    orchestrator: str = "dynamic_halting"
+    components: Dict[str, str] = {}
+    component_params: Dict[str, Any] = {}
+    params: Dict[str, Any] = {}
+    api_key: Optional[str] = None
+    run_id: Optional[str] = None
+    workers: int = Field(4, ge=1, le=MAX_WORKERS)
+    executor: Literal["thread", "process"] = "thread"
+    shard_size: int = Field(DEFAULT_SHARD_SIZE, ge=1)
+
+
+@router.post("/batches", status_code=202)
+async def start_batch(request: BatchRequest) -> Dict[str, Any]:
+    if request.run_id and not re.fullmatch(r"[A-Za-z0-9_-]+", request.run_id):
+        raise HTTPException(status_code=422, detail="run_id 只能包含字母、数字、- 和 _")
+    config = BatchConfig(
+        dataset_id=request.dataset_id, split=request.split, start=request.start, end=request.end,
+        orchestrator=request.orchestrator, components=request.components,
+        component_params=request.component_params, params=request.params, api_key=request.api_key,
+    )
+    output_dir = default_output_root() / request.run_id if request.run_id else None
+    try:
+        runner = BatchRunner(config, output_dir=output_dir, workers=request.workers,
+                             executor=request.executor, shard_size=request.shard_size,
+                             dataset_service=get_dataset_service())
+        batch_registry.start(runner)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"success": True, **runner.summary()}
+
+
+@router.get("/batches")
+async def list_batches() -> Dict[str, Any]:
+    return {"success": True, "runs": batch_registry.list_runs()}
+
+
+def _get_runner(run_id: str) -> BatchRunner:
+    runner = batch_registry.get(run_id)
+    if runner is None:
+        raise HTTPException(status_code=404, detail=f"Batch run not found: {run_id}")
+    return runner
+
+
+@router.get("/batches/{run_id}")
+async def get_batch(run_id: str) -> Dict[str, Any]:
+    return {"success": True, **_get_runner(run_id).summary()}
+
+
+@router.get("/batches/{run_id}/results")
+async def get_batch_results(
+    run_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    include_result: bool = Query(False, description="是否返回完整推理结果（可能很大）"),
+) -> Dict[str, Any]:
+    runner = _get_runner(run_id)
+    records = []
+    for record in itertools.islice(read_records(runner.output_dir), offset, offset + limit):
+        if not include_result:
+            record.pop("result", None)
+        records.append(record)
+    return {"success": True, "run_id": run_id, "offset": offset, "records": records}
+
+
+@router.delete("/batches/{run_id}")
+async def cancel_batch(run_id: str) -> Dict[str, Any]:
+    runner = _get_runner(run_id)
+    runner.cancel()
+    return {"success": True, "run_id": run_id, "status": "cancelling"}
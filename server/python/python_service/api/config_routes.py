@@ -4,11 +4,14 @@ API 路由 - 配置层 (Blind Version)
 """
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from typing import Dict, Any, List
 import os
 
 from python_service.core.engine import engine
 from python_service.services.lifecycle import warmer
+from python_service.core.pool import pools
+from python_service.core.cache import caches
 from python_service.config.loader import get_config
 
 router = APIRouter()
@@ -37,9 +40,37 @@ async def check_config():
 async def get_model_status():
     return {
         "success": True,
-        "status": warmer.get_status_report()
+        "status": warmer.get_status_report(),
+        "readiness": warmer.get_readiness_report(),
+        "settled": warmer.is_settled(),
+        "pools": pools.stats()
     }
 
+@router.get("/caches")
+async def get_cache_stats():
+    """进程内缓存的占用与命中统计"""
+    return {"success": True, **caches.stats()}
+
+@router.get("/isolation")
+async def get_isolation_stats():
+    """隔离执行 worker 池的状态、限额与终止统计"""
+    from python_service.services.isolation import get_isolated_pool, isolation_enabled
+    return {"success": True, "enabled": isolation_enabled(), **get_isolated_pool().stats()}
+
+@router.get("/llm/limits")
+async def get_llm_limits():
+    """LLM 调用共享限流器（按 base_url/model）的限额、用量、重试与排队等待统计"""
+    from kgforge.utils.llm_limiter import limiter_stats
+    return {"success": True, "limiters": limiter_stats()}
+
+@router.get("/models/status/{category}/{name}")
+async def get_component_readiness(category: str, name: str):
+    """单组件就绪探针：就绪返回 200，否则 503"""
+    probe = warmer.get_readiness_report().get(category, {}).get(name)
+    if probe is None:
+        return JSONResponse(status_code=404, content={"success": False, "error": f"{category}/{name} is not scheduled for warm-up"})
+    return JSONResponse(status_code=200 if probe["ready"] else 503, content={"success": probe["ready"], **probe})
+
 @router.get("/models/catalog")
 async def get_catalog():
     return {
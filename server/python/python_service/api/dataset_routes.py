@@ -12,13 +12,13 @@ DataSet API
 """
 
 from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from python_service.services.dataset_service import DatasetService
+from python_service.services.dataset_service import get_dataset_service
 from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
-svc = DatasetService()
+svc = get_dataset_service()
 
 
 @router.get("/datasets")
@@ -42,12 +42,22 @@ async def list_samples(
     split: str = Query("train", description="split，如 train/dev/test 或 DocRED 的 train_annotated/dev/test"),
     page: int = Query(1, ge=1, description="页码（从1开始）"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
+    sort_by: Optional[str] = Query(None, description="排序字段：index/context_length/sentence_count/entity_count/relation_count"),
+    descending: bool = Query(False, description="是否降序"),
+    min_length: Optional[int] = Query(None, ge=0, description="context 最小长度"),
+    max_length: Optional[int] = Query(None, ge=0, description="context 最大长度"),
+    label: Optional[str] = Query(None, description="按标签过滤（如 SUPPORTS）"),
 ):
     try:
         # 大文件读取/解析放到 threadpool，避免阻塞事件循环造成“看似卡死”
-        return await run_in_threadpool(svc.list_samples_preview, dataset_id, split, page, page_size)
+        return await run_in_threadpool(
+            svc.list_samples_preview, dataset_id, split, page, page_size,
+            sort_by, descending, min_length, max_length, label,
+        )
     except KeyError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except RuntimeError as e:
@@ -0,0 +1,137 @@
+"""
+Job API
+
+异步推理任务接口：
+- POST   /jobs               提交任务（立即返回 job_id）
+- GET    /jobs               任务列表与队列指标
+- GET    /jobs/{job_id}      任务状态（结束后包含结果）
+- GET    /jobs/{job_id}/events  SSE 进度流（状态变化 + 实验日志 + 阶段完成）
+- GET    /jobs/{job_id}/stages/{stage}  阶段图快照（运行中即可读取，用于逐阶段持久化）
+- DELETE /jobs/{job_id}      取消任务
+- POST   /jobs/{job_id}/resume  从最后一个检查点继续已中断的任务（沿用同一 job_id）
+- GET    /checkpoints        现存的运行检查点
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from pydantic import BaseModel
+
+from python_service.api.routes import InferenceRequest
+from python_service.services.checkpoints import get_checkpoint_store
+from python_service.services.jobs import job_manager
+
+router = APIRouter()
+
+# SSE 心跳间隔（秒）：期间无事件时发送注释行，防止代理断开空闲连接
+SSE_KEEPALIVE = 15.0
+
+
+class JobRequest(InferenceRequest):
+    priority: int = 0
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest) -> Dict[str, Any]:
+    payload = request.dict()
+    priority = payload.pop("priority")
+    job = job_manager.submit(payload, priority=priority)
+    return {"success": True, "job_id": job.job_id, "status": job.status}
+
+
+class ResumeRequest(BaseModel):
+    api_key: Optional[str] = None
+    priority: int = 0
+
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_job(job_id: str, request: Optional[ResumeRequest] = None) -> Dict[str, Any]:
+    """按检查点附带的原始请求重新提交；api_key 不落盘，需要时随本请求提供"""
+    request = request or ResumeRequest()
+    job = job_manager.get(job_id)
+    if job is not None and not job.done:
+        raise HTTPException(status_code=409, detail=f"Job still running: {job_id}")
+    store = get_checkpoint_store()
+    meta = store.load_meta(job_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"No checkpoint for job: {job_id}")
+    payload = {**meta, "api_key": request.api_key, "experiment_id": job_id, "resume": True}
+    job = job_manager.submit(payload, priority=request.priority)
+    return {"success": True, "job_id": job.job_id, "status": job.status,
+            "checkpoint": store.path(job_id).exists()}
+
+
+@router.get("/checkpoints")
+async def list_checkpoints() -> Dict[str, Any]:
+    return {"success": True, "checkpoints": get_checkpoint_store().list()}
+
+
+@router.get("/jobs")
+async def list_jobs() -> Dict[str, Any]:
+    return {"success": True, "jobs": job_manager.list_jobs(), "stats": job_manager.stats()}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, include_result: bool = Query(True, description="任务结束后是否返回完整结果")) -> Dict[str, Any]:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"success": True, **job.to_dict(include_result=include_result and job.done)}
+
+
+@router.get("/jobs/{job_id}/stages/{stage}")
+async def get_job_stage(job_id: str, stage: str) -> Dict[str, Any]:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    graph = job.get_stage(stage)
+    if graph is None:
+        raise HTTPException(status_code=404, detail=f"Stage not found: {stage}")
+    return {"success": True, "job_id": job_id, "stage": stage, "graph": graph}
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    if job_manager.cancel(job_id):
+        return {"success": True, "job_id": job_id, "status": "cancelling"}
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return {"success": False, "job_id": job_id, "status": job.status, "message": "Job already finished"}
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, after: Optional[int] = Query(None, description="从该序号之后开始推送")):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    # 支持 EventSource 断线重连携带的 Last-Event-ID
+    last_seq = after if after is not None else int(request.headers.get("last-event-id", 0) or 0)
+
+    async def event_source():
+        nonlocal last_seq
+        while True:
+            events = await run_in_threadpool(job_manager.wait_events, job_id, last_seq, SSE_KEEPALIVE)
+            for event in events:
+                last_seq = event["seq"]
+                yield _sse(event)
+            current = job_manager.get(job_id)
+            if current is None or (current.done and not events):
+                yield f"event: end\ndata: {json.dumps({'job_id': job_id, 'status': current.status if current else 'unknown'})}\n\n"
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+            if await request.is_disconnected():
+                return
+
+    return StreamingResponse(event_source(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
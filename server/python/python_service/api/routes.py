@@ -3,13 +3,20 @@ API 路由 - 推理执行 (Concurrency Optimized)
 使用 run_in_threadpool 避免 GIL 的尴尬，防止卡死 Event Loop。
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import uuid
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+# SSE 心跳间隔（秒）
+STREAM_KEEPALIVE = 15.0
+
 class InferenceRequest(BaseModel):
     goal: str
     text: str
@@ -19,6 +26,10 @@ class InferenceRequest(BaseModel):
     params: Dict[str, Any] = {}
     api_key: Optional[str] = None
     experiment_id: Optional[str] = None
+    # 只能主动开启隔离；配置或 PRISM_ISOLATION 已开启时无法通过 false 关闭
+    isolated: bool = False
+    # 从 experiment_id 的检查点继续（动态判停编排器每轮迭代后写入）
+    resume: bool = False
 
 @router.post("/infer")
 async def infer(request: InferenceRequest):
@@ -41,7 +52,9 @@ async def infer(request: InferenceRequest):
             component_params=request.component_params,
             params=request.params,
             api_key=request.api_key,
-            experiment_id=request.experiment_id
+            experiment_id=request.experiment_id,
+            isolated=request.isolated,
+            resume=request.resume
         )
         return result
         return result
@@ -55,6 +68,82 @@ async def infer(request: InferenceRequest):
         print(f"Error in inference API: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse_frame(seq: int, event: str, data: Any) -> str:
+    return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/infer/stream")
+async def infer_stream(request: InferenceRequest, http_request: Request):
+    """
+    流式推理（SSE）：编排器每记录一个阶段图即推送 stage 事件（相对已发阶段的差量或全量），
+    结束时推送 result（不含 intermediate_graphs，阶段图已随 stage 事件发出）或 error，最后是 end。
+    客户端断开时取消推理。
+    """
+    from python_service.core.errors import PrismError
+    from python_service.schemas.graph_schema import StageStreamEncoder
+    from python_service.services.inference import InferenceEngine
+
+    engine = InferenceEngine()
+    experiment_id = request.experiment_id or uuid.uuid4().hex
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    encoder = StageStreamEncoder()
+
+    def on_stage(stage: str, graph) -> None:
+        # 在编排线程中序列化，得到该时刻的快照（编排器之后可能继续原地修改该图）
+        loop.call_soon_threadsafe(events.put_nowait, ("stage", encoder.encode(stage, graph)))
+
+    def on_done(task: "asyncio.Future") -> None:
+        if task.cancelled():
+            events.put_nowait(("error", {"code": "CANCELLED", "message": "Inference cancelled"}))
+        elif task.exception() is not None:
+            e = task.exception()
+            error = e.to_dict()["error"] if isinstance(e, PrismError) else {"code": "INTERNAL_ERROR", "message": str(e)}
+            events.put_nowait(("error", error))
+        else:
+            events.put_nowait(("result", task.result()))
+
+    task = asyncio.ensure_future(run_in_threadpool(
+        engine.run_dynamic,
+        goal=request.goal,
+        text=request.text,
+        orchestrator=request.orchestrator,
+        components=request.components,
+        component_params=request.component_params,
+        params=request.params,
+        api_key=request.api_key,
+        experiment_id=experiment_id,
+        on_stage=on_stage,
+        include_intermediate=False,
+        isolated=request.isolated,
+        resume=request.resume,
+    ))
+    task.add_done_callback(on_done)
+
+    async def event_source():
+        seq = 0
+        try:
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(events.get(), STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                seq += 1
+                yield _sse_frame(seq, kind, data)
+                if kind in ("result", "error"):
+                    yield _sse_frame(seq + 1, "end", {"experiment_id": experiment_id})
+                    return
+        finally:
+            if not task.done():
+                engine.cancel_task(experiment_id)
+
+    return StreamingResponse(event_source(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no",
+                                      "X-Experiment-Id": experiment_id})
+
 @router.post("/cancel/{experiment_id}")
 async def cancel_task(experiment_id: str):
     """
@@ -62,8 +151,10 @@ async def cancel_task(experiment_id: str):
     """
     try:
         from python_service.services.inference import InferenceEngine
+        from python_service.services.jobs import job_manager
         engine = InferenceEngine()
-        success = engine.cancel_task(experiment_id)
+        # 以任务方式提交的实验（含仍在排队的）优先经由任务管理器取消
+        success = job_manager.cancel(experiment_id) or engine.cancel_task(experiment_id)
         if success:
             return {"status": "cancelled", "experiment_id": experiment_id}
         else:
@@ -71,6 +162,12 @@ async def cancel_task(experiment_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/telemetry/stats")
+async def telemetry_stats():
+    """遥测转发的背压指标（缓冲水位、丢弃数、批次成功/失败数）"""
+    from python_service.core.logging import get_telemetry_stats
+    return {"success": True, "handlers": get_telemetry_stats()}
+
 @router.get("/health")
 async def health():
     return {"status": "healthy", "service": "v2-async-safe"}
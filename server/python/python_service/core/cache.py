@@ -0,0 +1,171 @@
+"""
+Sized LRU Cache
+进程内缓存的统一实现：按条目近似字节数与条目数做 LRU 淘汰，并统计命中/未命中/淘汰。
+各缓存的上限取自 modules.yaml 的 cache 段，长期运行的服务因此保持在固定的内存包络内。
+
+- 条目大小由调用方给出（已知结构，如 numpy 列、偏移数组）或由 approx_size 采样估算
+- 单个条目超过缓存上限时不入缓存（rejected），调用方照常使用该值
+- 淘汰只是移出缓存，不关闭资源：仍在使用的引用不受影响，由 GC 回收
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from kgforge import get_logger
+from python_service.config.loader import get_config
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_MB = 256
+# 容器估算时抽样的元素数
+SIZE_SAMPLE = 32
+_MISSING = object()
+
+
+def approx_size(obj: Any, sample: int = SIZE_SAMPLE, _depth: int = 0) -> int:
+    """近似的深层字节数：容器抽样前 sample 个元素后按长度外推，带 nbytes 的对象（numpy/arrow）直接取 nbytes"""
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj)
+    if _depth > 6 or isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        n = len(obj)
+        if n:
+            items = list(obj.items())[:sample]
+            part = sum(approx_size(k, sample, _depth + 1) + approx_size(v, sample, _depth + 1) for k, v in items)
+            size += part * n // len(items)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        n = len(obj)
+        if n:
+            items = list(obj)[:sample] if not isinstance(obj, (list, tuple)) else obj[:sample]
+            size += sum(approx_size(x, sample, _depth + 1) for x in items) * n // len(items)
+    return size
+
+
+class SizedLRUCache:
+    """按近似字节数与条目数限额的线程安全 LRU 缓存"""
+
+    def __init__(self, name: str, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None) -> Any:
+        """写入并按需淘汰最久未使用的条目；返回 value 以便链式使用"""
+        size = approx_size(value) if size is None else int(size)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                self._rejected += 1
+                logger.warning(f"Cache {self.name}: entry {key!r} ({size >> 20} MB) exceeds limit, not cached")
+                return value
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._data and self._over_limit():
+                evicted_key, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+                logger.debug(f"Cache {self.name}: evicted {evicted_key!r}")
+        return value
+
+    def get_or_put(self, key: Hashable, factory: Callable[[], Any], sizer: Optional[Callable[[Any], int]] = None) -> Any:
+        """命中直接返回，否则调用 factory 生成并写入（factory 在锁外执行，并发时可能重复生成）"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = factory()
+        return self.put(key, value, size=sizer(value) if sizer else None)
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and len(self._data) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "rejected": self._rejected,
+        }
+
+
+class CacheRegistry:
+    """命名缓存的注册表（上限取自 modules.yaml 的 cache 段）"""
+
+    def __init__(self):
+        self._caches: Dict[str, SizedLRUCache] = {}
+        self._lock = threading.Lock()
+
+    def get_cache(self, name: str) -> SizedLRUCache:
+        cache = self._caches.get(name)
+        if cache is None:
+            with self._lock:
+                cache = self._caches.get(name)
+                if cache is None:
+                    config = get_config().get("cache") or {}
+                    limits = (config.get("limits") or {}).get(name) or {}
+                    max_mb = limits.get("max_mb", config.get("default_max_mb", DEFAULT_MAX_MB))
+                    max_entries = limits.get("max_entries")
+                    cache = self._caches[name] = SizedLRUCache(
+                        name,
+                        max_bytes=int(float(max_mb) * (1 << 20)) if max_mb is not None else None,
+                        max_entries=int(max_entries) if max_entries is not None else None,
+                    )
+        return cache
+
+    def stats(self) -> Dict[str, Any]:
+        caches = {name: cache.stats() for name, cache in list(self._caches.items())}
+        return {"total_bytes": sum(s["bytes"] for s in caches.values()), "caches": caches}
+
+
+# 单例
+caches = CacheRegistry()
@@ -1,5 +1,6 @@
 from contextvars import ContextVar
 from typing import Optional
+from kgforge.utils.llm_metrics import LLMUsage
 
 # Context variable to store the current experiment ID
 experiment_id_ctx: ContextVar[Optional[str]] = ContextVar("experiment_id", default=None)
@@ -7,11 +8,14 @@ experiment_id_ctx: ContextVar[Optional[str]] = ContextVar("experiment_id", defau
 current_stats_ctx: ContextVar[Optional[dict]] = ContextVar("current_stats", default=None)
 # Context variable to store logs for the current experiment
 current_logs_ctx: ContextVar[Optional[list]] = ContextVar("current_logs", default=None)
+# Context variable to accumulate LLM token/latency usage for the current experiment
+current_llm_usage_ctx: ContextVar[Optional[LLMUsage]] = ContextVar("current_llm_usage", default=None)
 
 def set_experiment_id(exp_id: str):
     experiment_id_ctx.set(exp_id)
     current_stats_ctx.set({}) # Initialize empty stats
     current_logs_ctx.set([]) # Initialize empty logs
+    current_llm_usage_ctx.set(LLMUsage())
 
 def get_experiment_id() -> Optional[str]:
     return experiment_id_ctx.get()
@@ -20,6 +24,7 @@ def clear_experiment_id():
     experiment_id_ctx.set(None)
     current_stats_ctx.set(None)
     current_logs_ctx.set(None)
+    current_llm_usage_ctx.set(None)
 
 def update_current_stats(new_stats: dict):
     stats = current_stats_ctx.get()
@@ -36,3 +41,6 @@ def append_current_log(log_entry: dict):
 
 def get_current_logs() -> list:
     return current_logs_ctx.get() or []
+
+def get_current_llm_usage() -> Optional[LLMUsage]:
+    return current_llm_usage_ctx.get()
@@ -1,24 +1,36 @@
+import copy
 import importlib
 import inspect
-import pkgutil
+import os
 import sys
-from typing import Dict, List, Any, Type, Optional
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Type, Optional, Iterator, Tuple
 from kgforge.protocols import IDescribable
 from kgforge.protocols.interfaces import META_REGISTRY, IPreloadable
+from python_service.core.spec_index import SpecIndex, StaticIntrospector, resolve_index_path
 
 class ComponentEngine:
     """
     PRISM 组件引擎 (SSOT Engine)
     统一管理扫描、发现、ID解析与动态工厂生成。
+
+    扫描基于持久化的 Spec 索引：未变化的文件直接复用缓存，变化的文件优先 AST 静态自省，
+    仅在无法静态确定时才 import 模块。
     """
-    
-    def __init__(self):
+
+    def __init__(self, index_path: Optional[Path] = None):
         self._categories = {}
         self._class_cache: Dict[str, Type] = {}
         self._spec_cache: Dict[str, List[Dict[str, Any]]] = {}
         self._category_map = {} # Interface Name -> Category
-        
+        self._lock = threading.RLock()
+        # 组件目录每次变化（新增/删除/修改 Spec 或热重载）递增，供下游缓存判断失效
+        self.generation = 0
+
         self._initialize_protocols()
+        self._index = SpecIndex(index_path if index_path is not None else resolve_index_path())
+        self._introspector = StaticIntrospector(self._categories)
 
     def _initialize_protocols(self):
         """从核心协议定义初始化映射关系"""
@@ -27,53 +39,108 @@ class ComponentEngine:
                 self._categories[p.category] = p
                 self._category_map[p.__name__] = p.category
 
-    def scan_all(self) -> Dict[str, List[Dict[str, Any]]]:
-        """全量扫描物理组件包并导出 Spec 蓝图"""
-        results = {cat: [] for cat in self._categories}
-        
+    def _iter_component_files(self) -> Iterator[Tuple[str, str]]:
+        """
+        按 pkgutil.walk_packages 的顺序遍历组件源文件，产出 (module_name, file_path)。
+        直接遍历文件系统，不 import 任何包。
+        """
         import kgforge.components as components_pkg
-        pkg_path = components_pkg.__path__
-        
-        # 递归扫描
-        for _, module_name, _ in pkgutil.walk_packages(pkg_path, components_pkg.__name__ + "."):
-            if any(part in module_name.split('.') for part in ['utils', 'base']):
-                continue
-                
+
+        def walk(directory: str, prefix: str):
             try:
-                module = importlib.import_module(module_name)
-                for _, obj in inspect.getmembers(module, inspect.isclass):
-                    # 必须是本项目定义的类，且是非抽象的 IDescribable
-                    if obj.__module__ != module_name: continue
-                    if issubclass(obj, IDescribable) and not inspect.isabstract(obj):
-                        # 分类归属
-                        for cat, interface in self._categories.items():
-                            if issubclass(obj, interface):
-                                spec = obj.get_component_spec()
-                                spec["class_path"] = f"{module_name}.{obj.__name__}"
-                                spec["can_preload"] = issubclass(obj, IPreloadable)
-                                
-                                # 针对编排器提取插槽信息
-                                if cat == "orchestrators" and hasattr(obj, "get_required_slots"):
-                                    spec["slots"] = obj.get_required_slots()
-                                
-                                if not any(existing["id"] == spec["id"] for existing in results[cat]):
-                                    results[cat].append(spec)
-                                break
-            except Exception:
-                continue
-        
-        self._spec_cache = results
-        return results
+                entries = sorted(os.listdir(directory))
+            except OSError:
+                return
+            for entry in entries:
+                path = os.path.join(directory, entry)
+                if entry.endswith(".py") and entry != "__init__.py" and os.path.isfile(path):
+                    yield prefix + entry[:-3], path
+                elif os.path.isdir(path) and os.path.isfile(os.path.join(path, "__init__.py")) and entry.isidentifier():
+                    yield prefix + entry, os.path.join(path, "__init__.py")
+                    yield from walk(path, prefix + entry + ".")
+
+        for pkg_dir in components_pkg.__path__:
+            for module_name, path in walk(pkg_dir, components_pkg.__name__ + "."):
+                if any(part in module_name.split('.') for part in ['utils', 'base']):
+                    continue
+                yield module_name, path
+
+    def _import_specs(self, module_name: str) -> List[Dict[str, Any]]:
+        """回退路径：import 模块并通过反射导出 Spec"""
+        specs = []
+        module = importlib.import_module(module_name)
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            # 必须是本项目定义的类，且是非抽象的 IDescribable
+            if obj.__module__ != module_name: continue
+            if issubclass(obj, IDescribable) and not inspect.isabstract(obj):
+                # 分类归属
+                for cat, interface in self._categories.items():
+                    if issubclass(obj, interface):
+                        spec = obj.get_component_spec()
+                        spec["class_path"] = f"{module_name}.{obj.__name__}"
+                        spec["can_preload"] = issubclass(obj, IPreloadable)
+
+                        # 针对编排器提取插槽信息
+                        if cat == "orchestrators" and hasattr(obj, "get_required_slots"):
+                            spec["slots"] = obj.get_required_slots()
+                        specs.append({"category": cat, "spec": spec})
+                        break
+        return specs
+
+    def _introspect(self, module_name: str, path: str, source: bytes) -> Dict[str, Any]:
+        specs = self._introspector.specs(module_name, source)
+        if specs is not None:
+            return self._index.put(path, module_name, source, specs, method="static")
+        try:
+            return self._index.put(path, module_name, source, self._import_specs(module_name), method="import")
+        except Exception as e:
+            return self._index.put(path, module_name, source, [], method="import", error=f"{type(e).__name__}: {e}")
+
+    def scan_all(self, force: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        扫描物理组件包并导出 Spec 蓝图（增量）
+        Args:
+            force: 忽略索引，重新自省所有文件
+        """
+        with self._lock:
+            if force:
+                self._index.clear()
+
+            results = {cat: [] for cat in self._categories}
+            live_paths = set()
+            for module_name, path in self._iter_component_files():
+                live_paths.add(path)
+                try:
+                    entry, source = self._index.lookup(path, module_name)
+                except OSError:
+                    continue
+                if entry is None:
+                    entry = self._introspect(module_name, path, source)
+
+                for item in entry["specs"]:
+                    bucket = results.get(item["category"])
+                    if bucket is None:
+                        continue
+                    if not any(existing["id"] == item["spec"]["id"] for existing in bucket):
+                        bucket.append(item["spec"])
+
+            self._index.prune(live_paths)
+            self._index.save()
+            if results != self._spec_cache:
+                self.generation += 1
+            self._spec_cache = results
+            # 调用方可能修改返回值，索引中的条目保持只读
+            return copy.deepcopy(results)
 
     def get_class(self, category: str, component_id: str) -> Optional[Type]:
         """根据类别和 ID 加载类对象"""
         cache_key = f"{category}.{component_id}"
         if cache_key in self._class_cache:
             return self._class_cache[cache_key]
-            
+
         if not self._spec_cache:
             self.scan_all()
-            
+
         for spec in self._spec_cache.get(category, []):
             if spec["id"] == component_id:
                 path_parts = spec["class_path"].split(".")
@@ -98,29 +165,34 @@ class ComponentEngine:
     def reload_module(self, module_name: str):
         """
         动态重载模块 (Hot-Reload)
-        
+
         策略：
         1. 从 sys.modules 移除目标模块
         2. 清除相关类的缓存 (_class_cache)
-        3. 重新扫描注册表 (触发重新 import 和自省)
+        3. 仅重新自省该模块对应的文件并更新索引，其余文件按指纹复用
         """
-        # 1. Evict from sys.modules
-        if module_name in sys.modules:
-            del sys.modules[module_name]
-        
-        # 2. Clear internal caches
-        # 我们需要清除使用了该 module 的所有缓存条目
-        keys_to_remove = []
-        for key, cls in self._class_cache.items():
-            if cls.__module__ == module_name:
-                keys_to_remove.append(key)
-        
-        for k in keys_to_remove:
-            del self._class_cache[k]
-            
-        # 3. Force Re-scan to update Specs
-        # TODO: 优化为增量扫描？目前为了安全起见全量扫描
-        self.scan_all()
+        with self._lock:
+            # 1. Evict from sys.modules
+            if module_name in sys.modules:
+                del sys.modules[module_name]
+
+            # 2. Clear internal caches
+            # 我们需要清除使用了该 module 的所有缓存条目
+            keys_to_remove = []
+            for key, cls in self._class_cache.items():
+                if cls.__module__ == module_name:
+                    keys_to_remove.append(key)
+
+            for k in keys_to_remove:
+                del self._class_cache[k]
+            self.generation += 1
+
+            # 3. 失效该文件的索引条目，增量扫描只会重新自省它
+            for name, path in self._iter_component_files():
+                if name == module_name:
+                    self._index.invalidate(path)
+                    break
+            self.scan_all()
         return True
 
 # 单例入口
@@ -41,7 +41,17 @@ class PrismNetworkError(PrismError):
     def __init__(self, message: str = "Network error", details: Optional[Any] = None):
         super().__init__(message, code="NETWORK_ERROR", status_code=503, details=details)
 
+class PrismCapacityError(PrismError):
+    """No pooled component instance became free in time"""
+    def __init__(self, message: str = "Component capacity exhausted", details: Optional[Any] = None):
+        super().__init__(message, code="CAPACITY_EXHAUSTED", status_code=503, details=details)
+
 class PrismValidationError(PrismError):
     """Invalid input parameters"""
     def __init__(self, message: str = "Validation failed", details: Optional[Any] = None):
         super().__init__(message, code="VALIDATION_ERROR", status_code=422, details=details)
+
+class PrismResourceLimitError(PrismError):
+    """Isolated pipeline exceeded its memory / CPU / wall-time limit"""
+    def __init__(self, message: str = "Resource limit exceeded", details: Optional[Any] = None):
+        super().__init__(message, code="RESOURCE_LIMIT", status_code=422, details=details)
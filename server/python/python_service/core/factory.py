@@ -1,74 +1,82 @@
 """
 Unified Factory (Thread-Safe Version)
-引入“影子实例”机制，解决预热单例在多任务并发时的状态污染问题。
+预热组件通过实例池按请求独占借出，带参数时在借出实例上叠加私有配置层，解决并发时的状态污染问题。
 """
 
 import copy
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Type
 from .engine import engine
 from .capability import CapabilityManager
+from .pool import pools
 from kgforge import get_logger
+from kgforge.utils.profiling import profile_span
 
 logger = get_logger(__name__)
 
+# 构建计划：(组件类, ((插槽名, 子类别, 默认组件 ID), ...))
+_Plan = Tuple[Type, Tuple[Tuple[str, str, Optional[str]], ...]]
+
 class UnifiedFactory:
     """
     统一工厂
     """
+
+    # (category, name) -> (engine.generation, 构建计划)
+    _plans: Dict[Tuple[str, str], Tuple[int, _Plan]] = {}
     
     @classmethod
     def create_component(cls, category: str, name: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        # 递归创建会自然形成嵌套 Span，对应插槽树结构
+        with profile_span(f"factory.{category}.{name}"):
+            return cls._create_component(category, name, params)
+
+    @classmethod
+    def _create_component(cls, category: str, name: str, params: Optional[Dict[str, Any]] = None) -> Any:
         params = (params or {}).copy()
         
-        # --- Stage 1: 预热缓存与影子化 ---
+        # --- Stage 1: 预热实例池与配置覆盖 ---
+        # 组件仍在预热中时等待其就绪，而不是重复加载一份权重
         from python_service.services.lifecycle import warmer
-        base_instance = warmer.get_instance(category, name)
+        base_instance = warmer.acquire(category, name)
         
         if base_instance:
+            # 请求级 lease 内：从实例池独占借出一个成员，lease 结束时归还
+            pooled = pools.checkout(f"{category}.{name}", lambda: cls._build_pool_member(category, name), seed=base_instance)
+            if pooled is None:
+                # 无 lease（如脚本直接调用）：沿用共享单例
+                pooled = base_instance
+
             if not params:
-                # 如果没有新参数，直接复用单例（最快路径）
-                return base_instance
+                # 如果没有新参数，直接复用借出的实例（最快路径）
+                return pooled
             
-            # 核心修复：如果存在新参数，坚决不修改单例原件
-            # 通过浅拷贝创建一个影子实例 (Shadow Instance)
-            # 这样：配置是私有的，但底层的重型资源（如权重、连接）是共享的
-            logger.info(f"Creating shadow instance for preloaded {category}.{name} to avoid state pollution.")
-            instance = copy.copy(base_instance)
+            # 如果存在新参数，坚决不修改池中成员
+            # 通过浅拷贝创建一个请求私有的配置覆盖层：配置是私有的，底层的重型资源由借出的成员独占提供
+            logger.info(f"Creating config overlay for preloaded {category}.{name} to avoid state pollution.")
+            instance = copy.copy(pooled)
             
             spec = instance.get_component_spec() if hasattr(instance, "get_component_spec") else {}
             if "Configurable" in spec.get("capabilities", []):
                 try:
                     CapabilityManager.enforce(instance, "Configurable", params)
                 except Exception as e:
-                    logger.warning(f"Failed to apply local config to shadow {category}.{name}: {e}")
+                    logger.warning(f"Failed to apply local config to overlay {category}.{name}: {e}")
             return instance
             
-        # --- Stage 2: 动态加载 ---
-        comp_class = engine.get_class(category, name)
-        if comp_class is None:
-            raise ValueError(f"Unknown component: {category}/{name}")
-            
-        # --- Stage 3: 递归解决插槽 (保持原有逻辑) ---
-        spec = comp_class.get_component_spec() if hasattr(comp_class, "get_component_spec") else {}
-        slots = spec.get("slots", {})
-        
-        if slots:
-            for slot_name, interface_name in slots.items():
-                slot_value = params.get(slot_name)
-                comp_id = slot_value if isinstance(slot_value, str) else None
-                child_cat = engine.resolve_category(interface_name)
-                
-                if comp_id is None and child_cat:
-                     available = engine.list_ids(child_cat)
-                     if available:
-                         comp_id = available[0]
-
-                if comp_id and child_cat:
-                    child_params = params.get(f"{slot_name}_params", {})
-                    params[slot_name] = cls.create_component(child_cat, comp_id, params=child_params)
-            
-            # 清理递归注入参数
-            for slot_name in slots: params.pop(f"{slot_name}_params", None)
+        # --- Stage 2: 动态加载（编译后的构建计划按组件缓存） ---
+        comp_class, slot_plan = cls._get_plan(category, name)
+
+        # --- Stage 3: 递归解决插槽 ---
+        for slot_name, child_cat, default_id in slot_plan:
+            slot_value = params.get(slot_name)
+            comp_id = slot_value if isinstance(slot_value, str) else default_id
+
+            if comp_id:
+                child_params = params.get(f"{slot_name}_params", {})
+                params[slot_name] = cls.create_component(child_cat, comp_id, params=child_params)
+
+        # 清理递归注入参数
+        for slot_name, _, _ in slot_plan: params.pop(f"{slot_name}_params", None)
 
         # --- Stage 4: 实例化 (新建实例天然安全) ---
         try:
@@ -77,6 +85,48 @@ class UnifiedFactory:
             logger.error(f"Failed to instantiate {category}.{name}: {e}")
             raise RuntimeError(f"Instantiation error [{category}.{name}]: {e}") from e
 
+    @classmethod
+    def _get_plan(cls, category: str, name: str) -> _Plan:
+        """
+        编译并缓存组件的构建计划
+        只依赖组件目录，按 engine.generation 失效（热重载或目录变化后重新编译）
+        """
+        key = (category, name)
+        cached = cls._plans.get(key)
+        if cached is not None and cached[0] == engine.generation:
+            return cached[1]
+
+        comp_class = engine.get_class(category, name)
+        if comp_class is None:
+            raise ValueError(f"Unknown component: {category}/{name}")
+
+        spec = comp_class.get_component_spec() if hasattr(comp_class, "get_component_spec") else {}
+        slot_plan = []
+        for slot_name, interface_name in (spec.get("slots") or {}).items():
+            child_cat = engine.resolve_category(interface_name)
+            if not child_cat:
+                continue
+            available = engine.list_ids(child_cat)
+            slot_plan.append((slot_name, child_cat, available[0] if available else None))
+
+        plan = (comp_class, tuple(slot_plan))
+        cls._plans[key] = (engine.generation, plan)
+        return plan
+
+    @classmethod
+    def _build_pool_member(cls, category: str, name: str) -> Any:
+        """为实例池构建并预热一个新成员（绕过预热缓存，直接进入 Stage 2）"""
+        from python_service.services.lifecycle import warmer
+        with warmer.bypass():
+            instance = cls.create_component(category, name)
+        CapabilityManager.enforce(instance, "Preloadable")
+        return instance
+
+    @classmethod
+    def lease(cls):
+        """请求级实例租约：with 块内创建的预热组件从实例池独占借出，退出时归还"""
+        return pools.lease()
+
     def __class_getitem__(cls, category: str):
         return type(f"{category.capitalize()}Factory", (), {
             "create": staticmethod(lambda name, params=None: cls.create_component(category, name, params))
@@ -2,28 +2,79 @@ import logging
 import requests
 import os
 import threading
-from queue import Queue
-from python_service.core.context import get_experiment_id
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from python_service.core.context import get_experiment_id, append_current_log
+
+# 已创建的处理器（用于 /telemetry/stats 汇总背压指标）
+_HANDLERS: List["StreamingEventHandler"] = []
+
 
 class StreamingEventHandler(logging.Handler):
     """
     流式事件处理器
     将日志和结构化遥测数据转发给 Node.js 后端进行 WebSocket 广播。
-    统一使用 /api/internal/telemetry 接口。
+
+    - 有界环形缓冲：缓冲区满时丢弃最旧的事件并计数，Node 不可用时内存不会无限增长
+    - 批量发送：累计 batch_size 条或距上次发送超过 flush_interval 秒即发送一批
+    - 连接复用：keep-alive 的 requests.Session
+    - 批量接口：POST /api/internal/telemetry/batch，body 为 {"events": [...]}
     """
-    def __init__(self, node_url: str = None):
+    def __init__(
+        self,
+        node_url: str = None,
+        max_buffer: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        session: Optional[requests.Session] = None,
+    ):
         super().__init__()
         self.node_url = node_url or os.getenv("NODE_API_URL", "http://localhost:3000")
-        self.endpoint = f"{self.node_url}/api/internal/telemetry"
-        self.queue = Queue()
-        self.worker = threading.Thread(target=self._worker, daemon=True)
+        self.endpoint = f"{self.node_url}/api/internal/telemetry/batch"
+        self.max_buffer = max_buffer or int(os.getenv("TELEMETRY_BUFFER_SIZE", "10000"))
+        self.batch_size = batch_size or int(os.getenv("TELEMETRY_BATCH_SIZE", "200"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "0.25"))
+        # 发送线程按该间隔等待，0 或负值会让它空转
+        if self.flush_interval <= 0:
+            raise ValueError(f"flush_interval must be > 0, got {self.flush_interval}")
+        self.session = session or self._build_session()
+
+        self._buffer: deque = deque(maxlen=self.max_buffer)
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._closed = False
+        self._stats = {
+            "enqueued": 0,
+            "dropped": 0,
+            "sent_events": 0,
+            "sent_batches": 0,
+            "failed_events": 0,
+            "failed_batches": 0,
+            "high_watermark": 0,
+            "last_batch_ms": 0.0,
+            "last_error": None,
+        }
+
+        self.worker = threading.Thread(target=self._worker, daemon=True, name="telemetry-shipper")
         self.worker.start()
+        _HANDLERS.append(self)
+
+    @staticmethod
+    def _build_session() -> requests.Session:
+        session = requests.Session()
+        # 单一目标主机，worker 串行发送；不在 HTTP 层重试，失败批次直接计数丢弃
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
     def emit(self, record):
         exp_id = get_experiment_id()
         if not exp_id:
             return
-        
+
         try:
             # 基础 Payload
             payload = {
@@ -44,24 +95,111 @@ class StreamingEventHandler(logging.Handler):
                     "timestamp": record.created
                 }
                 payload["payload"] = log_data
-                
+
                 # 持久化日志到 Context
-                try:
-                     from python_service.core.context import append_current_log
-                     append_current_log(log_data)
-                except ImportError:
-                    pass
+                append_current_log(log_data)
 
-            self.queue.put(payload)
+            self._enqueue(payload)
         except Exception:
             self.handleError(record)
 
+    def _enqueue(self, payload: Dict[str, Any]):
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                # deque(maxlen) 会自动淘汰最旧的一条
+                self._stats["dropped"] += 1
+            self._buffer.append(payload)
+            self._stats["enqueued"] += 1
+            if len(self._buffer) > self._stats["high_watermark"]:
+                self._stats["high_watermark"] = len(self._buffer)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """等待直到攒满一批或超时，取出至多 batch_size 条事件（持有锁时调用）"""
+        deadline = time.monotonic() + self.flush_interval
+        while not self._closed and len(self._buffer) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        count = min(len(self._buffer), self.batch_size)
+        batch = [self._buffer.popleft() for _ in range(count)]
+        self._inflight = len(batch)
+        return batch
+
     def _worker(self):
+        backoff = 0.0
         while True:
+            with self._cond:
+                if self._closed and not self._buffer:
+                    return
+                batch = self._take_batch()
+            if not batch:
+                continue
+
+            start = time.perf_counter()
             try:
-                payload = self.queue.get()
-                requests.post(self.endpoint, json=payload, timeout=1.0)
-                self.queue.task_done()
-            except Exception:
-                # 如果连接失败，静默忽略以避免影响主线程
-                pass
+                resp = self.session.post(self.endpoint, json={"events": batch}, timeout=2.0)
+                resp.raise_for_status()
+                ok, error = True, None
+            except Exception as e:
+                # 如果连接失败，静默丢弃本批以避免影响主线程
+                ok, error = False, f"{type(e).__name__}: {e}"
+
+            with self._cond:
+                self._inflight = 0
+                self._stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                if ok:
+                    self._stats["sent_events"] += len(batch)
+                    self._stats["sent_batches"] += 1
+                    backoff = 0.0
+                else:
+                    self._stats["failed_events"] += len(batch)
+                    self._stats["failed_batches"] += 1
+                    self._stats["last_error"] = error
+                    backoff = min(5.0, backoff * 2 or 0.1)
+                self._cond.notify_all()
+
+            # Node 不可用时退避，期间由环形缓冲承接并按需丢弃最旧事件
+            if backoff and not self._closed:
+                time.sleep(backoff)
+
+    def flush(self, timeout: float = 5.0):
+        """等待缓冲区清空（发送成功或失败均视为已处理）"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._buffer or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(min(remaining, self.flush_interval))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.worker.join(timeout=5.0)
+        if self in _HANDLERS:
+            _HANDLERS.remove(self)
+        super().close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """背压指标快照"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["buffered"] = len(self._buffer)
+            stats["inflight"] = self._inflight
+        stats.update({
+            "endpoint": self.endpoint,
+            "max_buffer": self.max_buffer,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+        })
+        return stats
+
+
+def get_telemetry_stats() -> List[Dict[str, Any]]:
+    """所有活动 StreamingEventHandler 的背压指标"""
+    return [h.get_stats() for h in list(_HANDLERS)]
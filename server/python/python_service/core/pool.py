@@ -0,0 +1,171 @@
+"""
+Instance Pool
+为预热组件维护有界实例池：请求以 checkout/checkin 的方式独占一个实例，
+取代对预热单例的浅拷贝共享（浅拷贝会让 torch 模型、spaCy 管线等可变内部状态在线程间无同步共享）。
+
+- 每个 (category, id) 一个池，首个成员是预热实例，其余成员在并发需要时按需构建，数量不超过池大小
+- 同一请求内（同一 lease）对同一组件的多次 checkout 复用同一个成员，避免池大小为 1 时自锁
+- lease 结束时统一归还本请求借出的全部成员
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from kgforge import get_logger
+from python_service.config.loader import get_config
+from python_service.core.errors import PrismCapacityError
+
+logger = get_logger(__name__)
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_CHECKOUT_TIMEOUT = 300.0
+
+
+class InstancePool:
+    """单个组件的有界实例池"""
+
+    def __init__(self, key: str, builder: Callable[[], Any], size: int = DEFAULT_POOL_SIZE, seed: Optional[Any] = None):
+        self.key = key
+        self.size = max(1, size)
+        self._builder = builder
+        self._cond = threading.Condition()
+        self._idle: List[Any] = [seed] if seed is not None else []
+        self._members = len(self._idle)
+        self._building = 0
+        # 指标
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def checkout(self, timeout: Optional[float] = None) -> Any:
+        """借出一个空闲实例；全部繁忙且已达上限时等待归还，超时抛 PrismCapacityError"""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        waited = False
+        with self._cond:
+            while not self._idle:
+                if self._members + self._building < self.size:
+                    self._building += 1
+                    break
+                waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._timeouts += 1
+                    raise PrismCapacityError(
+                        message=f"No free instance of {self.key} within {timeout:.0f}s",
+                        details=self.stats(),
+                    )
+                self._cond.wait(remaining)
+            else:
+                return self._record(self._idle.pop(), start, waited)
+
+        # 在锁外构建新成员（可能涉及加载模型权重）
+        try:
+            instance = self._builder()
+        except Exception:
+            with self._cond:
+                self._building -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._building -= 1
+            self._members += 1
+            logger.info(f"Pool {self.key} grew to {self._members}/{self.size} instance(s)")
+            return self._record(instance, start, waited)
+
+    def _record(self, instance: Any, start: float, waited: bool) -> Any:
+        elapsed = time.monotonic() - start
+        self._checkouts += 1
+        if waited:
+            self._waits += 1
+            self._wait_total += elapsed
+            self._wait_max = max(self._wait_max, elapsed)
+        return instance
+
+    def checkin(self, instance: Any):
+        with self._cond:
+            self._idle.append(instance)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "members": self._members,
+            "in_use": self._members - len(self._idle),
+            "checkouts": self._checkouts,
+            "waits": self._waits,
+            "timeouts": self._timeouts,
+            "wait_avg_ms": round(self._wait_total / self._waits * 1000, 2) if self._waits else 0.0,
+            "wait_max_ms": round(self._wait_max * 1000, 2),
+        }
+
+
+class _Lease:
+    """一次请求借出的实例集合"""
+
+    def __init__(self):
+        self.held: Dict[str, Tuple[InstancePool, Any]] = {}
+
+
+_active_lease: ContextVar[Optional[_Lease]] = ContextVar("instance_lease", default=None)
+
+
+class PoolRegistry:
+    """全部组件池的注册表（池大小取自 modules.yaml 的 pool 段）"""
+
+    def __init__(self):
+        self._pools: Dict[str, InstancePool] = {}
+        self._lock = threading.Lock()
+
+    def _pool_config(self) -> Dict[str, Any]:
+        return get_config().get("pool") or {}
+
+    def get_pool(self, key: str, builder: Callable[[], Any], seed: Any) -> InstancePool:
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    config = self._pool_config()
+                    size = int((config.get("sizes") or {}).get(key, config.get("default_size", DEFAULT_POOL_SIZE)))
+                    pool = self._pools[key] = InstancePool(key, builder, size=size, seed=seed)
+        return pool
+
+    def checkout(self, key: str, builder: Callable[[], Any], seed: Any) -> Optional[Any]:
+        """在当前 lease 中借出实例；没有活动 lease 时返回 None（调用方回退到共享单例）"""
+        lease = _active_lease.get()
+        if lease is None:
+            return None
+        if key in lease.held:
+            return lease.held[key][1]
+        pool = self.get_pool(key, builder, seed)
+        timeout = float(self._pool_config().get("checkout_timeout", DEFAULT_CHECKOUT_TIMEOUT))
+        instance = pool.checkout(timeout=timeout)
+        lease.held[key] = (pool, instance)
+        return instance
+
+    @contextmanager
+    def lease(self):
+        """请求级租约：期间借出的实例在退出时全部归还（可嵌套，内层复用外层租约）"""
+        if _active_lease.get() is not None:
+            yield _active_lease.get()
+            return
+        lease = _Lease()
+        token = _active_lease.set(lease)
+        try:
+            yield lease
+        finally:
+            _active_lease.reset(token)
+            for pool, instance in lease.held.values():
+                pool.checkin(instance)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: pool.stats() for key, pool in list(self._pools.items())}
+
+
+# 单例
+pools = PoolRegistry()
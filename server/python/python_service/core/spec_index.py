@@ -0,0 +1,347 @@
+"""
+组件 Spec 索引 (Persisted Spec Index)
+按文件路径记录 (mtime, size, sha1) 指纹与该文件导出的组件 Spec，持久化到磁盘。
+未变化的文件直接复用缓存，变化的文件优先用 AST 静态自省，无法静态确定时才回退到 import。
+import 得到的 Spec 可能依赖环境（如 gpt_expander 读取 DEFAULT_MODEL），只在进程内缓存，不落盘。
+
+静态自省规则（任一不满足即回退 import）：
+1. 组件类位于模块顶层，基类均为从 kgforge 导入的已知基类/协议
+2. 类体中的赋值均为字面量；get_component_spec / get_required_slots 为单条字面量 return，
+   或未定义（沿用基类实现）
+"""
+
+import ast
+import copy
+import hashlib
+import inspect
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from kgforge.protocols import IDescribable
+from kgforge.protocols.interfaces import IPreloadable
+from kgforge import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+
+# 默认持久化位置：<project_root>/.cache/component_spec_index.json
+# PRISM_SPEC_INDEX=<path> 覆盖路径；PRISM_SPEC_INDEX=off 仅使用内存索引
+_PROJECT_ROOT = Path(__file__).resolve().parents[4]
+DEFAULT_INDEX_PATH = _PROJECT_ROOT / ".cache" / "component_spec_index.json"
+
+
+def resolve_index_path() -> Optional[Path]:
+    value = os.getenv("PRISM_SPEC_INDEX")
+    if value is None:
+        return DEFAULT_INDEX_PATH
+    if value.strip().lower() in ("", "0", "off", "false", "none"):
+        return None
+    return Path(value)
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _known_bases() -> Dict[str, Type]:
+    """可静态解析的基类：kgforge.components.base 与 kgforge.protocols 中的公共类"""
+    import kgforge.components.base as base_mod
+    import kgforge.protocols.interfaces as iface_mod
+    known = {}
+    for mod in (iface_mod, base_mod):
+        for name, obj in vars(mod).items():
+            if inspect.isclass(obj) and obj.__module__ == mod.__name__:
+                known[name] = obj
+    return known
+
+
+def _base_fingerprint() -> str:
+    """基类/协议文件的指纹，变化时整个索引失效"""
+    import kgforge.components.base as base_mod
+    import kgforge.protocols.interfaces as iface_mod
+    h = hashlib.sha1()
+    for mod in (base_mod, iface_mod):
+        h.update(Path(mod.__file__).read_bytes())
+    return h.hexdigest()
+
+
+class _Fallback(Exception):
+    """静态自省无法确定，需要 import 模块"""
+
+
+class _ConstantInliner(ast.NodeTransformer):
+    """将引用模块级字面量常量的 Name 替换为其值"""
+
+    def __init__(self, constants: Dict[str, Any]):
+        self.constants = constants
+
+    def visit_Name(self, node: ast.Name):
+        if node.id in self.constants:
+            return ast.copy_location(ast.Constant(self.constants[node.id]), node)
+        return node
+
+
+def _module_constants(tree: ast.Module) -> Dict[str, Any]:
+    """模块顶层仅赋值一次的字面量常量（标量）"""
+    values: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            counts[name] = counts.get(name, 0) + 1
+            try:
+                value = ast.literal_eval(node.value)
+            except (ValueError, TypeError, SyntaxError):
+                continue
+            if isinstance(value, (str, int, float, bool, type(None))):
+                values[name] = value
+    return {k: v for k, v in values.items() if counts[k] == 1}
+
+
+def _literal(node: ast.expr, constants: Dict[str, Any]) -> Any:
+    try:
+        return ast.literal_eval(_ConstantInliner(constants).visit(copy.deepcopy(node)))
+    except (ValueError, TypeError, SyntaxError):
+        raise _Fallback()
+
+
+class StaticIntrospector:
+    """基于 AST 的组件 Spec 提取"""
+
+    def __init__(self, categories: Dict[str, Type]):
+        self.categories = categories
+        self.known = _known_bases()
+
+    def specs(self, module_name: str, source: bytes) -> Optional[List[Dict[str, Any]]]:
+        """返回 [{"category", "spec"}]；无法静态确定时返回 None"""
+        try:
+            tree = ast.parse(source)
+        except SyntaxError:
+            return None
+
+        top_classes = [n for n in tree.body if isinstance(n, ast.ClassDef)]
+        all_classes = [n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)]
+        if not all_classes:
+            return []
+        # 条件分支中定义的类无法静态确定是否存在
+        for node in tree.body:
+            if isinstance(node, (ast.If, ast.Try, ast.With)) and any(isinstance(n, ast.ClassDef) for n in ast.walk(node)):
+                return None
+
+        imports = self._kgforge_imports(tree)
+        self._constants = _module_constants(tree)
+        local_names = {c.name for c in top_classes}
+        results = []
+        try:
+            # 与 inspect.getmembers 的顺序一致（按类名排序）
+            for cls_node in sorted(top_classes, key=lambda c: c.name):
+                item = self._class_spec(module_name, cls_node, imports, local_names)
+                if item is not None:
+                    results.append(item)
+        except _Fallback:
+            return None
+        return results
+
+    def _kgforge_imports(self, tree: ast.Module) -> Dict[str, str]:
+        """本地名 -> 原始名（仅 from kgforge... import X）"""
+        names = {}
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("kgforge"):
+                for alias in node.names:
+                    names[alias.asname or alias.name] = alias.name
+        return names
+
+    def _resolve_base(self, expr: ast.expr, imports: Dict[str, str], local_names: set) -> Optional[Type]:
+        """
+        解析基类：kgforge 已知基类返回类对象；确定不是组件基类（内建/第三方）时返回 None；
+        无法判断（本地类、kgforge 中的其他类、复杂表达式）时抛出 _Fallback
+        """
+        if isinstance(expr, ast.Name):
+            if expr.id in local_names:
+                raise _Fallback()
+            original = imports.get(expr.id)
+            if original is None:
+                return None
+            cls = self.known.get(original)
+            if cls is None:
+                raise _Fallback()
+            return cls
+        raise _Fallback()
+
+    def _class_spec(self, module_name: str, node: ast.ClassDef, imports: Dict[str, str], local_names: set) -> Optional[Dict[str, Any]]:
+        resolved = [self._resolve_base(b, imports, local_names) for b in node.bases]
+        bases = [b for b in resolved if b is not None]
+        if not any(issubclass(b, IDescribable) for b in bases):
+            # 无组件基类的辅助类（如 dataclass）
+            return None
+        if len(bases) != len(resolved) or node.decorator_list or node.keywords:
+            raise _Fallback()
+
+        namespace, literal_methods = self._namespace(node)
+        try:
+            probe = type(node.name, tuple(bases), namespace)
+        except TypeError:  # MRO / 元类冲突
+            raise _Fallback()
+        if inspect.isabstract(probe):
+            return None
+
+        for cat, interface in self.categories.items():
+            if issubclass(probe, interface):
+                spec = self._call(probe, "get_component_spec", literal_methods)
+                spec["class_path"] = f"{module_name}.{node.name}"
+                spec["can_preload"] = issubclass(probe, IPreloadable)
+                if cat == "orchestrators":
+                    spec["slots"] = self._call(probe, "get_required_slots", literal_methods)
+                return {"category": cat, "spec": spec}
+        return None
+
+    def _namespace(self, node: ast.ClassDef) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """构造探针类的命名空间：字面量属性 + 方法占位"""
+        namespace: Dict[str, Any] = {"__module__": "_prism_spec_probe"}
+        literal_methods: Dict[str, Any] = {}
+
+        def placeholder(*args, **kwargs):
+            raise _Fallback()
+
+        for stmt in node.body:
+            if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+                continue  # docstring
+            if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+                if stmt.value is None:
+                    continue
+                value = _literal(stmt.value, self._constants)
+                for t in targets:
+                    if not isinstance(t, ast.Name):
+                        raise _Fallback()
+                    namespace[t.id] = value
+            elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                decorators = {d.id if isinstance(d, ast.Name) else getattr(d, "attr", None) for d in stmt.decorator_list}
+                func = placeholder
+                if "abstractmethod" in decorators:
+                    func = lambda *a, **k: None
+                    func.__isabstractmethod__ = True
+                namespace[stmt.name] = func
+                if stmt.name in ("get_component_spec", "get_required_slots"):
+                    literal_methods[stmt.name] = self._literal_return(stmt)
+            elif isinstance(stmt, ast.Pass):
+                continue
+            else:
+                raise _Fallback()
+        return namespace, literal_methods
+
+    def _literal_return(self, func: ast.FunctionDef) -> Any:
+        body = [s for s in func.body if not (isinstance(s, ast.Expr) and isinstance(s.value, ast.Constant))]
+        if len(body) != 1 or not isinstance(body[0], ast.Return) or body[0].value is None:
+            raise _Fallback()
+        return _literal(body[0].value, self._constants)
+
+    @staticmethod
+    def _call(probe: Type, method: str, literal_methods: Dict[str, Any]) -> Any:
+        if method in literal_methods:
+            return copy.deepcopy(literal_methods[method])
+        # 沿用 kgforge 基类实现（仅依赖字面量类属性）
+        return getattr(probe, method)()
+
+
+def _persistable(entry: Dict[str, Any]) -> bool:
+    return entry.get("method") == "static" and not entry.get("error")
+
+
+class SpecIndex:
+    """持久化的文件级 Spec 索引"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._base_fp = _base_fingerprint()
+        self._load()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"[SpecIndex] 索引损坏，将重新构建: {e}")
+            return
+        if data.get("version") != INDEX_VERSION or data.get("base_fingerprint") != self._base_fp:
+            return
+        # 仅复用静态自省条目（旧索引中 import 得到的条目与导入失败的条目均重新自省）
+        self._entries = {k: v for k, v in data.get("files", {}).items() if _persistable(v)}
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps({
+                    "version": INDEX_VERSION,
+                    "base_fingerprint": self._base_fp,
+                    "files": {k: v for k, v in self._entries.items() if _persistable(v)},
+                }, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.warning(f"[SpecIndex] 索引写入失败: {e}")
+
+    def lookup(self, file_path: str, module_name: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+        """
+        命中返回 (entry, None)；未命中返回 (None, 文件内容)
+        mtime/size 一致直接命中；否则比较 sha1，内容未变只刷新 mtime。
+        """
+        st = os.stat(file_path)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry and entry["module"] == module_name and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                return entry, None
+        source = Path(file_path).read_bytes()
+        with self._lock:
+            if entry and entry["module"] == module_name and entry["sha1"] == _sha1(source):
+                entry["mtime"], entry["size"] = st.st_mtime, st.st_size
+                self._dirty = True
+                return entry, None
+        return None, source
+
+    def put(self, file_path: str, module_name: str, source: bytes, specs: List[Dict[str, Any]],
+            method: str, error: Optional[str] = None) -> Dict[str, Any]:
+        st = os.stat(file_path)
+        entry = {
+            "module": module_name,
+            "mtime": st.st_mtime,
+            "size": st.st_size,
+            "sha1": _sha1(source),
+            "method": method,
+            "specs": specs,
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._entries[file_path] = entry
+            self._dirty = True
+        return entry
+
+    def invalidate(self, file_path: str):
+        with self._lock:
+            if self._entries.pop(file_path, None) is not None:
+                self._dirty = True
+
+    def prune(self, live_paths: set):
+        """移除已删除文件的条目"""
+        with self._lock:
+            for p in [p for p in self._entries if p not in live_paths]:
+                del self._entries[p]
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
@@ -4,7 +4,7 @@ Python FastAPI 服务
 """
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from python_service.core.errors import PrismError
 from contextlib import asynccontextmanager
@@ -43,38 +43,53 @@ except ImportError:
 from python_service.api.routes import router
 from python_service.api.dataset_routes import router as dataset_router
 from python_service.api.config_routes import router as config_router
+from python_service.api.job_routes import router as job_router
+from python_service.api.batch_routes import router as batch_router
 from python_service.config.loader import get_config
 from kgforge import get_logger
 
 logger = get_logger(__name__)
 
+def _start_background_services():
+    """热重载监控与后台预热（单进程服务；prefork 模式下由主进程预热）"""
+    # [v3.0 Feature] 启动热重载服务 (Identify core/kgforge/components path)
+    # 获取 core/kgforge/components 的绝对路径
+    # project_root 已在前面计算得到
+    components_path = Path(project_root) / "core" / "kgforge" / "components"
+
+    # 仅在 components 目录存在时启动
+    if components_path.exists():
+        from python_service.services.hot_reload import start_hot_reload_service
+        start_hot_reload_service(str(components_path))
+
+    # 后台并发预热：服务立即可用，依赖未就绪组件的请求会在工厂中等待
+    from python_service.services.lifecycle import warmer
+
+    logger.info("服务启动：开始基于代码自省进行组件预热（后台并发）...")
+    warmer.start_warmup()
+
+    logger.info("✓ 预热任务已调度，服务就绪（组件状态见 /models/status）")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """服务寿命周期管理：处理启动与关闭逻辑"""
     try:
         from python_service.core.logging import StreamingEventHandler
         from kgforge.utils.logger import register_global_handler
-        
+
         # 注册实时日志处理器 (全局)
         register_global_handler(StreamingEventHandler())
 
-        # [v3.0 Feature] 启动热重载服务 (Identify core/kgforge/components path)
-        # 获取 core/kgforge/components 的绝对路径
-        # project_root 已在前面计算得到
-        components_path = Path(project_root) / "core" / "kgforge" / "components"
-        
-        # 仅在 components 目录存在时启动
-        if components_path.exists():
-            from python_service.services.hot_reload import start_hot_reload_service
-            start_hot_reload_service(str(components_path))
-
-        # 懒加载服务
-        from services.lifecycle import preload_all
-        
-        logger.info("服务启动：开始基于代码自省进行组件预热...")
-        preload_all()
-        
-        logger.info("✓ 组件预热完成，服务就绪")
+        # 异步任务进度：把运行中任务的实验日志转为 /jobs/{id}/events 事件
+        from python_service.services.jobs import job_manager, JobProgressHandler
+        register_global_handler(JobProgressHandler(job_manager))
+
+        # prefork worker：组件已由主进程预热，热重载只会作用于单个 worker，均跳过
+        from python_service.services.prefork import is_prefork_worker
+        if is_prefork_worker():
+            logger.info("Prefork worker：跳过预热与热重载（由主进程完成）")
+        else:
+            _start_background_services()
     except Exception as e:
         logger.error(f"组件预热失败: {e}")
         logger.warning("服务将继续运行，但组件将在首次使用时加载（可能较慢）")
@@ -108,6 +123,15 @@ app.add_middleware(
 app.include_router(router, prefix="/api/v1")
 app.include_router(dataset_router, prefix="/api/v1")
 app.include_router(config_router, prefix="/api/v1")
+app.include_router(job_router, prefix="/api/v1")
+app.include_router(batch_router, prefix="/api/v1")
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 文本格式的 LLM 调用计量（本进程；多 worker 部署时每个 worker 各自导出）"""
+    from kgforge.utils.llm_metrics import llm_metrics
+    return PlainTextResponse(llm_metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
@@ -116,5 +140,11 @@ async def root():
 
 
 if __name__ == "__main__":
+    workers = int(os.getenv("PRISM_WORKERS", "1"))
+    if workers > 1:
+        # 多 worker：主进程预热后 fork，各 worker 共享同一份模型权重
+        from python_service.services.prefork import serve
+        sys.exit(serve(host="0.0.0.0", port=8000, workers=workers))
+
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
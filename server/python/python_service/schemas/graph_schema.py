@@ -157,3 +157,64 @@ def graph_to_dict(graph: Graph, visited_subgraphs: Optional[Set[str]] = None) ->
         graph_dict["metadata"] = graph.metadata.copy()
     
     return graph_dict
+
+
+def _edge_key(edge: Dict[str, Any]) -> tuple:
+    return (edge.get("source"), edge.get("target"), edge.get("relation"))
+
+
+def graph_delta(base: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    计算 current 相对 base 的差量（两者均为 graph_to_dict 的输出）：
+    nodes 为新增或变化的节点，nodes_removed 为删除的节点 ID；边按 (source, target, relation) 比较
+    """
+    base_nodes = base.get("nodes", {})
+    current_nodes = current.get("nodes", {})
+    base_edges = {_edge_key(e) for e in base.get("edges", [])}
+    current_edges = {_edge_key(e): e for e in current.get("edges", [])}
+    return {
+        "nodes": {nid: n for nid, n in current_nodes.items() if base_nodes.get(nid) != n},
+        "nodes_removed": [nid for nid in base_nodes if nid not in current_nodes],
+        "edges": [e for key, e in current_edges.items() if key not in base_edges],
+        "edges_removed": [list(key) for key in base_edges if key not in current_edges],
+    }
+
+
+def apply_graph_delta(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """graph_delta 的逆运算（客户端重建阶段图的参考实现）"""
+    nodes = {nid: n for nid, n in base.get("nodes", {}).items() if nid not in set(delta["nodes_removed"])}
+    nodes.update(delta["nodes"])
+    removed = {tuple(key) for key in delta["edges_removed"]}
+    edges = [e for e in base.get("edges", []) if _edge_key(e) not in removed] + delta["edges"]
+    return {**{k: v for k, v in base.items() if k not in ("nodes", "edges")}, "nodes": nodes, "edges": edges}
+
+
+class StageStreamEncoder:
+    """
+    阶段流编码：每个阶段图序列化一次，若与某个已发出阶段的节点重合过半，则只发相对该阶段的差量，否则发全量。
+    """
+
+    def __init__(self):
+        self._sent: Dict[str, Dict[str, Any]] = {}
+
+    def encode(self, stage: str, graph: Any) -> Dict[str, Any]:
+        # 隔离执行时阶段图已在 worker 中序列化
+        current = graph if isinstance(graph, dict) else graph_to_dict(graph)
+        node_ids = set(current["nodes"])
+        base_name, best = None, 0
+        for name, sent in self._sent.items():
+            overlap = len(node_ids & sent["nodes"].keys())
+            if overlap > best:
+                base_name, best = name, overlap
+        event = {
+            "stage": stage,
+            "graph_id": current.get("graph_id"),
+            "node_count": len(current["nodes"]),
+            "edge_count": len(current["edges"]),
+        }
+        if base_name is not None and best * 2 >= len(node_ids):
+            event.update(base=base_name, delta=graph_delta(self._sent[base_name], current))
+        else:
+            event.update(base=None, graph=current)
+        self._sent[stage] = current
+        return event
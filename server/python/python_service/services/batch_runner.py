@@ -0,0 +1,291 @@
+"""
+Batch Runner
+在数据集 split 的一个索引区间上批量执行推理管线（评测主负载）。
+
+- 样本按索引从 DatasetService 流式读取，在线程池/进程池中执行，在途样本数有上限
+- 结果按索引分片增量写入 JSONL：<output_dir>/shard-00000.jsonl（每行一个样本）
+- manifest.json 记录运行配置；崩溃或中断后以相同配置重跑即从已完成的索引处续跑（失败与被取消的样本会重试）
+- 进程池模式下每个子进程各自加载模型，适合 CPU 密集且内存充裕的场景；默认线程池共享预热实例
+"""
+
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from kgforge import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_SHARD_SIZE = 1000
+MANIFEST_NAME = "manifest.json"
+# 续跑时视为已完成的状态（失败与被取消的样本重试）
+COMPLETED_STATES = ("success",)
+
+
+def default_output_root() -> Path:
+    project_root = Path(__file__).resolve().parents[4]
+    return project_root / ".cache" / "batches"
+
+
+@dataclass
+class BatchConfig:
+    dataset_id: str
+    split: str
+    start: int = 0
+    end: Optional[int] = None
+    orchestrator: str = "dynamic_halting"
+    components: Dict[str, str] = field(default_factory=dict)
+    component_params: Dict[str, Any] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+    api_key: Optional[str] = None
+
+    def pipeline_fingerprint(self) -> Dict[str, Any]:
+        """续跑时必须一致的字段（不含 api_key 与区间终点）"""
+        data = asdict(self)
+        data.pop("api_key")
+        data.pop("end")
+        return data
+
+
+def _run_sample(request: Dict[str, Any]) -> Dict[str, Any]:
+    """执行单个样本（进程池模式下在子进程中运行，须为模块级函数）"""
+    from python_service.services.inference import InferenceEngine
+    return InferenceEngine().run_dynamic(**request)
+
+
+class ShardedJsonlWriter:
+    """按索引分片的 JSONL 追加写入器（线程安全，每行写完即 flush）"""
+
+    def __init__(self, output_dir: Path, shard_size: int = DEFAULT_SHARD_SIZE):
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self._files: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def shard_path(self, shard: int) -> Path:
+        return self.output_dir / f"shard-{shard:05d}.jsonl"
+
+    def write(self, record: Dict[str, Any]):
+        shard = record["index"] // self.shard_size
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            f = self._files.get(shard)
+            if f is None:
+                f = self._files[shard] = open(self.shard_path(shard), "a", encoding="utf-8")
+            f.write(line)
+            f.flush()
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+
+def read_records(output_dir: Path) -> Iterator[Dict[str, Any]]:
+    """按分片顺序读取全部结果记录（跳过崩溃时写了一半的末行）"""
+    for path in sorted(output_dir.glob("shard-*.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def completed_indices(output_dir: Path) -> Set[int]:
+    done = set()
+    for record in read_records(output_dir):
+        if record.get("status") in COMPLETED_STATES:
+            done.add(record["index"])
+    return done
+
+
+class BatchRunner:
+    """单次批量运行（可在后台线程中运行并查询进度、取消）"""
+
+    def __init__(self, config: BatchConfig, output_dir: Optional[Path] = None, workers: int = 4,
+                 executor: str = "thread", shard_size: int = DEFAULT_SHARD_SIZE, dataset_service=None,
+                 sample_runner: Callable[[Dict[str, Any]], Dict[str, Any]] = _run_sample):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"executor 必须是 thread 或 process: {executor}")
+        self.config = config
+        output_dir = Path(output_dir) if output_dir else None
+        self.run_id = output_dir.name if output_dir else uuid.uuid4().hex[:12]
+        self.output_dir = output_dir or default_output_root() / self.run_id
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.shard_size = shard_size
+        self._svc = dataset_service
+        self._sample_runner = sample_runner
+        self._cancel = threading.Event()
+        self.status = "pending"
+        self.progress = {"total": 0, "skipped": 0, "succeeded": 0, "failed": 0, "cancelled": 0,
+                         "started_at": None, "finished_at": None}
+
+    # ---- manifest ----
+
+    def _check_manifest(self):
+        path = self.output_dir / MANIFEST_NAME
+        fingerprint = self.config.pipeline_fingerprint()
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("config") != fingerprint or manifest.get("shard_size") != self.shard_size:
+                raise ValueError(f"输出目录 {self.output_dir} 中已有不同配置的运行结果，请更换输出目录")
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"run_id": self.run_id, "config": fingerprint, "shard_size": self.shard_size,
+                       "created_at": time.time()}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    # ---- 执行 ----
+
+    def _dataset(self):
+        if self._svc is None:
+            from python_service.services.dataset_service import get_dataset_service
+            self._svc = get_dataset_service()
+        return self._svc
+
+    def _build_request(self, index: int) -> Dict[str, Any]:
+        cfg = self.config
+        svc = self._dataset()
+        raw = svc.get_raw_sample(cfg.dataset_id, cfg.split, index)
+        sample = svc.normalize_sample(cfg.dataset_id, cfg.split, index, raw, include_raw=False)
+        return {
+            "goal": sample.get("query") or "",
+            "text": sample.get("context") or "",
+            "orchestrator": cfg.orchestrator,
+            "components": cfg.components,
+            "component_params": cfg.component_params,
+            "params": cfg.params,
+            "api_key": cfg.api_key,
+            "experiment_id": f"batch-{self.run_id}-{index}",
+        }
+
+    def _pending_indices(self) -> Tuple[List[int], int]:
+        cfg = self.config
+        end = cfg.end if cfg.end is not None else self._dataset().get_total(cfg.dataset_id, cfg.split)
+        done = completed_indices(self.output_dir)
+        indices = [i for i in range(cfg.start, end) if i not in done]
+        return indices, (end - cfg.start) - len(indices)
+
+    def cancel(self):
+        """停止提交新样本；在途样本执行完后结束"""
+        self._cancel.set()
+
+    def run(self) -> Dict[str, Any]:
+        self._check_manifest()
+        indices, skipped = self._pending_indices()
+        self.progress.update(total=len(indices) + skipped, skipped=skipped, started_at=time.time())
+        self.status = "running"
+        if skipped:
+            logger.info(f"Batch {self.run_id}: resuming, {skipped} sample(s) already completed")
+
+        writer = ShardedJsonlWriter(self.output_dir, self.shard_size)
+        pool_cls = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+        in_flight: Dict[Future, Tuple[int, float]] = {}
+        max_in_flight = self.workers * 2
+        todo = iter(indices)
+        try:
+            with pool_cls(max_workers=self.workers) as pool:
+                exhausted = False
+                while in_flight or not exhausted:
+                    # 补满在途窗口：按需读取样本，不一次性物化整个区间
+                    while not exhausted and not self._cancel.is_set() and len(in_flight) < max_in_flight:
+                        index = next(todo, None)
+                        if index is None:
+                            exhausted = True
+                            break
+                        try:
+                            request = self._build_request(index)
+                        except Exception as e:
+                            self._record(writer, index, 0.0, error=e)
+                            continue
+                        in_flight[pool.submit(self._sample_runner, request)] = (index, time.perf_counter())
+                    if self._cancel.is_set():
+                        exhausted = True
+                    if not in_flight:
+                        break
+                    finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index, started = in_flight.pop(future)
+                        elapsed = time.perf_counter() - started
+                        try:
+                            self._record(writer, index, elapsed, result=future.result())
+                        except Exception as e:
+                            self._record(writer, index, elapsed, error=e)
+        finally:
+            writer.close()
+            self.progress["finished_at"] = time.time()
+
+        self.status = "cancelled" if self._cancel.is_set() else "completed"
+        logger.info(f"Batch {self.run_id} {self.status}: {self.progress}")
+        return self.summary()
+
+    def _record(self, writer: ShardedJsonlWriter, index: int, elapsed: float,
+                result: Optional[Dict[str, Any]] = None, error: Optional[BaseException] = None):
+        record: Dict[str, Any] = {"index": index, "elapsed_ms": int(elapsed * 1000)}
+        if error is not None:
+            record.update(status="error", error=f"{type(error).__name__}: {error}")
+            logger.warning(f"Batch {self.run_id} sample {index} failed: {error}")
+            logger.debug("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+            self.progress["failed"] += 1
+        else:
+            record.update(status=result.get("status", "success"), result=result)
+            self.progress["cancelled" if record["status"] == "cancelled" else "succeeded"] += 1
+        writer.write(record)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "output_dir": str(self.output_dir),
+            "config": self.config.pipeline_fingerprint(),
+            "progress": dict(self.progress),
+        }
+
+
+class BatchRegistry:
+    """API 侧的后台批量运行注册表"""
+
+    def __init__(self):
+        self._runs: Dict[str, BatchRunner] = {}
+        self._lock = threading.Lock()
+
+    def start(self, runner: BatchRunner) -> BatchRunner:
+        with self._lock:
+            current = self._runs.get(runner.run_id)
+            if current is not None and current.status == "running":
+                raise ValueError(f"批量运行 {runner.run_id} 正在进行中")
+            self._runs[runner.run_id] = runner
+
+        def target():
+            try:
+                runner.run()
+            except Exception as e:
+                runner.status = "failed"
+                runner.progress["error"] = str(e)
+                logger.error(f"Batch {runner.run_id} failed: {e}")
+
+        threading.Thread(target=target, name=f"batch-{runner.run_id}", daemon=True).start()
+        return runner
+
+    def get(self, run_id: str) -> Optional[BatchRunner]:
+        return self._runs.get(run_id)
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        return [runner.summary() for runner in list(self._runs.values())]
+
+
+# 单例
+batch_registry = BatchRegistry()
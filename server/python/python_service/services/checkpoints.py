@@ -0,0 +1,58 @@
+"""
+Run Checkpoints
+长时间推理任务的检查点存储（格式与编排器侧的读写见 kgforge/utils/checkpoint.py）。
+
+- 仅对支持检查点的编排器（supports_checkpoints，如 dynamic_halting）开启：带 experiment_id 运行时，
+  编排器每轮迭代后写入 <dir>/<experiment_id>.ckpt.gz 及增量日志，正常结束后删除
+- 同时保存原始请求（不含 api_key）为 <experiment_id>.meta.json，POST /jobs/{id}/resume 据此重建管线并从最后一轮继续
+- 失败或取消的运行保留检查点供恢复；每次开始新运行时按 ttl_hours 与 max_total_mb 清理旧检查点
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from kgforge.utils.checkpoint import CheckpointStore
+from python_service.config.loader import get_config
+
+DEFAULTS = {
+    "enabled": True,
+    "dir": ".cache/checkpoints",
+    "keep_completed": False,
+    "ttl_hours": 72,
+    "max_total_mb": 1024,
+}
+
+_store: Optional[CheckpointStore] = None
+
+
+def checkpoint_config() -> Dict[str, Any]:
+    return {**DEFAULTS, **(get_config().get("checkpoints") or {})}
+
+
+def checkpoints_enabled() -> bool:
+    env = os.getenv("PRISM_CHECKPOINTS")
+    if env is not None:
+        return env.lower() in ("1", "true", "yes")
+    return bool(checkpoint_config()["enabled"])
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    global _store
+    if _store is None:
+        root = Path(checkpoint_config()["dir"])
+        if not root.is_absolute():
+            root = Path(__file__).resolve().parents[4] / root
+        _store = CheckpointStore(root)
+    return _store
+
+
+def prune_checkpoints(keep: Optional[str] = None) -> List[str]:
+    """按保留期与总大小清理检查点（keep 为当前运行，不参与清理）"""
+    config = checkpoint_config()
+    ttl, max_mb = config.get("ttl_hours"), config.get("max_total_mb")
+    return get_checkpoint_store().prune(
+        max_age_seconds=float(ttl) * 3600 if ttl else None,
+        max_total_bytes=int(float(max_mb) * (1 << 20)) if max_mb else None,
+        keep=keep,
+    )
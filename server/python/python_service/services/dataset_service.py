@@ -7,20 +7,28 @@
 
 注意：
 - HuggingFace datasets 需要联网下载（首次），会自动缓存到本机
-- 该服务内部做了简单的进程内缓存，避免重复 load_dataset
+- FEVER 证据页面本地优先（services/evidence_store.py）；用 `prism fever-evidence` 导入转储或预取后可完全离线
+- 该服务内部的进程内缓存（HF split、DocRED 索引、预览索引、FEVER 页面、SciFact corpus）统一走
+  core.cache 的有界 LRU，上限见 modules.yaml 的 cache 段；多个 DatasetService 实例共享同一组缓存
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import os
 import json
 from pathlib import Path
 import re
+import threading
 
 from kgforge import get_logger
+from python_service.core.cache import caches
+from python_service.services.evidence_store import fetch_wikipedia_page, get_evidence_store, split_sentences
+from python_service.services.evidence_store import offline_mode as evidence_offline_mode
+from python_service.services.indexed_json import open_indexed
+from python_service.services.preview_index import PREVIEW_CHARS, PreviewIndex, open_preview_index
 
 logger = get_logger(__name__)
 
@@ -51,14 +59,16 @@ class DatasetService:
         # 获取项目根目录 (Independent calculation)
         # server/python/python_service/services/dataset_service.py -> PRISM/ (4 levels up)
         self._root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../'))
-        self._cache: Dict[Tuple[str, str], Any] = {}  # (dataset_id, split) -> dataset split object
-        # DocRED 本地 JSON 缓存（避免每次分页都 json.load 大文件导致卡顿/阻塞）
-        self._docred_cache: Dict[str, List[Dict[str, Any]]] = {}
-        self._docred_mtimes: Dict[str, float] = {}
+        # (dataset_id, split) -> HF dataset split object
+        self._cache = caches.get_cache("dataset.hf_splits")
+        # DocRED 本地 split：path -> (mtime, JSONL 索引存储；非数组格式时为整体加载的 list)
+        self._docred_cache = caches.get_cache("dataset.docred")
+        # 分页预览的列式旁路索引：cache_dir -> PreviewIndex
+        self._preview_indexes = caches.get_cache("dataset.previews")
         # FEVER：Wikipedia 页面内容缓存（按需抓取，避免重复网络请求）
-        self._fever_wiki_cache: Dict[str, str] = {}
-        # SciFact：corpus doc_id -> (title, abstract_lines) 缓存（规模小，可常驻内存）
-        self._scifact_corpus_map: Optional[Dict[int, Dict[str, Any]]] = None
+        self._fever_wiki_cache = caches.get_cache("dataset.fever_wiki")
+        # SciFact：corpus doc_id -> (title, abstract_lines)，被淘汰后从本地 HF 缓存重新加载
+        self._scifact_corpus = caches.get_cache("dataset.scifact_corpus")
 
         self._specs: Dict[str, DatasetSpec] = {
             # 兼容现有 DocRED（本地）
@@ -134,6 +144,10 @@ class DatasetService:
             raise KeyError(f"未知数据集: {dataset_id}")
         return self._specs[dataset_id]
 
+    def docred_data_dir(self) -> Path:
+        """本地 DocRED 数据目录（各 split 与 rel_info.json 所在处）"""
+        return Path(self._root) / "data" / "DocRED" / "data"
+
     # -------------------------
     # 统一“标准化样本 schema”
     # -------------------------
@@ -144,6 +158,7 @@ class DatasetService:
         index: int,
         raw: Dict[str, Any],
         include_raw: bool = False,
+        fetch_remote: bool = True,
     ) -> Dict[str, Any]:
         """
         输出统一 schema（尽量）：
@@ -152,6 +167,8 @@ class DatasetService:
         - label: 支持/反驳/类别 等
         - evidence: （可选）证据列表（句子/段落/span）
         - raw: 原始样本（保留调试）
+
+        fetch_remote=False 时 FEVER 证据只查本地证据库、不联网，用于全量构建预览索引
         """
 
         def pick_first(*keys: str) -> Optional[Any]:
@@ -203,15 +220,17 @@ class DatasetService:
             }
 
             # FEVER v1.0 通常不给出具体证据句文本，只有指针。
-            # 为了让前端/实验“能用”，这里按需拉取 Wikipedia 页面文本，并尽量定位到对应句子。
+            # 为了让前端/实验“能用”，这里取证据页面文本（本地证据库优先，必要时联网），并定位到对应句子。
             context = pick_first("context", "wiki_sentences")
             if (not context) and wiki_title:
                 try:
-                    page_text = self._fever_fetch_wikipedia_page(wiki_title)
-                    evidence_text = self._fever_pick_sentence(page_text, sent_id)
-                    evidence["evidence_text"] = evidence_text
-                    # 给 bottom-up 一段可读文本：优先证据句，否则返回页面开头
-                    context = evidence_text or page_text
+                    page = self._fever_page(wiki_title, fetch_remote=fetch_remote)
+                    if page is not None:
+                        page_text, sentences = page
+                        evidence_text = self._fever_pick_sentence(page_text, sent_id, sentences)
+                        evidence["evidence_text"] = evidence_text
+                        # 给 bottom-up 一段可读文本：优先证据句，否则返回页面开头
+                        context = evidence_text or page_text
                 except Exception as e:
                     # 网络不可用/解析失败：退化为 claim（至少可跑通管线）
                     logger.warning(f"FEVER 证据文本获取失败（title={wiki_title}）：{e}")
@@ -302,62 +321,39 @@ class DatasetService:
             out["raw"] = raw
         return out
 
-    def _fever_fetch_wikipedia_page(self, title: str) -> str:
+    def _fever_page(self, title: str, fetch_remote: bool = True) -> Optional[Tuple[str, List[str]]]:
         """
-        使用 Wikipedia API 获取页面纯文本（英文）。
-        注意：这是一个“可用性优先”的实现，用于把 FEVER 的证据指针变成可读文本。
+        获取 FEVER 证据页面 (text, sentences)：内存 LRU -> 本地证据库 -> Wikipedia API（写回证据库）。
+        fetch_remote=False 或离线模式下本地未收录时返回 None。
         """
         title_norm = str(title).strip()
         if not title_norm:
-            return ""
-        if title_norm in self._fever_wiki_cache:
-            return self._fever_wiki_cache[title_norm]
-
-        import requests
-
-        headers = {
-            # Wikipedia 对无 UA/异常 UA 有时会 403，这里加一个稳定 UA
-            "User-Agent": "PRISM-DynHalting/0.1 (+https://example.com; contact: local-dev)"
-        }
-        resp = requests.get(
-            "https://en.wikipedia.org/w/api.php",
-            headers=headers,
-            params={
-                "action": "query",
-                "format": "json",
-                "prop": "extracts",
-                "explaintext": 1,
-                "redirects": 1,
-                "titles": title_norm,
-            },
-            timeout=15,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        pages = (data.get("query") or {}).get("pages") or {}
-        extract = ""
-        for _, page in pages.items():
-            extract = page.get("extract") or ""
-            break
-        extract = re.sub(r"\n{3,}", "\n\n", extract).strip()
-        # 控制缓存大小：只缓存前 200k 字符，够用了，避免内存爆
-        self._fever_wiki_cache[title_norm] = extract[:200_000]
-        return self._fever_wiki_cache[title_norm]
-
-    def _fever_pick_sentence(self, page_text: str, sentence_id: Any) -> str:
-        """从 Wikipedia 页面文本中按 sentence_id 取一句（尽力而为，句子切分可能与 FEVER 标注不完全一致）"""
+            return None
+        cached = self._fever_wiki_cache.get(title_norm)
+        if cached is not None:
+            return cached
+
+        store = get_evidence_store()
+        page = store.get_page(title_norm)
+        if page is None:
+            if not fetch_remote or evidence_offline_mode():
+                return None
+            text = fetch_wikipedia_page(title_norm)
+            page = (text, split_sentences(text))
+            store.put_page(title_norm, page[0], page[1], source="api")
+        return self._fever_wiki_cache.put(title_norm, page)
+
+    @staticmethod
+    def _fever_pick_sentence(page_text: str, sentence_id: Any, sentences: List[str]) -> str:
+        """按 sentence_id 取证据句（转储导入的页面与 FEVER 句号一致；API 页面为正则分句，尽力而为）"""
         if not page_text:
             return ""
         try:
             sid = int(sentence_id)
         except Exception:
             sid = -1
-
-        # 简单句分割（英文）
-        sents = re.split(r"(?<=[.!?])\s+", page_text)
-        sents = [s.strip() for s in sents if s.strip()]
-        if 0 <= sid < len(sents):
-            return sents[sid]
+        if 0 <= sid < len(sentences) and sentences[sid]:
+            return sentences[sid]
         # 兜底：返回开头一小段
         return (page_text[:400] + "...") if len(page_text) > 400 else page_text
 
@@ -365,9 +361,8 @@ class DatasetService:
         """从 scifact/corpus 中按 doc_id 获取论文信息（title/abstract）"""
         if doc_id <= 0:
             return None
-        if self._scifact_corpus_map is None:
-            self._scifact_corpus_map = self._load_scifact_corpus_map()
-        return self._scifact_corpus_map.get(int(doc_id))
+        corpus = self._scifact_corpus.get_or_put("corpus", self._load_scifact_corpus_map)
+        return corpus.get(int(doc_id))
 
     def _load_scifact_corpus_map(self) -> Dict[int, Dict[str, Any]]:
         """加载 scifact/corpus 的小规模映射（约 5k 篇），用于把 doc_id 指针变成可读摘要。"""
@@ -415,10 +410,10 @@ class DatasetService:
             return ["train", "test"]
         return ["train", "validation", "test"]
 
-    def _load_docred_split(self, split: str) -> List[Dict[str, Any]]:
+    def _load_docred_split(self, split: str) -> Sequence[Dict[str, Any]]:
         if split not in self._docred_files:
             raise KeyError(f"未知 DocRED split: {split}")
-        path = os.path.join(self._root, "data", "DocRED", "data", self._docred_files[split])
+        path = str(self.docred_data_dir() / self._docred_files[split])
         if not os.path.exists(path):
             raise FileNotFoundError(f"DocRED 文件不存在: {path}")
         # mtime cache
@@ -427,21 +422,30 @@ class DatasetService:
         except OSError:
             raise FileNotFoundError(f"DocRED 文件不可访问: {path}")
 
-        if path in self._docred_cache and self._docred_mtimes.get(path) == mtime:
-            return self._docred_cache[path]
+        cached = self._docred_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # 顶层数组：一次性转换为 JSONL + 偏移索引，之后按下标随机读取，不把整个 split 载入内存
+        try:
+            parsed = open_indexed(Path(path), Path(self._root) / ".cache" / "datasets" / "docred", name=split)
+        except (ValueError, OSError) as e:
+            logger.warning(f"DocRED 索引不可用，回退为整体加载（{path}）：{e}")
+            parsed = self._load_docred_json(path)
+
+        # 索引存储只常驻偏移数组（nbytes）；整体加载的 list 按抽样估算
+        self._docred_cache.put(path, (mtime, parsed))
+        return parsed
 
+    @staticmethod
+    def _load_docred_json(path: str) -> List[Dict[str, Any]]:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
         if isinstance(data, list):
-            parsed = data
-        elif isinstance(data, dict) and "data" in data:
-            parsed = data["data"]
-        else:
-            raise ValueError(f"不支持的 DocRED 格式: {path}")
-
-        self._docred_cache[path] = parsed
-        self._docred_mtimes[path] = mtime
-        return parsed
+            return data
+        if isinstance(data, dict) and "data" in data:
+            return data["data"]
+        raise ValueError(f"不支持的 DocRED 格式: {path}")
 
     def _docred_preview(self, sample: Dict[str, Any]) -> Tuple[str, str, int]:
         """
@@ -471,8 +475,9 @@ class DatasetService:
 
     def _load_hf_split(self, spec: DatasetSpec, split: str):
         key = (spec.dataset_id, split)
-        if key in self._cache:
-            return self._cache[key]
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
 
         try:
             from datasets import load_dataset
@@ -485,7 +490,7 @@ class DatasetService:
                 split=split,
                 trust_remote_code=spec.trust_remote_code,
             )
-            self._cache[key] = ds
+            self._cache.put(key, ds, size=self._hf_split_bytes(ds))
             return ds
         except Exception as e:
             msg = str(e)
@@ -499,6 +504,14 @@ class DatasetService:
                 f"加载 HuggingFace 数据集失败: dataset={spec.hf_name}, config={spec.hf_config}, split={split}, error={e}"
             ) from e
 
+    @staticmethod
+    def _hf_split_bytes(ds: Any) -> int:
+        """HF split 的常驻内存估算：内存表按 Arrow 字节数计，磁盘 memory-map 的表只计少量元数据"""
+        if getattr(ds, "cache_files", None):
+            return 1 << 20
+        data = getattr(ds, "data", None)
+        return int(getattr(data, "nbytes", 0) or 0) or (1 << 20)
+
     def get_total(self, dataset_id: str, split: str) -> int:
         spec = self.get_spec(dataset_id)
         if spec.source == "local" and dataset_id == "docred":
@@ -525,90 +538,87 @@ class DatasetService:
         # datasets 返回的是 dict-like
         return dict(sample)
 
+    # -------------------------
+    # 分页预览（列式旁路索引）
+    # -------------------------
+    def _preview_rows(self, dataset_id: str, split: str, data: Sequence[Dict[str, Any]]):
+        """按下标顺序产出每个样本的预览字段（仅在构建索引时全量扫描一次）"""
+        for idx in range(len(data)):
+            raw = data[idx] if dataset_id == "docred" else dict(data[idx])
+            if dataset_id == "docred":
+                goal, preview_text, _ = self._docred_preview(raw)
+                sents = raw.get("sents", [])
+                # 全文长度 = 各句以空格拼接后的长度（与 normalize_sample 的 context 一致，但不实际拼接）
+                parts = [" ".join(sent) if isinstance(sent, list) else sent for sent in sents]
+                yield {
+                    "query": goal,
+                    "context_preview": (preview_text[:PREVIEW_CHARS] + "...") if len(preview_text) > PREVIEW_CHARS else preview_text,
+                    "context_length": sum(len(p) for p in parts) + max(0, len(parts) - 1),
+                    "label": "relation_extraction",
+                    "sentence_count": len(sents),
+                    "entity_count": len(raw.get("vertexSet", [])),
+                    "relation_count": len(raw.get("labels", [])),
+                }
+                continue
+
+            # 预览只用本地证据库，避免建索引时逐条请求 Wikipedia
+            norm = self.normalize_sample(dataset_id, split, idx, raw, include_raw=False, fetch_remote=False)
+            context = norm.get("context") or ""
+            yield {
+                "query": norm.get("query") or "",
+                "context_preview": (context[:PREVIEW_CHARS] + "...") if isinstance(context, str) and len(context) > PREVIEW_CHARS else context,
+                "context_length": len(context) if isinstance(context, str) else None,
+                "label": norm.get("label"),
+            }
+
+    def get_preview_index(self, dataset_id: str, split: str) -> PreviewIndex:
+        """获取 (dataset, split) 的预览索引；源数据变化时自动重建"""
+        spec = self.get_spec(dataset_id)
+        if spec.source == "local" and dataset_id == "docred":
+            data = self._load_docred_split(split)
+            st = os.stat(self.docred_data_dir() / self._docred_files[split])
+            fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        else:
+            data = self._load_hf_split(spec, split)
+            fingerprint = {"hf_fingerprint": getattr(data, "_fingerprint", None), "count": len(data)}
+            if dataset_id == "fever":
+                # 证据库导入/预取后预览中的证据文本会变化
+                fingerprint["evidence_generation"] = get_evidence_store().generation
+
+        safe_split = re.sub(r"[^\w.-]+", "_", split)
+        cache_dir = Path(self._root) / ".cache" / "datasets" / "previews" / dataset_id / safe_split
+        index = open_preview_index(
+            cache_dir,
+            fingerprint,
+            rows=lambda: self._preview_rows(dataset_id, split, data),
+            current=self._preview_indexes.get(str(cache_dir)),
+        )
+        self._preview_indexes.put(str(cache_dir), index)
+        return index
+
     def list_samples_preview(
         self,
         dataset_id: str,
         split: str,
         page: int,
         page_size: int,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        label: Optional[str] = None,
     ) -> Dict[str, Any]:
-        # DocRED：分页预览走轻量路径（不 normalize 全文 context）
-        if dataset_id == "docred":
-            data = self._load_docred_split(split)
-            total = len(data)
-            start = (page - 1) * page_size
-            end = min(start + page_size, total)
-            if start >= total:
-                return {
-                    "dataset_id": dataset_id,
-                    "split": split,
-                    "total": total,
-                    "page": page,
-                    "page_size": page_size,
-                    "total_pages": (total + page_size - 1) // page_size,
-                    "samples": [],
-                }
-
-            previews: List[Dict[str, Any]] = []
-            for idx in range(start, end):
-                sample = data[idx]
-                goal, preview_text, approx_len = self._docred_preview(sample)
-                previews.append(
-                    {
-                        "index": idx,
-                        "query": goal,
-                        "context_preview": (preview_text[:240] + "...") if len(preview_text) > 240 else preview_text,
-                        "context_length": approx_len,
-                        "label": "relation_extraction",
-                        "meta": {
-                            "sentence_count": len(sample.get("sents", [])),
-                            "entity_count": len(sample.get("vertexSet", [])),
-                            "relation_count": len(sample.get("labels", [])),
-                        },
-                    }
-                )
-
-            return {
-                "dataset_id": dataset_id,
-                "split": split,
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total + page_size - 1) // page_size,
-                "samples": previews,
-            }
-
-        total = self.get_total(dataset_id, split)
+        """
+        分页预览：首次访问时构建列式预览索引，之后翻页只是对（过滤/排序后的）下标数组切片。
+        - sort_by: index / context_length / sentence_count / entity_count / relation_count
+        - min_length / max_length: 按 context 长度过滤
+        - label: 按标量标签过滤（如 FEVER 的 SUPPORTS）
+        """
+        index = self.get_preview_index(dataset_id, split)
+        selected = index.select(sort_by=sort_by, descending=descending,
+                                min_length=min_length, max_length=max_length, label=label)
+        total = len(selected)
         start = (page - 1) * page_size
-        end = min(start + page_size, total)
-        if start >= total:
-            return {
-                "dataset_id": dataset_id,
-                "split": split,
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": (total + page_size - 1) // page_size,
-                "samples": [],
-            }
-
-        previews: List[Dict[str, Any]] = []
-        for idx in range(start, end):
-            raw = self.get_raw_sample(dataset_id, split, idx)
-            # 预览接口不返回 raw，避免大字段导致服务/前端卡顿
-            norm = self.normalize_sample(dataset_id, split, idx, raw, include_raw=False)
-            context = norm.get("context") or ""
-            query = norm.get("query") or ""
-            previews.append(
-                {
-                    "index": idx,
-                    "query": query,
-                    "context_preview": (context[:240] + "...") if isinstance(context, str) and len(context) > 240 else context,
-                    "context_length": len(context) if isinstance(context, str) else None,
-                    "label": norm.get("label"),
-                }
-            )
-
         return {
             "dataset_id": dataset_id,
             "split": split,
@@ -616,6 +626,20 @@ class DatasetService:
             "page": page,
             "page_size": page_size,
             "total_pages": (total + page_size - 1) // page_size,
-            "samples": previews,
+            "labels": index.labels,
+            "samples": index.rows(selected[start:start + page_size]) if start < total else [],
         }
 
+
+_service: Optional[DatasetService] = None
+_service_lock = threading.Lock()
+
+
+def get_dataset_service() -> DatasetService:
+    """进程内共享的 DatasetService（数据集路由与批量运行共用同一组缓存与预览索引）"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = DatasetService()
+    return _service
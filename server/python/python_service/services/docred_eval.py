@@ -0,0 +1,206 @@
+"""
+DocRED Evaluator
+把 DocRED 的 vertexSet/labels 映射为规范化的金标三元组，对预测图（默认 G_B）计算 P/R/F1，
+用于衡量抽取参数（window_size、num_beams、overlap_tokens、去重阈值等）提速带来的精度代价。
+
+- 实体：预测节点标签规范化后按 vertexSet 中任一 mention 名称对齐到实体编号，对不上的记为未对齐（计入假阳性）
+- 关系：金标 P-id 经 rel_info.json 映射为 Wikidata 属性名（REBEL 输出同一套名称）后规范化比较
+- 三元组编码为 int64（样本号 | 头 | 尾 | 关系），整个 split 用 numpy 的集合运算一次性求交
+- strict 要求关系一致；pair 只看有序实体对，用于区分实体对齐与关系命名的误差
+"""
+
+import json
+import re
+import statistics
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from kgforge import get_logger
+
+logger = get_logger(__name__)
+
+# 编码位宽：样本号 31 位、头/尾实体各 10 位、关系 12 位
+_ENTITY_BITS = 10
+_RELATION_BITS = 12
+_MAX_ENTITY = (1 << _ENTITY_BITS) - 1
+_MAX_RELATION = (1 << _RELATION_BITS) - 1
+_ARTICLE = re.compile(r"^(the|a|an) ")
+_SPACE_BEFORE_PUNCT = re.compile(r" (?=[,.;:!?)'])|(?<=\() ")
+
+
+def normalize_text(text: Any) -> str:
+    """规范化实体/关系名：NFKC、小写、合并空白、去掉 DocRED 分词残留的标点前空格与冠词"""
+    text = unicodedata.normalize("NFKC", str(text or "")).casefold()
+    text = " ".join(text.split())
+    text = _SPACE_BEFORE_PUNCT.sub("", text)
+    return _ARTICLE.sub("", text)
+
+
+def load_relation_names(path: Optional[Path]) -> Dict[str, str]:
+    """读取 DocRED rel_info.json（P-id -> 属性名）；缺失时返回空映射（关系按 P-id 比较）"""
+    if path is None or not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {pid: normalize_text(name) for pid, name in json.load(f).items()}
+
+
+class GoldDocument:
+    """单个 DocRED 样本的实体别名表与金标三元组"""
+
+    def __init__(self, sample: Dict[str, Any], relation_names: Dict[str, str]):
+        self.aliases: Dict[str, int] = {}
+        for vid, mentions in enumerate(sample.get("vertexSet", [])):
+            for mention in mentions:
+                # 同名 mention 指向多个实体时保留首个
+                self.aliases.setdefault(normalize_text(mention.get("name")), vid)
+        self.triples: List[Tuple[int, str, int]] = []
+        for label in sample.get("labels", []):
+            relation = relation_names.get(label["r"], normalize_text(label["r"]))
+            self.triples.append((int(label["h"]), relation, int(label["t"])))
+
+
+def graph_triples(graph: Any) -> List[Tuple[str, str, str]]:
+    """从 Graph 对象或 graph_to_dict 的输出中取 (头标签, 关系, 尾标签)"""
+    if isinstance(graph, dict):
+        nodes = graph.get("nodes") or {}
+        if isinstance(nodes, list):
+            nodes = {n.get("id"): n for n in nodes}
+        labels = {nid: (n.get("label") or nid) for nid, n in nodes.items()}
+        return [(labels.get(e.get("source"), e.get("source")), e.get("relation", ""), labels.get(e.get("target"), e.get("target")))
+                for e in graph.get("edges") or []]
+    return [(graph.nodes[e.source].label if e.source in graph.nodes else e.source, e.relation,
+             graph.nodes[e.target].label if e.target in graph.nodes else e.target) for e in graph.edges]
+
+
+class DocREDEvaluator:
+    """在整个 split 上累积金标与预测三元组，最后统一求交"""
+
+    def __init__(self, relation_names: Optional[Dict[str, str]] = None):
+        self.relation_names = relation_names or {}
+        self._relations: Dict[str, int] = {}
+        self._gold: List[int] = []
+        self._pred: List[int] = []
+        self._unaligned = 0
+        self._documents = 0
+
+    def _relation_id(self, relation: str) -> int:
+        # 0 保留给 pair 模式
+        rid = self._relations.setdefault(relation, len(self._relations) + 1)
+        if rid > _MAX_RELATION:
+            raise ValueError("关系种类超出编码上限")
+        return rid
+
+    @staticmethod
+    def _encode(doc: int, head: int, tail: int, relation: int) -> int:
+        return (((doc << _ENTITY_BITS | head) << _ENTITY_BITS | tail) << _RELATION_BITS) | relation
+
+    def add(self, sample: Dict[str, Any], graph: Any) -> None:
+        """加入一个样本：sample 为 DocRED 原始样本，graph 为该样本的预测图"""
+        doc = self._documents
+        self._documents += 1
+        gold = GoldDocument(sample, self.relation_names)
+        for head, relation, tail in gold.triples:
+            if head <= _MAX_ENTITY and tail <= _MAX_ENTITY:
+                self._gold.append(self._encode(doc, head, tail, self._relation_id(relation)))
+
+        seen = set()
+        for head_label, relation, tail_label in graph_triples(graph) if graph else []:
+            key = (normalize_text(head_label), normalize_text(relation), normalize_text(tail_label))
+            if key in seen:
+                continue
+            seen.add(key)
+            head, tail = gold.aliases.get(key[0]), gold.aliases.get(key[2])
+            if head is None or tail is None or head > _MAX_ENTITY or tail > _MAX_ENTITY:
+                self._unaligned += 1
+                continue
+            self._pred.append(self._encode(doc, head, tail, self._relation_id(key[1])))
+
+    def score(self) -> Dict[str, Any]:
+        gold = np.unique(np.array(self._gold, dtype=np.int64))
+        pred = np.unique(np.array(self._pred, dtype=np.int64))
+        relation_mask = np.int64(_MAX_RELATION)
+        out: Dict[str, Any] = {"documents": self._documents, "gold": int(gold.size),
+                               "predicted": int(pred.size) + self._unaligned, "unaligned": self._unaligned}
+        for mode, g, p in (("strict", gold, pred),
+                           ("pair", np.unique(gold & ~relation_mask), np.unique(pred & ~relation_mask))):
+            tp = int(np.intersect1d(g, p, assume_unique=True).size)
+            n_pred = int(p.size) + self._unaligned
+            precision = tp / n_pred if n_pred else 0.0
+            recall = tp / int(g.size) if g.size else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            out[mode] = {"tp": tp, "precision": round(precision, 4), "recall": round(recall, 4), "f1": round(f1, 4)}
+        return out
+
+
+def evaluate_batch(output_dir: Path, dataset_service=None, graph_key: str = "G_B",
+                   relation_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    对一次 DocRED 批量运行（batch_runner 输出目录）打分，并汇总单样本耗时。
+    预测图优先取 intermediate_graphs[graph_key]，缺失时退回最终图；失败样本记为空预测。
+    """
+    from python_service.services.batch_runner import MANIFEST_NAME, read_records
+
+    output_dir = Path(output_dir)
+    with open(output_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+        config = json.load(f)["config"]
+    if config["dataset_id"] != "docred":
+        raise ValueError(f"仅支持 DocRED 批量运行: {config['dataset_id']}")
+    if dataset_service is None:
+        from python_service.services.dataset_service import get_dataset_service
+        dataset_service = get_dataset_service()
+    if relation_names is None:
+        relation_names = load_relation_names(dataset_service.docred_data_dir() / "rel_info.json")
+
+    # 续跑会留下同一样本的多条记录，以最后一条为准
+    latest: Dict[int, Dict[str, Any]] = {}
+    for record in read_records(output_dir):
+        latest[record["index"]] = record
+
+    evaluator = DocREDEvaluator(relation_names)
+    latencies: List[int] = []
+    failed = 0
+    for index in sorted(latest):
+        record = latest[index]
+        result = record.get("result") or {}
+        if record.get("status") != "success":
+            failed += 1
+        else:
+            latencies.append(record.get("elapsed_ms", 0))
+        graph = (result.get("intermediate_graphs") or {}).get(graph_key) or result.get("graph")
+        evaluator.add(dataset_service.get_raw_sample("docred", config["split"], index), graph)
+
+    scores = evaluator.score()
+    scores.update(
+        failed=failed,
+        latency_ms={
+            "mean": round(statistics.fmean(latencies), 1) if latencies else None,
+            "p50": statistics.median(latencies) if latencies else None,
+            "p95": sorted(latencies)[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        },
+    )
+    return scores
+
+
+def pareto_table(rows: Iterable[Dict[str, Any]], latency_key: str = "p50", metric: str = "strict") -> List[Dict[str, Any]]:
+    """
+    rows: [{"name", "scores": evaluate_batch(...)}]；按延迟升序，标记延迟-F1 的帕累托前沿
+    （不存在另一配置延迟不更高且 F1 不更低并至少一项严格更优）
+    """
+    table = []
+    for row in rows:
+        scores = row["scores"]
+        table.append({"name": row["name"], "latency_ms": scores["latency_ms"][latency_key],
+                      "f1": scores[metric]["f1"], "precision": scores[metric]["precision"],
+                      "recall": scores[metric]["recall"], "failed": scores.get("failed", 0)})
+    inf = float("inf")
+    for row in table:
+        lat = row["latency_ms"] if row["latency_ms"] is not None else inf
+        row["pareto"] = not any(
+            (o["latency_ms"] if o["latency_ms"] is not None else inf) <= lat and o["f1"] >= row["f1"]
+            and ((o["latency_ms"] if o["latency_ms"] is not None else inf) < lat or o["f1"] > row["f1"])
+            for o in table if o is not row
+        )
+    return sorted(table, key=lambda r: (r["latency_ms"] is None, r["latency_ms"] or 0))
@@ -0,0 +1,278 @@
+"""
+FEVER Evidence Store
+FEVER 证据页面的本地存储（SQLite），取代逐样本的阻塞 Wikipedia 请求。
+
+- 可从官方 wiki-pages 转储（wiki-*.jsonl，字段 id/text/lines）批量导入，句子切分沿用转储的 lines，与 FEVER 标注的句号一致
+- 也可按标题批量预取（联网调用 Wikipedia API，正则分句后入库）；离线时只用本地数据
+- 查找本地优先；转储导入与批量预取完成后递增 generation，供上层（如预览索引）判断证据是否变化。
+  逐样本按需抓取的单页回写不递增（否则每次浏览样本都会让预览索引失效）
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from kgforge import get_logger
+from python_service.config.loader import get_config
+
+logger = get_logger(__name__)
+
+WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+# Wikipedia 对无 UA/异常 UA 有时会 403，这里加一个稳定 UA
+WIKI_HEADERS = {"User-Agent": "PRISM-DynHalting/0.1 (+https://example.com; contact: local-dev)"}
+MAX_PAGE_CHARS = 200_000
+IMPORT_BATCH = 2000
+
+# FEVER 页面 id 中的转义记号
+_FEVER_TOKENS = {"-LRB-": "(", "-RRB-": ")", "-LSB-": "[", "-RSB-": "]", "-LCB-": "{", "-RCB-": "}", "-COLON-": ":"}
+
+PageRecord = Tuple[str, List[str]]  # (text, sentences)
+
+
+def default_store_path() -> Path:
+    configured = os.getenv("PRISM_FEVER_EVIDENCE_DB") or (get_config().get("evidence") or {}).get("fever_db")
+    project_root = Path(__file__).resolve().parents[4]
+    if configured:
+        path = Path(configured)
+        return path if path.is_absolute() else project_root / path
+    return project_root / ".cache" / "evidence" / "fever_wiki.sqlite"
+
+
+def offline_mode() -> bool:
+    """PRISM_FEVER_OFFLINE=1 或配置 evidence.offline: true 时不访问网络"""
+    env = os.getenv("PRISM_FEVER_OFFLINE")
+    if env is not None:
+        return env.lower() in ("1", "true", "yes")
+    return bool((get_config().get("evidence") or {}).get("offline", False))
+
+
+def fever_title_to_wiki(title: str) -> str:
+    """FEVER 页面 id（下划线、-LRB- 等记号）转为 Wikipedia 标题"""
+    for token, char in _FEVER_TOKENS.items():
+        title = title.replace(token, char)
+    return title.replace("_", " ").strip()
+
+
+def split_sentences(text: str) -> List[str]:
+    """简单句分割（英文）；转储导入的页面不走这里"""
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+
+def parse_dump_lines(lines: str) -> List[str]:
+    """解析转储的 lines 字段（"<句号>\\t<句子>\\t<链接>...\\n"），按句号放置，缺号处为空串"""
+    sentences: List[str] = []
+    for row in lines.split("\n"):
+        parts = row.split("\t")
+        if len(parts) < 2 or not parts[0].isdigit():
+            continue
+        sid = int(parts[0])
+        while len(sentences) <= sid:
+            sentences.append("")
+        sentences[sid] = parts[1]
+    return sentences
+
+
+def fetch_wikipedia_page(title: str, timeout: float = 15) -> str:
+    """通过 Wikipedia API 获取页面纯文本（英文）"""
+    import requests
+
+    resp = requests.get(
+        WIKI_API_URL,
+        headers=WIKI_HEADERS,
+        params={
+            "action": "query",
+            "format": "json",
+            "prop": "extracts",
+            "explaintext": 1,
+            "redirects": 1,
+            "titles": fever_title_to_wiki(title),
+        },
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    pages = (resp.json().get("query") or {}).get("pages") or {}
+    extract = ""
+    for _, page in pages.items():
+        extract = page.get("extract") or ""
+        break
+    return re.sub(r"\n{3,}", "\n\n", extract).strip()[:MAX_PAGE_CHARS]
+
+
+class EvidenceStore:
+    """SQLite 页面库（每线程一个连接，WAL 模式支持多读单写）"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else default_store_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "title TEXT PRIMARY KEY, text TEXT NOT NULL, sentences TEXT NOT NULL, "
+                "source TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(str(self.path), timeout=30)
+        return conn
+
+    # ---- 读 ----
+
+    def get_page(self, title: str) -> Optional[PageRecord]:
+        row = self._conn().execute("SELECT text, sentences FROM pages WHERE title = ?", (title,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def missing(self, titles: Iterable[str]) -> List[str]:
+        """返回本地尚未收录的标题（保持输入顺序、去重）"""
+        conn = self._conn()
+        out, seen = [], set()
+        for title in titles:
+            if not title or title in seen:
+                continue
+            seen.add(title)
+            if conn.execute("SELECT 1 FROM pages WHERE title = ?", (title,)).fetchone() is None:
+                out.append(title)
+        return out
+
+    @property
+    def generation(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        by_source = dict(conn.execute("SELECT source, COUNT(*) FROM pages GROUP BY source").fetchall())
+        return {"path": str(self.path), "pages": sum(by_source.values()), "by_source": by_source, "generation": self.generation}
+
+    # ---- 写 ----
+
+    def put_pages(self, records: Iterable[Tuple[str, str, List[str]]], source: str, bump: bool = True) -> int:
+        """批量写入 (title, text, sentences)，同名覆盖；返回写入条数。bump=False 时不递增 generation"""
+        now = time.time()
+        rows = [(title, text, json.dumps(sentences, ensure_ascii=False), source, now) for title, text, sentences in records]
+        if not rows:
+            return 0
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", rows)
+                if bump:
+                    self._bump(conn)
+        return len(rows)
+
+    def put_page(self, title: str, text: str, sentences: Optional[List[str]] = None, source: str = "api"):
+        """单页回写（按需抓取），不递增 generation"""
+        self.put_pages([(title, text, sentences if sentences is not None else split_sentences(text))], source, bump=False)
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection):
+        conn.execute(
+            "INSERT INTO meta VALUES ('generation', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def bump_generation(self):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._bump(conn)
+
+    def import_dump(self, paths: Iterable[Path], progress: Optional[Callable[[int], None]] = None) -> int:
+        """导入 FEVER wiki-pages 转储（目录或 wiki-*.jsonl 文件）"""
+        files: List[Path] = []
+        for path in paths:
+            path = Path(path)
+            files.extend(sorted(path.glob("*.jsonl")) if path.is_dir() else [path])
+
+        total = 0
+        batch: List[Tuple[str, str, List[str]]] = []
+        for records in (self._iter_dump(f) for f in files):
+            for record in records:
+                batch.append(record)
+                if len(batch) >= IMPORT_BATCH:
+                    total += self.put_pages(batch, source="dump", bump=False)
+                    batch = []
+                    if progress:
+                        progress(total)
+        total += self.put_pages(batch, source="dump", bump=False)
+        if total:
+            self.bump_generation()
+        if progress:
+            progress(total)
+        logger.info(f"Imported {total} FEVER wiki page(s) into {self.path}")
+        return total
+
+    @staticmethod
+    def _iter_dump(path: Path) -> Iterator[Tuple[str, str, List[str]]]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    page = json.loads(line)
+                except ValueError:
+                    continue
+                title = page.get("id")
+                if not title:
+                    continue
+                text = page.get("text") or ""
+                lines = page.get("lines")
+                sentences = parse_dump_lines(lines) if lines else split_sentences(text)
+                yield title, text, sentences
+
+    def prefetch(self, titles: Iterable[str], workers: int = 8,
+                 fetcher: Callable[[str], str] = fetch_wikipedia_page) -> Dict[str, Any]:
+        """联网批量抓取本地缺失的页面；离线模式下只报告缺失数"""
+        missing = self.missing(titles)
+        report: Dict[str, Any] = {"missing": len(missing), "fetched": 0, "failed": 0, "errors": {}}
+        if not missing or offline_mode():
+            return report
+
+        def fetch(title: str):
+            try:
+                return title, fetcher(title), None
+            except Exception as e:
+                return title, None, e
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for title, text, error in pool.map(fetch, missing):
+                if error is not None:
+                    report["failed"] += 1
+                    report["errors"][title] = str(error)
+                    continue
+                self.put_page(title, text, source="api")
+                report["fetched"] += 1
+        if report["fetched"]:
+            self.bump_generation()
+        logger.info(f"FEVER prefetch: {report['fetched']} fetched, {report['failed']} failed")
+        return report
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store: Optional[EvidenceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_evidence_store() -> EvidenceStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EvidenceStore()
+    return _store
@@ -0,0 +1,186 @@
+"""
+Indexed JSONL Store
+把"顶层为数组"的大 JSON 文件一次性流式转换为 JSONL + 偏移索引，之后按下标 O(1) 随机读取，
+不再整体 json.load 进内存（DocRED train_distant 等文件达数 GB 内存）。
+
+磁盘布局（<cache_dir>/<name>.*）：
+- <name>.jsonl      每行一个元素
+- <name>.idx        uint64 小端偏移数组，长度 = 元素数 + 1（最后一项为文件末尾）
+- <name>.meta.json  源文件指纹（size/mtime）与元素数；源文件变化时自动重建
+"""
+
+import json
+import os
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from kgforge import get_logger
+
+logger = get_logger(__name__)
+
+READ_CHUNK = 1 << 20
+FORMAT_VERSION = 1
+
+
+def iter_json_array(f: TextIO, chunk_size: int = READ_CHUNK) -> Iterator[Any]:
+    """逐个产出顶层 JSON 数组中的元素，内存占用与单个元素同阶"""
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    # 定位 '['
+    while True:
+        stripped = buf[pos:].lstrip()
+        if stripped:
+            if stripped[0] != "[":
+                raise ValueError("顶层不是 JSON 数组")
+            pos = len(buf) - len(stripped) + 1
+            break
+        if not fill():
+            raise ValueError("空文件")
+
+    while True:
+        # 跳过空白与逗号
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or not fill():
+                break
+        if pos >= len(buf):
+            raise ValueError("JSON 数组未闭合")
+        if buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if not fill():
+                raise
+            continue
+        # 数字等标量可能恰好在块边界被截断，读到更多数据后再确认
+        if end == len(buf) and not eof and fill():
+            continue
+        yield obj
+        pos = end
+
+
+class IndexedJsonl:
+    """JSONL + 偏移索引的只读序列（支持 len() 与下标访问，线程安全）"""
+
+    def __init__(self, jsonl_path: Path, index_path: Path):
+        self.jsonl_path = Path(jsonl_path)
+        offsets = array("Q")
+        with open(index_path, "rb") as f:
+            offsets.frombytes(f.read())
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        self._offsets = offsets
+        self._fd = os.open(self.jsonl_path, os.O_RDONLY)
+        self._closed = False
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    @property
+    def nbytes(self) -> int:
+        """常驻内存：仅偏移数组"""
+        return self._offsets.itemsize * len(self._offsets)
+
+    def read_bytes(self, index: int) -> bytes:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"索引超出范围（{index} >= {len(self)}）")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        # pread 不移动共享文件指针，多线程并发读取无需加锁
+        return os.pread(self._fd, end - start, start)
+
+    def __getitem__(self, index: int) -> Any:
+        return json.loads(self.read_bytes(index))
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if not self._closed:
+            os.close(self._fd)
+            self._closed = True
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _fingerprint(source: Path) -> Dict[str, Any]:
+    st = os.stat(source)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "version": FORMAT_VERSION}
+
+
+def convert_json_array(source: Path, cache_dir: Path, name: str) -> int:
+    """流式转换 source（顶层数组）为 JSONL + 索引，原子替换旧文件，返回元素数"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    jsonl_path = cache_dir / f"{name}.jsonl"
+    index_path = cache_dir / f"{name}.idx"
+    meta_path = cache_dir / f"{name}.meta.json"
+    tmp_suffix = f".tmp{os.getpid()}"
+
+    offsets = array("Q", [0])
+    with open(source, "r", encoding="utf-8") as src, open(str(jsonl_path) + tmp_suffix, "wb") as out:
+        position = 0
+        for item in iter_json_array(src):
+            line = json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n"
+            out.write(line)
+            position += len(line)
+            offsets.append(position)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    with open(str(index_path) + tmp_suffix, "wb") as f:
+        offsets.tofile(f)
+
+    os.replace(str(jsonl_path) + tmp_suffix, jsonl_path)
+    os.replace(str(index_path) + tmp_suffix, index_path)
+    with open(str(meta_path) + tmp_suffix, "w", encoding="utf-8") as f:
+        json.dump({"source": str(source), "count": len(offsets) - 1, **_fingerprint(source)}, f)
+    os.replace(str(meta_path) + tmp_suffix, meta_path)
+    return len(offsets) - 1
+
+
+_convert_lock = threading.Lock()
+
+
+def open_indexed(source: Path, cache_dir: Path, name: Optional[str] = None) -> IndexedJsonl:
+    """打开 source 对应的索引存储；不存在或源文件已变化时先（重新）转换"""
+    source = Path(source)
+    name = name or source.stem
+    meta_path = cache_dir / f"{name}.meta.json"
+    with _convert_lock:
+        fresh = False
+        if meta_path.exists():
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                fingerprint = _fingerprint(source)
+                fresh = all(meta.get(k) == v for k, v in fingerprint.items())
+            except (OSError, ValueError):
+                fresh = False
+        if not fresh:
+            logger.info(f"Building JSONL index for {source} -> {cache_dir}/{name}.jsonl")
+            count = convert_json_array(source, cache_dir, name)
+            logger.info(f"Indexed {count} record(s) from {source.name}")
+    return IndexedJsonl(cache_dir / f"{name}.jsonl", cache_dir / f"{name}.idx")
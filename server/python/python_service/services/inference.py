@@ -6,14 +6,18 @@ Inference Engine (Full Telemetry Edition)
 
 import time
 import threading
-from typing import Dict, Any, Optional
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Any, List, Optional
 from kgforge import get_logger
 from kgforge.models import Graph
+from kgforge.utils.profiling import profile_session, profile_span
+from kgforge.utils.stage_stream import emit_stage, stage_sink
+from kgforge.utils.checkpoint import checkpoint_scope
 from python_service.schemas.graph_schema import graph_to_dict
 from python_service.core.factory import UnifiedFactory
 from kgforge.components.base import TaskCancelledError
-from python_service.core.errors import PrismAuthError, PrismRateLimitError
-from python_service.core.context import set_experiment_id, clear_experiment_id, get_current_stats, get_current_logs
+from python_service.core.errors import PrismAuthError, PrismError, PrismRateLimitError
+from python_service.core.context import set_experiment_id, clear_experiment_id, get_current_stats, get_current_logs, get_current_llm_usage
 import openai
 import sys
 import platform
@@ -27,6 +31,32 @@ CANCELLATION_EVENTS: Dict[str, threading.Event] = {}
 class InferenceEngine:
     """推理执行引擎"""
 
+    @staticmethod
+    def _result_metadata(result: Any) -> Dict[str, Any]:
+        """读取编排器结果的元数据（兼容 ExperimentResult 访问器与普通属性）"""
+        if hasattr(result, "get_metadata"):
+            return result.get_metadata()
+        return getattr(result, "metadata", {})
+
+    @staticmethod
+    def _result_graphs(result: Any) -> Dict[str, Graph]:
+        """读取编排器结果的阶段图（兼容 ExperimentResult 访问器与普通属性）"""
+        if hasattr(result, "get_graphs"):
+            return result.get_graphs()
+        return getattr(result, "intermediate_graphs", {})
+
+    @staticmethod
+    def _result_metrics(result: Any) -> Dict[str, Any]:
+        if hasattr(result, "get_metrics"):
+            return result.get_metrics()
+        return getattr(result, "metrics", {})
+
+    @staticmethod
+    def _result_trace(result: Any) -> List[Dict[str, Any]]:
+        if hasattr(result, "get_trace"):
+            return result.get_trace()
+        return getattr(result, "trace", [])
+
     def cancel_task(self, experiment_id: str) -> bool:
         """取消指定实验任务"""
         if experiment_id in CANCELLATION_EVENTS:
@@ -35,6 +65,53 @@ class InferenceEngine:
             return True
         return False
 
+    @staticmethod
+    @contextmanager
+    def _checkpoint_scope(pipeline: Any, experiment_id: Optional[str], resume: bool, request: Dict[str, Any]):
+        """
+        支持检查点的编排器带 experiment_id 运行时开启检查点作用域；首次运行同时保存请求（不含 api_key）供恢复时重建
+        """
+        from python_service.services.checkpoints import (
+            checkpoint_config, checkpoints_enabled, get_checkpoint_store, prune_checkpoints,
+        )
+        if not experiment_id or not getattr(pipeline, "supports_checkpoints", False) or not checkpoints_enabled():
+            yield None
+            return
+        store = get_checkpoint_store()
+        if not resume:
+            store.delete(experiment_id)
+            prune_checkpoints(keep=experiment_id)
+            store.save_meta(experiment_id, {**request, "experiment_id": experiment_id})
+        try:
+            with checkpoint_scope(store, experiment_id, resume=resume,
+                                  keep_completed=checkpoint_config()["keep_completed"]) as handle:
+                yield handle
+        finally:
+            # 一轮状态都未写入（如抽取阶段即失败）时无从恢复，不遗留请求元数据
+            if not store.path(experiment_id).exists():
+                store.delete(experiment_id)
+
+    def _run_isolated(self, request: Dict[str, Any], on_stage: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """
+        在隔离 worker 中执行；取消信号照常注册，置位后由进程池直接终止 worker。
+        worker 回传的阶段（已序列化的图字典）在本线程重新发布给阶段监听器（on_stage 及外层如任务管理器）。
+        """
+        from python_service.services.isolation import get_isolated_pool
+
+        experiment_id = request.get("experiment_id")
+        cancel_event = threading.Event()
+        if experiment_id:
+            set_experiment_id(experiment_id)
+            cancel_event = CANCELLATION_EVENTS.setdefault(experiment_id, cancel_event)
+        try:
+            logger.info(f"Dispatching pipeline {request['orchestrator']} to isolated worker (ID: {experiment_id})")
+            with (stage_sink(on_stage) if on_stage else nullcontext()):
+                return get_isolated_pool().run(request, cancel_event=cancel_event, on_stage=emit_stage)
+        finally:
+            if experiment_id:
+                CANCELLATION_EVENTS.pop(experiment_id, None)
+                clear_experiment_id()
+
     def run_dynamic(
         self,
         goal: str,
@@ -45,16 +122,35 @@ class InferenceEngine:
         params: Optional[Dict[str, Any]] = None,
         api_key: Optional[str] = None,
         experiment_id: Optional[str] = None,
+        on_stage: Optional[Callable[[str, Graph], None]] = None,
+        include_intermediate: bool = True,
+        isolated: bool = False,
+        resume: bool = False,
     ) -> Dict[str, Any]:
+        """
+        on_stage: 编排器每记录一个阶段图时在编排线程中回调 (stage_name, graph)，用于流式转发
+        include_intermediate: 为 False 时结果不含 intermediate_graphs（阶段图已经流式发出）
+        isolated: 在资源受限的工作子进程中执行（见 services/isolation.py）；只能开启，配置 isolation.enabled 为真时始终隔离
+        resume: 从 experiment_id 的检查点继续（见 services/checkpoints.py）；没有可用检查点时从头运行
+        """
+        from python_service.services.isolation import isolation_enabled
+        if isolated or isolation_enabled():
+            return self._run_isolated(
+                dict(goal=goal, text=text, orchestrator=orchestrator, components=components,
+                     component_params=component_params, params=params, api_key=api_key,
+                     experiment_id=experiment_id, include_intermediate=include_intermediate, resume=resume),
+                on_stage=on_stage,
+            )
+
         start_time = time.time()
         
         if experiment_id:
             set_experiment_id(experiment_id)
         
-        # 1. 注册取消信号
+        # 1. 注册取消信号（沿用调用方预先登记的信号，如任务管理器在任务开始前登记的）
         cancel_event = threading.Event()
         if experiment_id:
-            CANCELLATION_EVENTS[experiment_id] = cancel_event
+            cancel_event = CANCELLATION_EVENTS.setdefault(experiment_id, cancel_event)
 
         try:
             # 准备物化参数
@@ -70,35 +166,51 @@ class InferenceEngine:
                 creation_params["api_key"] = api_key
 
             logger.info(f"Materializing orchestration pipeline: {orchestrator} (ID: {experiment_id})")
-            pipeline = UnifiedFactory.create_component("orchestrators", orchestrator, params=creation_params)
-            
-            # 注入取消句柄 (如果支持)
-            if hasattr(pipeline, "set_cancellation_event"):
-                pipeline.set_cancellation_event(cancel_event)
+            # lease：本次请求借出的预热组件实例在结束时归还实例池
+            with profile_session("infer") as prof, UnifiedFactory.lease():
+                pipeline = UnifiedFactory.create_component("orchestrators", orchestrator, params=creation_params)
+                
+                # 注入取消句柄 (如果支持)
+                if hasattr(pipeline, "set_cancellation_event"):
+                    pipeline.set_cancellation_event(cancel_event)
 
-            # 执行
-            result = pipeline.run(goal=goal, text=text, **(params or {}))
-            
-            # --- 结果全量映射 (Protocol-Aware) ---
-            output = {
-                "status": "success",
-                "graph": graph_to_dict(result.graph) if hasattr(result, "graph") else {},
-                "metrics": getattr(result, "metrics", {}),
-                "intermediate_graphs": {
-                    k: graph_to_dict(g) for k, g in getattr(result, "intermediate_graphs", {}).items()
-                },
-                "trace": getattr(result, "trace", []),
-                "logs": get_current_logs(), # Persist full logs
-                "intermediate_stats": {
-                    **getattr(result, "intermediate_stats", {}),
-                    **get_current_stats() 
-                },
-                "metadata": {
-                    "orchestrator_id": orchestrator,
-                    "execution_time_ms": int((time.time() - start_time) * 1000),
-                    **getattr(result, "metadata", {})
-                }
-            }
+                # 执行
+                with profile_span("run"), (stage_sink(on_stage) if on_stage else nullcontext()), \
+                        self._checkpoint_scope(pipeline, experiment_id, resume, dict(
+                            goal=goal, text=text, orchestrator=orchestrator, components=components,
+                            component_params=component_params, params=params)):
+                    result = pipeline.run(goal=goal, text=text, **(params or {}))
+                
+                # 本实验的 LLM 用量（token、延迟、重试、费用），随结果指标返回
+                llm_usage = get_current_llm_usage()
+                if llm_usage is not None and hasattr(result, "record_metric"):
+                    result.record_metric("llm_usage", llm_usage.to_dict())
+                
+                # --- 结果全量映射 (Protocol-Aware) ---
+                with profile_span("serialize"):
+                    output = {
+                        "status": "success",
+                        "graph": graph_to_dict(result.graph) if hasattr(result, "graph") else {},
+                        "metrics": self._result_metrics(result),
+                        "intermediate_graphs": {
+                            k: graph_to_dict(g) for k, g in self._result_graphs(result).items()
+                        } if include_intermediate else {},
+                        "trace": self._result_trace(result),
+                        "logs": get_current_logs(), # Persist full logs
+                        "intermediate_stats": {
+                            **getattr(result, "intermediate_stats", {}),
+                            **get_current_stats() 
+                        },
+                        "metadata": {
+                            "orchestrator_id": orchestrator,
+                            "execution_time_ms": int((time.time() - start_time) * 1000),
+                            **self._result_metadata(result)
+                        }
+                    }
+
+            # 全链路剖析树（工厂组装 + 编排执行 + 序列化），覆盖编排器自身记录的子树
+            output["metadata"]["profile"] = prof.to_dict()
+            logger.telemetry({"profile": output["metadata"]["profile"]})
             return output
 
         except TaskCancelledError:
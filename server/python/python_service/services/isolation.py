@@ -0,0 +1,423 @@
+"""
+Isolated Execution
+在池化的工作子进程中运行推理管线，并对每个任务施加硬性资源上限，API 进程不受病态输入拖累。
+
+- 内存：主进程按 poll_interval 读取 worker 的 RSS（/proc），超过 max_rss_mb 即终止 worker；
+  address_space_mb 额外设置 RLIMIT_AS 作为进程内兜底（torch 会预留大量虚拟地址，默认关闭）
+- CPU：每个任务开始前把 RLIMIT_CPU 软限制设为“已用 + cpu_seconds”，超限时 SIGXCPU 在 worker 内转为异常；
+  硬限制保持不变（非 root 进程无法调高硬限制）。阻塞在 C 扩展中无法处理信号时，主进程按 /proc 读取的
+  CPU 时间在超出 cpu_seconds + CPU_GRACE_SECONDS 后终止 worker
+- 墙钟：max_wall_seconds
+- 取消：直接终止 worker，可中断正在进行的 model.generate / LLM 调用，不依赖编排器的协作式检查
+- 回传：结果、阶段图与日志记录经 Pipe 发回；日志在主进程交给全局 Handler（WebSocket 广播、任务进度）
+
+被终止、超限或达到 max_tasks_per_worker 的 worker 不再复用，下次借出时补建。
+worker 默认以 forkserver 方式创建：由单线程的 fork server 派生，避免从多线程的 API 进程直接 fork。
+"""
+
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from kgforge import get_logger
+from python_service.config.loader import get_config
+from python_service.core.errors import PrismCapacityError, PrismError, PrismResourceLimitError
+
+try:
+    import resource
+except ImportError:  # Windows 无 resource 模块，仅保留 RSS 看门狗与墙钟限制
+    resource = None
+
+logger = get_logger(__name__)
+
+WORKER_ENV = "PRISM_ISOLATED_WORKER"
+CPU_GRACE_SECONDS = 5
+DEFAULTS = {
+    "enabled": False,
+    "workers": 2,
+    "start_method": "forkserver",
+    "max_rss_mb": 4096,
+    "cpu_seconds": 600,
+    "max_wall_seconds": 900,
+    "address_space_mb": None,
+    "max_tasks_per_worker": 50,
+    "checkout_timeout": 300,
+    "poll_interval": 0.2,
+}
+
+
+def isolation_config() -> Dict[str, Any]:
+    return {**DEFAULTS, **(get_config().get("isolation") or {})}
+
+
+def in_isolated_worker() -> bool:
+    return os.getenv(WORKER_ENV) == "1"
+
+
+def isolation_enabled() -> bool:
+    """配置 isolation.enabled 或环境变量 PRISM_ISOLATION=1；worker 内部恒为 False"""
+    if in_isolated_worker():
+        return False
+    env = os.getenv("PRISM_ISOLATION")
+    if env is not None:
+        return env.lower() in ("1", "true", "yes")
+    return bool(isolation_config()["enabled"])
+
+
+def read_cpu_seconds(pid: int) -> Optional[float]:
+    """进程累计 CPU 时间（用户态 + 内核态，秒）；无 /proc 的平台返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rpartition(")")[2].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """进程当前 RSS（MB）；无 /proc 的平台返回 None"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+# ==================== worker 进程 ====================
+
+class _CpuLimitExceeded(BaseException):
+    """SIGXCPU 转换的异常；继承 BaseException，不会被管线内的 except Exception 吞掉"""
+
+
+def _on_sigxcpu(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+class _ForwardHandler(logging.Handler):
+    """把 worker 内的日志记录（含遥测）转发给主进程"""
+
+    def __init__(self, send: Callable[[Any], None]):
+        super().__init__()
+        self._send = send
+
+    def emit(self, record):
+        try:
+            self._send(("log", {
+                "name": record.name,
+                "levelno": record.levelno,
+                "levelname": record.levelname,
+                "msg": record.getMessage(),
+                "telemetry": getattr(record, "telemetry", None),
+            }))
+        except Exception:
+            pass
+
+
+def _run_request(request: Dict[str, Any], on_stage: Callable[[str, Any], None]) -> Dict[str, Any]:
+    from python_service.services.inference import InferenceEngine
+    return InferenceEngine().run_dynamic(**request, on_stage=on_stage, isolated=False)
+
+
+def _worker_main(conn, limits: Dict[str, Any], target: Callable):
+    os.environ[WORKER_ENV] = "1"
+    send_lock = threading.Lock()
+
+    def send(message):
+        # 编排器的并发阶段（DAG）可能同时记录日志，Connection 本身不是线程安全的
+        with send_lock:
+            conn.send(message)
+
+    from kgforge.utils.logger import register_global_handler
+    register_global_handler(_ForwardHandler(send))
+
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+        if limits.get("address_space_mb"):
+            size = int(limits["address_space_mb"]) << 20
+            resource.setrlimit(resource.RLIMIT_AS, (size, size))
+
+    def on_stage(name: str, graph: Any):
+        from kgforge.models import Graph
+        from python_service.schemas.graph_schema import graph_to_dict
+        send(("stage", (name, graph_to_dict(graph) if isinstance(graph, Graph) else graph)))
+
+    while True:
+        try:
+            kind, request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if kind == "stop":
+            return
+
+        if resource is not None and limits.get("cpu_seconds"):
+            # 只移动软限制；设置失败时由主进程的 CPU 看门狗兜底
+            try:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                soft = int(usage.ru_utime + usage.ru_stime) + int(limits["cpu_seconds"]) + 1
+                hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+                if hard != resource.RLIM_INFINITY:
+                    soft = min(soft, hard)
+                resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+            except (ValueError, OSError) as e:
+                logger.warning(f"Could not set RLIMIT_CPU: {e}")
+
+        try:
+            send(("result", target(request, on_stage)))
+        except _CpuLimitExceeded:
+            send(("error", {"code": "RESOURCE_LIMIT", "reason": "cpu",
+                            "message": f"CPU time limit exceeded ({limits['cpu_seconds']}s)"}))
+            return
+        except MemoryError:
+            send(("error", {"code": "RESOURCE_LIMIT", "reason": "memory",
+                            "message": "Memory limit exceeded (address space)"}))
+            return
+        except PrismError as e:
+            send(("error", {**e.to_dict()["error"], "status_code": e.status_code}))
+        except BaseException as e:
+            send(("error", {"code": "INTERNAL_ERROR", "message": str(e), "type": type(e).__name__}))
+
+
+# ==================== 主进程侧 ====================
+
+class _Worker:
+    _ids = itertools.count(1)
+
+    def __init__(self, ctx, limits: Dict[str, Any], target: Callable):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, limits, target),
+                                   name=f"prism-isolated-{next(self._ids)}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(("stop", None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=2)
+        self.kill()
+
+
+class IsolatedPool:
+    """子进程 worker 池：每个 worker 同一时刻只执行一个任务"""
+
+    def __init__(self, workers: int = 2, start_method: Optional[str] = None, max_rss_mb: Optional[float] = None,
+                 cpu_seconds: Optional[int] = None, max_wall_seconds: Optional[float] = None,
+                 address_space_mb: Optional[int] = None, max_tasks_per_worker: int = 50,
+                 checkout_timeout: float = 300, poll_interval: float = 0.2, target: Callable = _run_request):
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context(start_method if start_method in methods else None)
+        self.size = max(1, int(workers))
+        self.max_rss_mb = max_rss_mb
+        self.max_wall_seconds = max_wall_seconds
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.checkout_timeout = checkout_timeout
+        self.poll_interval = poll_interval
+        self._limits = {"cpu_seconds": cpu_seconds, "address_space_mb": address_space_mb}
+        self._target = target
+        self._idle: List[_Worker] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._stats = {"tasks": 0, "succeeded": 0, "failed": 0, "spawned": 0,
+                       "killed": {"cancelled": 0, "memory": 0, "cpu": 0, "wall": 0, "crashed": 0}}
+
+    # ---- 借还 ----
+
+    def _checkout(self) -> _Worker:
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            raise PrismCapacityError("No isolated worker became free in time",
+                                     details={"workers": self.size, "timeout": self.checkout_timeout})
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    return worker
+        try:
+            worker = _Worker(self._ctx, self._limits, self._target)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._stats["spawned"] += 1
+        return worker
+
+    def _checkin(self, worker: _Worker, healthy: bool):
+        worker.tasks += 1
+        if healthy and worker.alive and worker.tasks < self.max_tasks_per_worker:
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.stop() if healthy else worker.kill()
+        self._slots.release()
+
+    def _killed(self, worker: _Worker, reason: str):
+        worker.kill()
+        with self._lock:
+            self._stats["killed"][reason] += 1
+
+    # ---- 执行 ----
+
+    def run(self, request: Dict[str, Any], cancel_event: Optional[threading.Event] = None,
+            on_stage: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """在 worker 中执行 request（run_dynamic 的关键字参数），阻塞直到结果返回、出错、超限或被取消"""
+        worker = self._checkout()
+        healthy = False
+        with self._lock:
+            self._stats["tasks"] += 1
+        try:
+            worker.conn.send(("run", request))
+            started = time.monotonic()
+            cpu_limit = self._limits.get("cpu_seconds")
+            cpu_started = read_cpu_seconds(worker.process.pid) if cpu_limit else None
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    self._killed(worker, "cancelled")
+                    return {"status": "cancelled", "message": "Task cancelled by user."}
+                elapsed = time.monotonic() - started
+                if self.max_wall_seconds and elapsed > self.max_wall_seconds:
+                    self._killed(worker, "wall")
+                    raise PrismResourceLimitError(f"Wall time limit exceeded ({self.max_wall_seconds}s)",
+                                                  details={"elapsed_s": round(elapsed, 1)})
+                cpu = read_cpu_seconds(worker.process.pid) if cpu_started is not None else None
+                if cpu is not None and cpu - cpu_started > cpu_limit + CPU_GRACE_SECONDS:
+                    self._killed(worker, "cpu")
+                    raise PrismResourceLimitError(f"CPU time limit exceeded ({cpu_limit}s)",
+                                                  details={"cpu_s": round(cpu - cpu_started, 1)})
+                rss = read_rss_mb(worker.process.pid) if self.max_rss_mb else None
+                if rss is not None and rss > self.max_rss_mb:
+                    self._killed(worker, "memory")
+                    raise PrismResourceLimitError(f"Memory limit exceeded ({self.max_rss_mb} MB)",
+                                                  details={"rss_mb": round(rss, 1)})
+
+                if not worker.conn.poll(self.poll_interval):
+                    if not worker.alive:
+                        self._raise_dead(worker)
+                    continue
+                try:
+                    kind, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(timeout=1)
+                    self._raise_dead(worker)
+
+                if kind == "log":
+                    self._dispatch_log(payload)
+                elif kind == "stage":
+                    if on_stage is not None:
+                        try:
+                            on_stage(*payload)
+                        except Exception:
+                            logger.warning(f"Stage listener failed on {payload[0]}", exc_info=True)
+                elif kind == "result":
+                    healthy = True
+                    with self._lock:
+                        self._stats["succeeded"] += 1
+                    return payload
+                elif kind == "error":
+                    # worker 在 CPU/内存超限后自行退出，其余错误后仍可复用
+                    healthy = payload.get("code") != "RESOURCE_LIMIT"
+                    if not healthy:
+                        with self._lock:
+                            self._stats["killed"][payload.get("reason", "crashed")] += 1
+                    raise self._rebuild_error(payload)
+        except BaseException:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            self._checkin(worker, healthy)
+
+    def _raise_dead(self, worker: _Worker):
+        code = worker.process.exitcode
+        signals = {getattr(signal, "SIGXCPU", None): "cpu", getattr(signal, "SIGKILL", None): "memory"}
+        if code is not None and code < 0 and -code in signals:
+            # SIGXCPU 未被处理或达到硬限制；SIGKILL 多为系统 OOM killer
+            reason = signals[-code]
+            with self._lock:
+                self._stats["killed"][reason] += 1
+            raise PrismResourceLimitError("Isolated worker was killed by a resource limit", details={"exitcode": code})
+        with self._lock:
+            self._stats["killed"]["crashed"] += 1
+        raise RuntimeError(f"Pipeline failure: isolated worker exited unexpectedly (exitcode={code})")
+
+    @staticmethod
+    def _rebuild_error(payload: Dict[str, Any]) -> Exception:
+        if payload.get("code") == "RESOURCE_LIMIT":
+            return PrismResourceLimitError(payload.get("message"), details=payload.get("details"))
+        if "status_code" in payload:
+            return PrismError(payload.get("message"), code=payload.get("code"),
+                              status_code=payload["status_code"], details=payload.get("details"))
+        return RuntimeError(payload.get("message"))
+
+    @staticmethod
+    def _dispatch_log(payload: Dict[str, Any]):
+        """在主进程（当前线程持有实验 ID 上下文）中把 worker 日志交给全局 Handler"""
+        from kgforge.utils.logger import dispatch_to_global_handlers
+        record = logging.makeLogRecord({
+            "name": payload["name"], "levelno": payload["levelno"], "levelname": payload["levelname"],
+            "msg": payload["msg"], "args": None,
+        })
+        if payload.get("telemetry") is not None:
+            record.telemetry = payload["telemetry"]
+        dispatch_to_global_handlers(record)
+
+    # ---- 管理 ----
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = [w for w in self._idle if w.alive]
+            return {
+                "size": self.size,
+                "idle": len(idle),
+                "idle_rss_mb": [read_rss_mb(w.process.pid) for w in idle],
+                "limits": {"max_rss_mb": self.max_rss_mb, "max_wall_seconds": self.max_wall_seconds, **self._limits},
+                **{k: (dict(v) if isinstance(v, dict) else v) for k, v in self._stats.items()},
+            }
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+_pool: Optional[IsolatedPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_isolated_pool() -> IsolatedPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = isolation_config()
+                _pool = IsolatedPool(
+                    workers=config["workers"],
+                    start_method=config["start_method"],
+                    max_rss_mb=config["max_rss_mb"],
+                    cpu_seconds=config["cpu_seconds"],
+                    max_wall_seconds=config["max_wall_seconds"],
+                    address_space_mb=config["address_space_mb"],
+                    max_tasks_per_worker=config["max_tasks_per_worker"],
+                    checkout_timeout=config["checkout_timeout"],
+                    poll_interval=config["poll_interval"],
+                )
+    return _pool
@@ -0,0 +1,350 @@
+"""
+Job Manager
+异步推理任务：提交后立即返回任务 ID，由有界 worker 池按优先级执行，结果落盘以便轮询与重启后查询。
+
+- 准入控制：排队任务数超过 jobs.max_queue 时拒绝提交（429），以此对推理负载限流
+- 取消：排队中的任务直接标记取消；运行中的任务通过 CANCELLATION_EVENTS 通知编排器
+- 进度：任务生命周期事件 + 该实验的日志 + 阶段完成事件，按序号追加，供 SSE 增量推送
+- 阶段图：运行期间每个阶段的图快照可经 /jobs/{id}/stages/{stage} 读取，调用方可逐阶段持久化
+"""
+
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from kgforge import get_logger
+from kgforge.models import Graph
+from kgforge.utils.stage_stream import stage_sink
+from python_service.config.loader import get_config
+from python_service.core.context import get_experiment_id
+from python_service.core.errors import PrismError, PrismRateLimitError, PrismValidationError
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_QUEUE = 100
+DEFAULT_MAX_RETAINED = 200
+MAX_EVENTS_PER_JOB = 2000
+
+TERMINAL_STATES = ("succeeded", "failed", "cancelled")
+
+
+def resolve_store_dir() -> Optional[Path]:
+    """任务结果目录：默认 <project_root>/.cache/jobs，可用 PRISM_JOB_STORE 覆盖（"off" 关闭落盘）"""
+    override = os.getenv("PRISM_JOB_STORE")
+    if override:
+        return None if override.lower() == "off" else Path(override)
+    project_root = Path(__file__).resolve().parents[4]
+    return project_root / ".cache" / "jobs"
+
+
+@dataclass
+class Job:
+    job_id: str
+    request: Dict[str, Any]
+    priority: int = 0
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    cancel_requested: bool = False
+    # 运行期间的阶段图快照（结束后释放，改从 result.intermediate_graphs 读取）
+    stages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    stage_names: List[str] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "orchestrator": self.request.get("orchestrator"),
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "stages": list(self.stage_names),
+        }
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = self.summary()
+        if include_result:
+            data["result"] = self.result
+        return data
+
+    def get_stage(self, stage: str) -> Optional[Dict[str, Any]]:
+        graph = self.stages.get(stage)
+        if graph is None and self.result:
+            graph = (self.result.get("intermediate_graphs") or {}).get(stage)
+        return graph
+
+
+class JobManager:
+    """有界优先级任务队列 + worker 池 + 本地结果存储"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 store_dir: Optional[Path] = None, runner=None):
+        config = get_config().get("jobs") or {}
+        self.max_workers = max_workers or int(config.get("max_workers", DEFAULT_MAX_WORKERS))
+        self.max_queue = max_queue or int(config.get("max_queue", DEFAULT_MAX_QUEUE))
+        self.max_retained = int(config.get("max_retained", DEFAULT_MAX_RETAINED))
+        self.store_dir = store_dir if store_dir is not None else resolve_store_dir()
+        self._runner = runner or self._run_inference
+
+        self._jobs: Dict[str, Job] = {}
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._stats = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+
+    # ---- 提交与查询 ----
+
+    def submit(self, request: Dict[str, Any], priority: int = 0) -> Job:
+        request = dict(request)
+        job_id = request.get("experiment_id") or uuid.uuid4().hex
+        request["experiment_id"] = job_id
+        with self._cond:
+            existing = self._jobs.get(job_id)
+            if existing is not None and not existing.done:
+                raise PrismValidationError(message=f"Job {job_id} is already {existing.status}")
+            queued = sum(1 for j in self._jobs.values() if j.status == "queued")
+            if queued >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise PrismRateLimitError(message=f"Job queue is full ({queued}/{self.max_queue})",
+                                          details={"queued": queued, "max_queue": self.max_queue})
+            job = Job(job_id=job_id, request=request, priority=priority)
+            self._jobs[job_id] = job
+            self._stats["submitted"] += 1
+            self._add_event(job, "status", {"status": "queued"})
+        self._queue.put((-priority, next(self._seq), job_id))
+        self._ensure_workers()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._load(job_id)
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        return [job.summary() for job in sorted(list(self._jobs.values()), key=lambda j: -j.submitted_at)]
+
+    def cancel(self, job_id: str) -> bool:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            job.cancel_requested = True
+            if job.status != "queued":
+                # 取消信号在任务转为 running 之前已登记（见 _worker_loop），编排器启动时即可看到
+                from python_service.services.inference import CANCELLATION_EVENTS
+                event = CANCELLATION_EVENTS.get(job_id)
+                if event is not None:
+                    event.set()
+                return True
+            snapshot = self._finish(job, "cancelled")
+        self._store(job, snapshot)
+        return True
+
+    def wait_events(self, job_id: str, after: int = 0, timeout: float = 15.0) -> List[Dict[str, Any]]:
+        """返回序号大于 after 的事件；没有新事件且任务未结束时最多阻塞 timeout 秒"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return []
+                fresh = [e for e in job.events if e["seq"] > after]
+                remaining = deadline - time.monotonic()
+                if fresh or job.done or remaining <= 0:
+                    return fresh
+                self._cond.wait(remaining)
+
+    def stats(self) -> Dict[str, Any]:
+        states = [j.status for j in list(self._jobs.values())]
+        return {
+            **self._stats,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+        }
+
+    # ---- 执行 ----
+
+    def _ensure_workers(self):
+        with self._cond:
+            self._workers = [w for w in self._workers if w.is_alive()]
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{len(self._workers)}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        from python_service.services.inference import CANCELLATION_EVENTS
+        while True:
+            _, _, job_id = self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            with self._cond:
+                if job.status != "queued":  # 排队期间已被取消
+                    continue
+                # 先登记取消信号再置为 running：run_dynamic 沿用该信号，其间的取消不会丢失
+                CANCELLATION_EVENTS[job_id] = threading.Event()
+                job.status = "running"
+                job.started_at = time.time()
+                self._add_event(job, "status", {"status": "running"})
+            self._execute(job)
+
+    def _record_stage(self, job: Job, stage: str, graph: Any):
+        """阶段监听器（编排线程中调用）：序列化为快照后登记"""
+        from python_service.schemas.graph_schema import graph_to_dict
+        snapshot = graph_to_dict(graph) if isinstance(graph, Graph) else graph
+        with self._cond:
+            job.stages[stage] = snapshot
+            if stage not in job.stage_names:
+                job.stage_names.append(stage)
+            self._add_event(job, "stage", {"stage": stage, "node_count": len(snapshot.get("nodes", {})),
+                                           "edge_count": len(snapshot.get("edges", []))})
+
+    def _execute(self, job: Job):
+        from python_service.services.inference import CANCELLATION_EVENTS
+        try:
+            with stage_sink(lambda stage, graph: self._record_stage(job, stage, graph)):
+                result = self._runner(job.request)
+        except PrismError as e:
+            with self._cond:
+                job.error = e.to_dict()["error"]
+                snapshot = self._finish(job, "failed")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            with self._cond:
+                job.error = {"code": "INTERNAL_ERROR", "message": str(e), "details": None}
+                snapshot = self._finish(job, "failed")
+        else:
+            with self._cond:
+                job.result = result
+                # 以结果为准：取消请求到达时管线可能已经完整跑完
+                cancelled = isinstance(result, dict) and result.get("status") == "cancelled"
+                snapshot = self._finish(job, "cancelled" if cancelled else "succeeded")
+        finally:
+            CANCELLATION_EVENTS.pop(job.job_id, None)
+        self._store(job, snapshot)
+
+    @staticmethod
+    def _run_inference(request: Dict[str, Any]) -> Dict[str, Any]:
+        from python_service.services.inference import InferenceEngine
+        return InferenceEngine().run_dynamic(**request)
+
+    # ---- 状态与存储（除 _store / _persist / _load 外，以下方法在持有 self._cond 时调用）----
+
+    def _add_event(self, job: Job, event_type: str, data: Dict[str, Any]):
+        seq = job.events[-1]["seq"] + 1 if job.events else 1
+        job.events.append({"seq": seq, "type": event_type, "timestamp": time.time(), "data": data})
+        if len(job.events) > MAX_EVENTS_PER_JOB:
+            del job.events[: len(job.events) - MAX_EVENTS_PER_JOB]
+        self._cond.notify_all()
+
+    def _finish(self, job: Job, status: str) -> Dict[str, Any]:
+        """置为终态并返回落盘快照；写盘由调用方在释放锁后通过 _store 完成"""
+        job.status = status
+        job.finished_at = time.time()
+        job.stages.clear()
+        self._stats[status] += 1
+        self._add_event(job, "status", {"status": status, "error": job.error})
+        return job.to_dict()
+
+    def _store(self, job: Job, snapshot: Dict[str, Any]):
+        """不持锁写盘（结果可能很大），之后再按保留数淘汰内存中的已结束任务"""
+        self._persist(job.job_id, snapshot)
+        with self._cond:
+            self._evict()
+
+    def _evict(self):
+        """内存中只保留最近 max_retained 个已结束任务，更早的只留在磁盘上"""
+        finished = [j for j in self._jobs.values() if j.done]
+        if len(finished) <= self.max_retained or self.store_dir is None:
+            return
+        finished.sort(key=lambda j: j.finished_at or 0)
+        for job in finished[: len(finished) - self.max_retained]:
+            del self._jobs[job.job_id]
+
+    def _job_path(self, job_id: str) -> Optional[Path]:
+        if self.store_dir is None or not job_id.replace("-", "").replace("_", "").isalnum():
+            return None
+        return self.store_dir / f"{job_id}.json"
+
+    def _persist(self, job_id: str, data: Dict[str, Any]):
+        path = self._job_path(job_id)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Failed to persist job {job_id}: {e}")
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        path = self._job_path(job_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return Job(job_id=data["job_id"], request={"orchestrator": data.get("orchestrator")},
+                   priority=data.get("priority", 0), status=data["status"],
+                   submitted_at=data.get("submitted_at") or 0, started_at=data.get("started_at"),
+                   finished_at=data.get("finished_at"), result=data.get("result"), error=data.get("error"),
+                   stage_names=data.get("stages") or [])
+
+    def record_log(self, job_id: str, log_data: Dict[str, Any]):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "running":
+                self._add_event(job, "log", log_data)
+
+
+class JobProgressHandler(logging.Handler):
+    """把运行中任务（按实验 ID 关联）的日志转为任务进度事件"""
+
+    def __init__(self, manager: JobManager, level=logging.INFO):
+        super().__init__(level)
+        self.manager = manager
+
+    def emit(self, record):
+        job_id = get_experiment_id()
+        if not job_id or job_id not in self.manager._jobs:
+            return
+        try:
+            self.manager.record_log(job_id, {
+                "message": record.getMessage(),
+                "level": record.levelname,
+                "logger": record.name,
+            })
+        except Exception:
+            self.handleError(record)
+
+
+# 单例
+job_manager = JobManager()
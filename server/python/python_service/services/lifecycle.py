@@ -1,58 +1,154 @@
 """
 Lifecycle Manager / Component Warmer
 负责管理长生命周期组件（如 LLM, Embedding 模型）的预热与缓存。
+
+预热为并发调度：每个可预热组件一个任务，按 modules.yaml 中 warmup.priorities 的优先级
+（数值越大越先提交）进入线程池。请求侧通过 acquire() 等待仍在加载中的组件，
+其余路由不受预热阻塞。
 """
 
 import threading
-from typing import Dict, Any, Optional
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, List, Tuple
 from python_service.core.engine import engine
 from python_service.core.capability import CapabilityManager
+from python_service.config.loader import get_config
 from kgforge import get_logger
 
 logger = get_logger(__name__)
 
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_WAIT_TIMEOUT = 300.0
+
 class LifecycleManager:
     """组件生命周期管理器 (原 ComponentWarmer)"""
-    
+
     def __init__(self):
         self._instances: Dict[str, Any] = {}
         self._status: Dict[str, Dict[str, str]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._probes: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 预热线程内通过工厂构建组件时不得等待自身（或其他预热任务），避免线程池死锁
+        self._local = threading.local()
 
     def get_instance(self, category: str, name: str) -> Optional[Any]:
         return self._instances.get(f"{category}.{name}")
 
-    def warmup_all(self):
-        """核心预热逻辑：自动预热所有在 Spec 中声明了 can_preload 的组件"""
-        catalog = engine.scan_all()
-        for category, components in catalog.items():
+    def acquire(self, category: str, name: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        获取预热实例；若该组件正在预热则等待其就绪
+        未参与预热、预热失败或等待超时时返回 None（调用方回退到动态加载）
+        """
+        if getattr(self._local, "bypass", False):
+            return None
+        key = f"{category}.{name}"
+        instance = self._instances.get(key)
+        if instance is not None or getattr(self._local, "warming", False):
+            return instance
+
+        future = self._futures.get(key)
+        if future is None or future.done():
+            return self._instances.get(key)
+
+        if timeout is None:
+            timeout = float(self._warmup_config().get("wait_timeout", DEFAULT_WAIT_TIMEOUT))
+        logger.info(f"Waiting for {key} to finish warming up...")
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Gave up waiting for {key}: {type(e).__name__}: {e}")
+        return self._instances.get(key)
+
+    @contextmanager
+    def bypass(self):
+        """当前线程内 acquire() 直接返回 None（用于构建独立于预热缓存的新实例）"""
+        previous = getattr(self._local, "bypass", False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+
+    def _warmup_config(self) -> Dict[str, Any]:
+        return get_config().get("warmup") or {}
+
+    def _plan(self) -> List[Tuple[int, str, str]]:
+        """收集所有声明了 can_preload 的组件，按优先级降序（同优先级保持扫描顺序）"""
+        priorities = self._warmup_config().get("priorities") or {}
+        plan = []
+        for category, components in engine.scan_all().items():
             for spec in components:
                 if spec.get("can_preload"):
-                    self._warm_individual(category, spec["id"])
+                    key = f"{category}.{spec['id']}"
+                    plan.append((int(priorities.get(key, 0)), category, spec["id"]))
+        plan.sort(key=lambda item: -item[0])
+        return plan
+
+    def start_warmup(self) -> Dict[str, Future]:
+        """非阻塞：提交全部预热任务并立即返回 {key: Future}"""
+        plan = self._plan()
+        if not plan:
+            return {}
+
+        max_workers = int(self._warmup_config().get("max_workers", DEFAULT_MAX_WORKERS))
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="warmup")
+            submitted = {}
+            for priority, category, name in plan:
+                key = f"{category}.{name}"
+                if key in self._instances or (key in self._futures and not self._futures[key].done()):
+                    continue
+                self._set_status(category, name, "queued")
+                self._probes[key] = {"priority": priority, "queued_at": time.time()}
+                self._futures[key] = submitted[key] = self._executor.submit(self._warm_individual, category, name)
+        logger.info(f"Scheduled warm-up for {len(submitted)} component(s) with {max_workers} worker(s)")
+        return submitted
+
+    def warmup_all(self, timeout: Optional[float] = None):
+        """核心预热逻辑：并发预热所有在 Spec 中声明了 can_preload 的组件，并等待全部结束"""
+        futures = self.start_warmup()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in futures.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass
 
     def _warm_individual(self, category: str, name: str):
         key = f"{category}.{name}"
         if key in self._instances: return
 
+        probe = self._probes.setdefault(key, {})
+        probe["started_at"] = time.time()
+        self._local.warming = True
         try:
             logger.info(f"Warming up component: {key}...")
             self._set_status(category, name, "loading")
-            
+
             # 使用工厂创建（它会自动跳过本缓存进入 Stage 2）
             from python_service.core.factory import UnifiedFactory
             instance = UnifiedFactory.create_component(category, name)
-            
+
             # 执行预热动作 (契约)
             CapabilityManager.enforce(instance, "Preloadable")
-            
+
             with self._lock:
                 self._instances[key] = instance
-            
+
             self._set_status(category, name, "ready")
-            logger.info(f"✓ {key} is ready")
+            logger.info(f"✓ {key} is ready ({time.time() - probe['started_at']:.2f}s)")
         except Exception as e:
             logger.error(f"Failed to warm up {key}: {e}")
             self._set_status(category, name, f"error: {str(e)}")
+        finally:
+            probe["finished_at"] = time.time()
+            self._local.warming = False
 
     def _set_status(self, category: str, name: str, status: str):
         if category not in self._status: self._status[category] = {}
@@ -61,9 +157,35 @@ class LifecycleManager:
     def get_status_report(self) -> Dict[str, Any]:
         return self._status
 
+    def get_readiness_report(self) -> Dict[str, Any]:
+        """逐组件的就绪探针：状态、优先级与加载耗时"""
+        report = {}
+        for category, comps in list(self._status.items()):
+            for name, state in list(comps.items()):
+                probe = self._probes.get(f"{category}.{name}", {})
+                started, finished = probe.get("started_at"), probe.get("finished_at")
+                report.setdefault(category, {})[name] = {
+                    "state": state,
+                    "ready": state == "ready",
+                    "priority": probe.get("priority", 0),
+                    "load_seconds": round((finished or time.time()) - started, 3) if started else None,
+                }
+        return report
+
+    def shutdown(self):
+        """关闭预热线程池（prefork 在 fork 前调用，确保不遗留线程）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def is_settled(self) -> bool:
+        """所有已调度的预热任务是否都已结束（成功或失败）"""
+        return all(f.done() for f in list(self._futures.values()))
+
 # 单例
 warmer = LifecycleManager()
 
 def preload_all():
-    """API 启动热钩子"""
+    """API 启动热钩子（阻塞直到预热结束）"""
     warmer.warmup_all()
@@ -0,0 +1,224 @@
+"""
+Prefork Server
+主进程先完成组件预热（加载 REBEL / MiniLM 权重），再 fork 出 N 个 uvicorn worker 共享同一个监听 socket。
+权重所在的内存页在 fork 后以写时复制方式共享，N 个 worker 只占一份物理内存。
+
+与 `uvicorn --workers N` 的区别：后者以 spawn 方式启动 worker，每个进程各自加载一份权重。
+
+限制：
+- 仅支持 CPU 推理。CUDA 上下文不能跨 fork 使用，主进程在预热前隐藏 GPU（CUDA_VISIBLE_DEVICES=""），
+  fork 前若 CUDA 已初始化则拒绝启动
+- worker 中 FastAPI lifespan 不再重复预热，也不启动热重载监控（见 is_prefork_worker）；
+  组件代码变更需重启服务
+
+用法：
+    PRISM_WORKERS=4 python main.py
+    python -m python_service.services.prefork --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from kgforge import get_logger
+
+logger = get_logger(__name__)
+
+# worker 异常退出后在该时间窗内再次退出则不再重启，防止崩溃循环
+RESPAWN_WINDOW = 5.0
+
+# fork 出的 worker 中置位（fork 复制模块状态，主进程始终为 False）
+_IS_WORKER = False
+
+
+def is_prefork_worker() -> bool:
+    """当前进程是否为 prefork worker：组件已由主进程预热，lifespan 跳过预热与热重载"""
+    return _IS_WORKER
+
+
+def enforce_cpu_only():
+    """预热前隐藏 GPU，使 REBEL / MiniLM 等组件自动选择 CPU"""
+    if os.environ.get("CUDA_VISIBLE_DEVICES"):
+        logger.warning("Prefork serving is CPU-only; ignoring CUDA_VISIBLE_DEVICES")
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+
+def check_fork_safe():
+    """fork 前检查：CUDA 已初始化则拒绝 fork；遗留的非守护线程（如未关闭的线程池）给出警告"""
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_initialized():
+        raise RuntimeError("CUDA was initialised before fork; prefork serving only supports CPU inference")
+    others = [t.name for t in threading.enumerate() if t is not threading.main_thread() and not t.daemon]
+    if others:
+        logger.warning(f"Threads still running at fork (not copied into workers): {others}")
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """在主进程中创建并监听 socket，供所有 worker 继承"""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def freeze_heap():
+    """
+    fork 前整理并冻结堆：gc.freeze() 把现存对象移入永久代，
+    子进程中的 GC 不再遍历（也就不再写入）这些对象的头部，避免共享页被逐页复制
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def _limit_worker_threads():
+    """限制每个 worker 的算子线程数，避免 N 个进程各开满核数的线程池"""
+    threads = os.getenv("PRISM_WORKER_THREADS")
+    if threads and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(int(threads))
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+
+    global _IS_WORKER
+    _IS_WORKER = True
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    _limit_worker_threads()
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """预热后 fork 的多进程服务主控"""
+
+    def __init__(self, app, host: str = "0.0.0.0", port: int = 8000, workers: int = 2,
+                 log_level: str = "info", warmup: bool = True):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.log_level = log_level
+        self.warmup = warmup
+        self._children: Dict[int, float] = {}  # pid -> 启动时间
+        self._stopping = False
+        self._sock: Optional[socket.socket] = None
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.app, self._sock, self.log_level)
+            except BaseException:
+                code = 1
+                logger.exception("Prefork worker crashed")
+            finally:
+                os._exit(code)
+        self._children[pid] = time.monotonic()
+        logger.info(f"Started worker pid={pid}")
+
+    def _shutdown(self, signum, frame):
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _preload(self):
+        from python_service.services.lifecycle import warmer
+
+        start = time.perf_counter()
+        warmer.warmup_all()
+        # worker 不能继承活跃线程，预热线程池必须在 fork 前关闭
+        warmer.shutdown()
+        logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s: {warmer.get_status_report()}")
+
+    def run(self) -> int:
+        enforce_cpu_only()
+        self._sock = bind_socket(self.host, self.port)
+        if self.warmup:
+            self._preload()
+        check_fork_safe()
+        freeze_heap()
+
+        signal.signal(signal.SIGTERM, self._shutdown)
+        signal.signal(signal.SIGINT, self._shutdown)
+        logger.info(f"Prefork master pid={os.getpid()} serving http://{self.host}:{self.port} with {self.workers} worker(s)")
+        for _ in range(self.workers):
+            self._spawn()
+
+        exit_code = 0
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self._children.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self._stopping:
+                continue
+            logger.warning(f"Worker pid={pid} exited with code {code}")
+            if time.monotonic() - started < RESPAWN_WINDOW:
+                logger.error("Worker exited right after start; not respawning")
+                exit_code = 1
+                self._shutdown(None, None)
+            else:
+                self._spawn()
+
+        self._sock.close()
+        return exit_code
+
+
+def shared_memory_report(pids: List[int]) -> Dict[int, Dict[str, int]]:
+    """读取 /proc/<pid>/smaps_rollup，返回各进程的 Rss / Pss / Shared（kB），用于验证权重共享效果"""
+    report = {}
+    for pid in pids:
+        fields = {}
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"):
+                        fields[key] = int(rest.split()[0])
+        except OSError:
+            continue
+        fields["Shared"] = fields.pop("Shared_Clean", 0) + fields.pop("Shared_Dirty", 0)
+        fields["Private"] = fields.pop("Private_Clean", 0) + fields.pop("Private_Dirty", 0)
+        report[pid] = fields
+    return report
+
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 2, log_level: str = "info", warmup: bool = True) -> int:
+    if not hasattr(os, "fork"):
+        raise RuntimeError("Prefork serving requires os.fork (POSIX only)")
+    from python_service.main import app
+    return PreforkServer(app, host=host, port=port, workers=workers, log_level=log_level, warmup=warmup).run()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PRISM prefork server (shared model weights across workers)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PRISM_WORKERS", "2")))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-warmup", action="store_true", help="fork 前不预热（worker 各自按需加载）")
+    args = parser.parse_args(argv)
+    return serve(args.host, args.port, args.workers, args.log_level, warmup=not args.no_warmup)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
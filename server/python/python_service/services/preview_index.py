@@ -0,0 +1,198 @@
+"""
+Preview Index
+数据集分页预览的旁路索引：每个 (dataset, split) 一次性扫描全量样本，按列存储预览字段，
+之后分页只是对索引数组切片，并支持服务端按长度/标签过滤与排序。
+
+磁盘布局（<cache_dir>/*）：
+- meta.json         源指纹、样本数、标签词表
+- <column>.npy      数值列（context_length / sentence_count / entity_count / relation_count / label_code），缺失为 -1
+- text.jsonl/.idx   文本列，每行 [query, context_preview, label]（复用 IndexedJsonl 按下标读取）
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from kgforge import get_logger
+from python_service.services.indexed_json import IndexedJsonl
+
+logger = get_logger(__name__)
+
+FORMAT_VERSION = 1
+PREVIEW_CHARS = 240
+NUMERIC_COLUMNS = ("context_length", "sentence_count", "entity_count", "relation_count")
+SORT_KEYS = ("index",) + NUMERIC_COLUMNS
+# 过滤/排序结果缓存条数（同一筛选条件翻页时直接切片）
+SELECTION_CACHE_SIZE = 16
+
+
+def _label_key(label: Any) -> Optional[str]:
+    """可参与过滤的标量标签转为字符串键；列表/字典等复合标签（如 CUAD answers）不编码"""
+    if label is None or isinstance(label, (dict, list, tuple)):
+        return None
+    return str(label)
+
+
+def build_preview_index(rows: Iterable[Dict[str, Any]], cache_dir: Path, fingerprint: Dict[str, Any]) -> int:
+    """
+    写入预览索引。rows 按样本下标顺序产出：
+    {"query", "context_preview", "label", "context_length", "sentence_count"?, "entity_count"?, "relation_count"?}
+    """
+    tmp_dir = cache_dir.with_name(cache_dir.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    numeric: Dict[str, List[int]] = {c: [] for c in NUMERIC_COLUMNS}
+    label_codes: List[int] = []
+    vocab: Dict[str, int] = {}
+    offsets = [0]
+    with open(tmp_dir / "text.jsonl", "wb") as out:
+        for row in rows:
+            line = json.dumps([row.get("query"), row.get("context_preview"), row.get("label")],
+                              ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            out.write(line)
+            offsets.append(offsets[-1] + len(line))
+            for c in NUMERIC_COLUMNS:
+                value = row.get(c)
+                numeric[c].append(-1 if value is None else int(value))
+            key = _label_key(row.get("label"))
+            label_codes.append(-1 if key is None else vocab.setdefault(key, len(vocab)))
+
+    np.array(offsets, dtype="<u8").tofile(tmp_dir / "text.idx")
+    for c in NUMERIC_COLUMNS:
+        np.save(tmp_dir / f"{c}.npy", np.array(numeric[c], dtype=np.int64))
+    np.save(tmp_dir / "label_code.npy", np.array(label_codes, dtype=np.int32))
+    with open(tmp_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, "count": len(label_codes), "labels": list(vocab)}, f, ensure_ascii=False)
+
+    # 整目录替换：读者要么看到旧索引，要么看到完整的新索引
+    old_dir = cache_dir.with_name(cache_dir.name + f".old{os.getpid()}")
+    if cache_dir.exists():
+        os.replace(cache_dir, old_dir)
+    os.replace(tmp_dir, cache_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(label_codes)
+
+
+class PreviewIndex:
+    """只读的列式预览索引"""
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        with open(self.cache_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.fingerprint: Dict[str, Any] = meta["fingerprint"]
+        self.labels: List[str] = meta["labels"]
+        self._label_codes = {label: code for code, label in enumerate(self.labels)}
+        self._columns = {c: np.load(self.cache_dir / f"{c}.npy") for c in NUMERIC_COLUMNS + ("label_code",)}
+        self._text = IndexedJsonl(self.cache_dir / "text.jsonl", self.cache_dir / "text.idx")
+        self._selections: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    @property
+    def nbytes(self) -> int:
+        """常驻内存：数值列 + 文本偏移"""
+        return sum(col.nbytes for col in self._columns.values()) + self._text.nbytes
+
+    def select(
+        self,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        min_length: Optional[int] = None,
+        max_length: Optional[int] = None,
+        label: Optional[str] = None,
+    ) -> np.ndarray:
+        """返回满足条件的样本下标（按 sort_by 稳定排序，并列时按下标）"""
+        sort_by = sort_by or "index"
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_by}（可选: {', '.join(SORT_KEYS)}）")
+        key = (sort_by, descending, min_length, max_length, label)
+        with self._lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+                return cached
+
+        mask = np.ones(len(self), dtype=bool)
+        lengths = self._columns["context_length"]
+        if min_length is not None:
+            mask &= lengths >= min_length
+        if max_length is not None:
+            mask &= (lengths >= 0) & (lengths <= max_length)
+        if label is not None:
+            code = self._label_codes.get(str(label))
+            mask &= self._columns["label_code"] == (code if code is not None else -2)
+        selected = np.flatnonzero(mask)
+
+        if sort_by != "index":
+            values = self._columns[sort_by][selected]
+            order = np.argsort(-values if descending else values, kind="stable")
+            selected = selected[order]
+        elif descending:
+            selected = selected[::-1]
+
+        with self._lock:
+            self._selections[key] = selected
+            while len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return selected
+
+    def rows(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        out = []
+        for idx in indices:
+            idx = int(idx)
+            query, preview, label = self._text[idx]
+            row: Dict[str, Any] = {
+                "index": idx,
+                "query": query,
+                "context_preview": preview,
+                "context_length": self._value("context_length", idx),
+                "label": label,
+            }
+            if self._columns["sentence_count"][idx] >= 0:
+                row["meta"] = {c: self._value(c, idx) for c in NUMERIC_COLUMNS[1:]}
+            out.append(row)
+        return out
+
+    def _value(self, column: str, idx: int) -> Optional[int]:
+        value = int(self._columns[column][idx])
+        return None if value < 0 else value
+
+    def close(self):
+        self._text.close()
+
+
+_build_lock = threading.Lock()
+
+
+def open_preview_index(
+    cache_dir: Path,
+    fingerprint: Dict[str, Any],
+    rows: Callable[[], Iterable[Dict[str, Any]]],
+    current: Optional[PreviewIndex] = None,
+) -> PreviewIndex:
+    """打开 cache_dir 下的预览索引；不存在或指纹变化时调用 rows() 全量重建"""
+    fingerprint = {**fingerprint, "version": FORMAT_VERSION}
+    if current is not None and current.fingerprint == fingerprint:
+        return current
+    with _build_lock:
+        try:
+            index = PreviewIndex(cache_dir)
+            if index.fingerprint == fingerprint:
+                return index
+            index.close()
+        except (OSError, ValueError, KeyError):
+            pass
+        logger.info(f"Building preview index -> {cache_dir}")
+        count = build_preview_index(rows(), cache_dir, fingerprint)
+        logger.info(f"Preview index built: {count} sample(s)")
+        return PreviewIndex(cache_dir)
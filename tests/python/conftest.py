@@ -1,6 +1,7 @@
 import pytest
 import sys
 import os
+import tempfile
 from pathlib import Path
 
 # 获取项目根目录
@@ -10,6 +11,10 @@ project_root = Path(__file__).parent.parent.parent.absolute()
 sys.path.insert(0, str(project_root / "server" / "python"))
 sys.path.insert(0, str(project_root / "core"))
 sys.path.insert(0, str(project_root / "server" / "python" / "python_service"))
+sys.path.append(str(project_root))  # benchmarks/
+
+# 测试日志写入临时目录，不落在仓库中（须在导入 kgforge 之前设置）
+os.environ.setdefault("KGFORGE_LOG_DIR", tempfile.mkdtemp(prefix="kgforge-test-logs-"))
 
 # 注入虚假环境变量以通过初始化检查
 os.environ["OPENROUTER_API_KEY"] = "sk-test-key-for-unit-tests"
@@ -0,0 +1,89 @@
+import pytest
+from python_service.services.batch_runner import BatchConfig, BatchRunner, completed_indices, read_records
+
+
+class FakeDatasetService:
+    def __init__(self, total=10):
+        self.total = total
+        self.reads = []
+
+    def get_total(self, dataset_id, split):
+        return self.total
+
+    def get_raw_sample(self, dataset_id, split, index):
+        self.reads.append(index)
+        return {"title": f"doc {index}"}
+
+    def normalize_sample(self, dataset_id, split, index, raw, include_raw=False):
+        return {"query": raw["title"], "context": f"text {index}"}
+
+
+def _runner(tmp_path, sample_runner, config=None, **kwargs):
+    config = config or BatchConfig(dataset_id="docred", split="dev", orchestrator="fuzz_test")
+    return BatchRunner(config, output_dir=tmp_path / "run", workers=3, shard_size=4,
+                       dataset_service=FakeDatasetService(), sample_runner=sample_runner, **kwargs)
+
+
+def test_batch_writes_shards_and_resumes_failed_samples(tmp_path):
+    def flaky(request):
+        if request["goal"] == "doc 3":
+            raise RuntimeError("boom")
+        return {"status": "success", "goal": request["goal"]}
+
+    summary = _runner(tmp_path, flaky).run()
+    assert summary["progress"]["succeeded"] == 9 and summary["progress"]["failed"] == 1
+    assert sorted(p.name for p in (tmp_path / "run").glob("shard-*.jsonl")) == [
+        "shard-00000.jsonl", "shard-00001.jsonl", "shard-00002.jsonl"]
+    assert completed_indices(tmp_path / "run") == set(range(10)) - {3}
+
+    # 续跑：只重新执行失败的样本
+    seen = []
+    resumed = _runner(tmp_path, lambda r: seen.append(r["goal"]) or {"status": "success"})
+    summary = resumed.run()
+    assert seen == ["doc 3"]
+    assert summary["progress"]["skipped"] == 9
+    assert completed_indices(tmp_path / "run") == set(range(10))
+    assert len(list(read_records(tmp_path / "run"))) == 11
+
+
+def test_resume_rejects_different_pipeline(tmp_path):
+    _runner(tmp_path, lambda r: {"status": "success"}).run()
+    other = BatchConfig(dataset_id="docred", split="dev", orchestrator="dynamic_halting")
+    with pytest.raises(ValueError):
+        _runner(tmp_path, lambda r: {"status": "success"}, config=other).run()
+
+
+def test_cancel_stops_submitting(tmp_path):
+    holder = {}
+
+    def cancel_on_first(request):
+        holder["runner"].cancel()
+        return {"status": "success"}
+
+    runner = _runner(tmp_path, cancel_on_first)
+    holder["runner"] = runner
+    summary = runner.run()
+    assert summary["status"] == "cancelled"
+    # 在途窗口为 workers*2，取消后不再读取新样本
+    assert len(runner._svc.reads) <= 6
+
+
+def test_resume_retries_cancelled_samples(tmp_path):
+    summary = _runner(tmp_path, lambda r: {"status": "cancelled" if r["goal"] == "doc 5" else "success"}).run()
+    assert summary["progress"]["succeeded"] == 9 and summary["progress"]["cancelled"] == 1
+    assert completed_indices(tmp_path / "run") == set(range(10)) - {5}
+
+    seen = []
+    _runner(tmp_path, lambda r: seen.append(r["goal"]) or {"status": "success"}).run()
+    assert seen == ["doc 5"]
+
+
+@pytest.mark.parametrize("body", [{"executor": "fork"}, {"workers": 0}, {"workers": 10000}])
+def test_batch_route_rejects_invalid_executor_and_workers(body):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from python_service.api.batch_routes import router
+    app = FastAPI()
+    app.include_router(router)
+    response = TestClient(app).post("/batches", json={"dataset_id": "docred", "split": "dev", **body})
+    assert response.status_code == 422
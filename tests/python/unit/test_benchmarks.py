@@ -0,0 +1,31 @@
+from benchmarks.suite import CASES, build_fuzz_graph, compare, run_suite
+
+
+def test_fuzz_graph_is_deterministic():
+    g1, g2 = build_fuzz_graph(200), build_fuzz_graph(200)
+    assert [(e.source, e.target) for e in g1.edges] == [(e.source, e.target) for e in g2.edges]
+    assert len(g1.nodes) == 201
+
+
+def test_suite_smoke():
+    """小规模跑通无外部依赖的用例"""
+    cases = ["graph.build", "graph.clone", "graph.merge_node", "halting.rule_based", "serialize.graph_to_dict"]
+    results = run_suite(sizes=[50], cases=cases, repeat=1)
+    for name in cases:
+        res = results[name]["50"]
+        assert res["status"] == "ok", res
+        assert res["median_ms"] >= 0
+
+
+def test_max_size_skips():
+    res = run_suite(sizes=[CASES["halting.rule_based"].max_size + 1], cases=["halting.rule_based"], repeat=1)
+    assert res["halting.rule_based"]
+    assert next(iter(res["halting.rule_based"].values()))["status"] == "skipped"
+
+
+def test_compare_flags_regression():
+    baseline = {"graph.clone": {"1000": {"status": "ok", "median_ms": 10.0}}}
+    current = {"graph.clone": {"1000": {"status": "ok", "median_ms": 13.0}}}
+    rows = compare(current, baseline, tolerance=0.2)
+    assert rows[0]["status"] == "regression"
+    assert compare(current, baseline, tolerance=0.5)[0]["status"] == "ok"
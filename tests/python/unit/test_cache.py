@@ -0,0 +1,42 @@
+import json
+from python_service.core.cache import SizedLRUCache, approx_size, caches
+from python_service.services.dataset_service import DatasetService
+
+
+def test_lru_evicts_by_bytes_and_entries():
+    cache = SizedLRUCache("t", max_bytes=100, max_entries=3)
+    cache.put("a", "A", size=40)
+    cache.put("b", "B", size=40)
+    assert cache.get("a") == "A"          # a 变为最近使用
+    cache.put("c", "C", size=40)          # 超出 100 字节，淘汰最久未用的 b
+    assert "b" not in cache and cache.get("a") == "A" and cache.get("c") == "C"
+    cache.put("huge", "X", size=1000)     # 超过上限的条目不入缓存
+    assert "huge" not in cache
+    for k in "def":
+        cache.put(k, k, size=1)
+    assert len(cache) == 3
+    stats = cache.stats()
+    assert stats["bytes"] <= 100 and stats["evictions"] >= 2 and stats["rejected"] == 1
+    assert stats["misses"] == 0 and stats["hits"] == 3
+
+
+def test_approx_size_extrapolates_samples():
+    docs = [{"sents": [["word"] * 20] * 5} for _ in range(1000)]
+    one = approx_size(docs[:1])
+    assert 500 * one < approx_size(docs) < 2000 * one
+
+
+def test_dataset_service_uses_shared_bounded_caches(tmp_path):
+    data_dir = tmp_path / "data" / "DocRED" / "data"
+    data_dir.mkdir(parents=True)
+    (data_dir / "dev.json").write_text(json.dumps([{"title": "t", "sents": [["a"]]}] * 10))
+    svc = DatasetService()
+    svc._root = str(tmp_path)
+    before = caches.get_cache("dataset.docred").stats()["hits"]
+    svc.get_total("docred", "dev")
+    svc.get_raw_sample("docred", "dev", 3)
+    stats = caches.stats()["caches"]
+    assert stats["dataset.docred"]["hits"] == before + 1
+    assert stats["dataset.docred"]["max_entries"] == 8
+    # 索引存储只计偏移数组：(10 + 1) * 8 字节
+    assert stats["dataset.docred"]["bytes"] >= 88
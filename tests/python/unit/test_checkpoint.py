@@ -0,0 +1,182 @@
+import os
+import time
+from kgforge.components.base import BaseExpander, BaseExtractor, BaseFusion, BaseHalting
+from kgforge.components.orchestration.utils.dynamic_halting_core import DynamicHaltingCore
+from kgforge.models import Edge, Graph, Node
+from kgforge.models.enums import HaltingDecision, HaltingResponse
+from kgforge.utils.checkpoint import CheckpointHandle, CheckpointStore, checkpoint_scope, current_checkpoint
+
+
+def _graph(*labels):
+    graph = Graph()
+    for label in labels:
+        graph.add_node(Node(node_id=label, label=label))
+    return graph
+
+
+class CountingExtractor(BaseExtractor):
+    calls = 0
+
+    def extract(self, text):
+        CountingExtractor.calls += 1
+        return _graph(*text.split())
+
+
+class FlakyExpander(BaseExpander):
+    """第二轮展开第一次调用时抛错（模拟限流），之后正常"""
+    failed = False
+
+    def expand_goal(self, goal, **kwargs):
+        return _graph(goal)
+
+    def expand_graph(self, graph, **kwargs):
+        step = len(graph.nodes)
+        if step == 5 and not FlakyExpander.failed:
+            FlakyExpander.failed = True
+            raise RuntimeError("rate limited")
+        return _graph(f"n{step}")
+
+
+class UnionFusion(BaseFusion):
+    def fuse(self, graph_b, graph_t):
+        fused = graph_b.clone()
+        for node in graph_t.nodes.values():
+            fused.add_node(node.clone())
+        return fused
+
+
+class LoopHalting(BaseHalting):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.decision_history = []
+
+    def should_halt(self, graph, goal, **kwargs):
+        self.decision_history.append(kwargs["iteration"])
+        return HaltingResponse(decision=HaltingDecision.LOOP)
+
+
+def _core():
+    return DynamicHaltingCore(extractor=CountingExtractor(), expander=FlakyExpander(), fusion=UnionFusion(),
+                              halting=LoopHalting(), max_iterations=3, max_depth=5)
+
+
+def test_graph_round_trip_keeps_status_state_and_subgraph():
+    graph = _graph("a", "b")
+    graph.nodes["a"].set_state("expanded", True)
+    graph.nodes["a"].subgraph = _graph("inner")
+    edge = Edge(source="a", target="b", relation="r")
+    edge.set_state("confidence", 0.5)
+    graph.add_edge(edge)
+
+    restored = Graph.from_dict(graph.to_dict())
+    assert restored.nodes["a"].state("expanded") is True
+    assert set(restored.nodes["a"].subgraph.nodes) == {"inner"}
+    assert restored.edges[0].state("confidence") == 0.5
+    assert restored.to_dict() == graph.to_dict()
+
+
+def test_store_save_load_delete(tmp_path):
+    store = CheckpointStore(tmp_path)
+    store.save("exp/1", {"iteration": 2})
+    store.save_meta("exp/1", {"goal": "g"})
+    assert store.load("exp/1")["iteration"] == 2
+    assert store.load_meta("exp/1") == {"goal": "g"}
+    assert [c["run_id"] for c in store.list()] == ["exp_1"]
+    store.delete("exp/1")
+    assert store.load("exp/1") is None and store.load_meta("exp/1") is None
+
+
+def test_dynamic_halting_resumes_from_last_iteration(tmp_path):
+    store = CheckpointStore(tmp_path)
+    CountingExtractor.calls = 0
+    FlakyExpander.failed = False
+
+    with checkpoint_scope(store, "run"):
+        failed = _core().run("goal", "alice bob carol", verbose=False)
+    assert failed.status() == "failed"
+    saved = store.load("run")
+    assert saved["iteration"] == 1 and set(Graph.from_dict(saved["current_graph"]).nodes) == {"alice", "bob", "carol", "goal", "n4"}
+
+    halting = LoopHalting()
+    core = _core()
+    core.halting = halting
+    with checkpoint_scope(store, "run", resume=True):
+        result = core.run("goal", "alice bob carol", verbose=False)
+    assert result.status() == "success"
+    # 抽取不重做，判停从第 2 轮继续，历史沿用检查点
+    assert CountingExtractor.calls == 1
+    assert halting.decision_history == [1, 2, 3]
+    assert set(result.graph.nodes) == {"alice", "bob", "carol", "goal", "n4", "n5", "n6"}
+    assert {"G_B", "G_T", "G_F", "loop_1_increment", "loop_3_increment"} <= set(result.get_graphs())
+    assert result.get_graphs()["G_F"] is result.graph
+    assert result.get_metrics()["total_iterations"] == 3
+    assert any(step["action"] == "resumed_from_checkpoint" for step in result.get_trace())
+    # 正常结束后检查点删除
+    assert store.load("run") is None
+
+
+def test_mismatched_input_ignores_checkpoint(tmp_path):
+    store = CheckpointStore(tmp_path)
+    CountingExtractor.calls = 0
+    FlakyExpander.failed = True
+    store.save("run", {"engine": "dynamic_halting", "goal": "other", "text_sha1": "x", "iteration": 1, "depth": 1})
+    with checkpoint_scope(store, "run", resume=True):
+        result = _core().run("goal", "alice", verbose=False)
+    assert result.status() == "success" and CountingExtractor.calls == 1
+
+
+def test_saves_append_only_new_stage_graphs_and_steps(tmp_path):
+    store = CheckpointStore(tmp_path)
+    CountingExtractor.calls = 0
+    FlakyExpander.failed = True
+    handle = CheckpointHandle(store, "run", keep_completed=True)
+    with checkpoint_scope(store, "run", keep_completed=True):
+        _core().run("goal", "alice bob", verbose=False)
+    state = store.load("run")
+    assert "graphs" not in state and "trace" not in state
+    deltas = store.load_deltas("run", state["delta_bytes"])
+    names = [d["graph"] for d in deltas if "graph" in d]
+    # 每个阶段图只写一次（不随迭代重复序列化）
+    assert sorted(names) == sorted(set(names)) and {"G_B", "G_T", "G_F", "loop_3_increment"} <= set(names)
+    # 崩溃后多出的尾部被丢弃
+    with open(store._path("run", ".delta.jsonl"), "ab") as f:
+        f.write(b'{"graph": "torn"')
+    handle._delta_bytes = state["delta_bytes"]
+    handle.save({"engine": "x"}, deltas=[{"step": {"action": "after"}}])
+    tail = store.load_deltas("run", store.load("run")["delta_bytes"])
+    assert tail[-1] == {"step": {"action": "after"}} and len(tail) == len(deltas) + 1
+
+
+def test_prune_by_age_and_total_size(tmp_path):
+    store = CheckpointStore(tmp_path)
+    for i, age in enumerate([10, 5, 1]):
+        store.save(f"r{i}", {"blob": "x" * 2000})
+        store.save_meta(f"r{i}", {"goal": "g"})
+        for path in tmp_path.glob(f"r{i}.*"):
+            os.utime(path, (time.time() - age * 3600, time.time() - age * 3600))
+    assert store.prune(max_age_seconds=8 * 3600) == ["r0"]
+    assert store.prune(max_total_bytes=1, keep="r2") == ["r1"]
+    assert [c["run_id"] for c in store.list()] == ["r2"] and store.load_meta("r2") is not None
+
+
+def test_scope_only_for_checkpointing_orchestrators(tmp_path, monkeypatch):
+    from python_service.services import checkpoints
+    from python_service.services.inference import InferenceEngine
+    store = CheckpointStore(tmp_path)
+    monkeypatch.setattr(checkpoints, "_store", store)
+    monkeypatch.setenv("PRISM_CHECKPOINTS", "1")
+
+    class Plain:
+        pass
+
+    class Checkpointing:
+        supports_checkpoints = True
+
+    with InferenceEngine._checkpoint_scope(Plain(), "exp", False, {"goal": "g"}) as handle:
+        assert handle is None and current_checkpoint() is None
+    assert not any(tmp_path.iterdir())
+
+    with InferenceEngine._checkpoint_scope(Checkpointing(), "exp", False, {"goal": "g"}) as handle:
+        assert current_checkpoint() is handle and store.load_meta("exp")["goal"] == "g"
+    # 未写入任何状态即结束：元数据一并清理
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,125 @@
+import json
+import time
+import pytest
+from kgforge.components.base import BaseExpander, BaseExtractor, BaseFusion
+from kgforge.components.orchestration.modules.dag_orchestrator_appliance import DagOrchestratorAppliance
+from kgforge.components.orchestration.utils.dag_core import StageMemo, parse_stages
+from kgforge.models import Graph, Node
+
+DELAY = 0.2
+
+
+def _graph(*labels):
+    graph = Graph()
+    for label in labels:
+        graph.add_node(Node(node_id=label, label=label))
+    return graph
+
+
+class SlowExtractor(BaseExtractor):
+    calls = 0
+
+    def extract(self, text):
+        SlowExtractor.calls += 1
+        time.sleep(DELAY)
+        return _graph(*text.split())
+
+
+class SlowExpander(BaseExpander):
+    def expand_goal(self, goal, **kwargs):
+        time.sleep(DELAY)
+        return _graph(goal)
+
+    def expand_graph(self, graph, **kwargs):
+        return graph
+
+
+class UnionFusion(BaseFusion):
+    def fuse(self, graph_b, graph_t):
+        fused = graph_b.clone()
+        for node in graph_t.nodes.values():
+            fused.add_node(node.clone())
+        return fused
+
+
+def _orchestrator(**params):
+    return DagOrchestratorAppliance(extractor=SlowExtractor(), expander=SlowExpander(), fusion=UnionFusion(), **params)
+
+
+def test_independent_stages_run_concurrently():
+    result = _orchestrator(memoize=False).run("goal", "alice bob")
+    timings = result.get_metrics()["stage_timings"]
+    assert set(timings) == {"G_B", "G_T", "G_F", "G_P"}
+    # G_B 与 G_T 并行：总耗时明显小于两者之和
+    assert result.get_metrics()["dag_wall_ms"] < 1.6 * DELAY * 1000
+    assert abs(timings["G_B"]["start_ms"] - timings["G_T"]["start_ms"]) < DELAY * 500
+    assert set(result.graph.nodes) == {"alice", "bob", "goal"}
+    # processor 插槽未配置：G_P 直通 G_F
+    assert set(result.get_graphs()) == {"G_B", "G_T", "G_F", "G_P"}
+
+
+def test_memoised_stages_skip_recomputation():
+    memo = StageMemo()
+    orch = _orchestrator(memoize=True)
+    orch.run("goal", "x")  # 初始化 core
+    orch.core.memo = memo
+    SlowExtractor.calls = 0
+    first = orch.run("goal", "carol dave")
+    second = orch.run("goal", "carol dave")
+    assert SlowExtractor.calls == 1
+    assert second.get_metrics()["stage_timings"]["G_B"]["cached"] is True
+    assert not first.get_metrics()["stage_timings"]["G_B"]["cached"]
+    # 命中返回克隆，下游修改不影响记忆
+    second.get_graphs()["G_B"].add_node(Node(node_id="extra", label="extra"))
+    assert "extra" not in orch.run("goal", "carol dave").get_graphs()["G_B"].nodes
+
+
+def test_custom_stages_and_validation():
+    stages = '[{"name": "B", "slot": "extractor", "method": "extract", "inputs": ["text"]},' \
+             ' {"name": "E", "slot": "expander", "method": "expand_graph", "inputs": ["B"]}]'
+    result = _orchestrator(stages=stages, memoize=False).run("g", "x y")
+    assert set(result.graph.nodes) == {"x", "y"}
+
+    with pytest.raises(ValueError):
+        parse_stages([{"name": "A", "slot": "fusion", "method": "fuse", "inputs": ["B"]},
+                      {"name": "B", "slot": "fusion", "method": "fuse", "inputs": ["A"]}])
+    with pytest.raises(ValueError):
+        parse_stages([{"name": "A", "slot": "extractor", "method": "extract", "inputs": ["missing"]}])
+    with pytest.raises(ValueError):
+        DagOrchestratorAppliance(extractor=SlowExtractor()).run("g", "t")
+
+
+@pytest.mark.parametrize("stage", [
+    {"name": "A", "slot": "extractor", "method": "__init__", "inputs": ["text"]},
+    {"name": "A", "slot": "extractor", "method": "fuse", "inputs": ["text"]},
+    {"name": "A", "slot": "unknown", "method": "extract", "inputs": ["text"]},
+    {"name": "A", "slot": "extractor", "method": "extract", "inputs": ["text"], "kwargs": {}},
+    {"name": "A", "slot": "extractor"},
+    "A",
+])
+def test_invalid_stage_declarations_rejected(stage):
+    with pytest.raises(ValueError):
+        parse_stages([stage])
+
+
+def test_memoize_off_by_default_with_stage_override():
+    SlowExtractor.calls = 0
+    orch = _orchestrator()
+    orch.run("goal", "erin")
+    orch.run("goal", "erin")
+    assert SlowExtractor.calls == 2
+
+    stages = [{"name": "B", "slot": "extractor", "method": "extract", "inputs": ["text"], "memoize": True}]
+    orch = _orchestrator(stages=json.dumps(stages))
+    orch.run("goal", "x")
+    orch.core.memo = StageMemo()
+    SlowExtractor.calls = 0
+    orch.run("goal", "frank")
+    orch.run("goal", "frank")
+    assert SlowExtractor.calls == 1
+
+
+def test_dag_orchestrator_discovered():
+    from python_service.core.engine import engine
+    cls = engine.get_class("orchestrators", "dag")
+    assert cls is not None and cls.__name__ == "DagOrchestratorAppliance"
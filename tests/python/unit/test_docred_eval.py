@@ -0,0 +1,64 @@
+import json
+from kgforge.models import Edge, Graph, Node
+from python_service.services.batch_runner import BatchConfig, BatchRunner
+from python_service.services.docred_eval import DocREDEvaluator, evaluate_batch, normalize_text, pareto_table
+
+SAMPLE = {
+    "title": "Alice",
+    "vertexSet": [[{"name": "Alice Smith"}, {"name": "Alice"}], [{"name": "Paris"}], [{"name": "France"}]],
+    "labels": [{"h": 0, "t": 1, "r": "P551"}, {"h": 1, "t": 2, "r": "P17"}],
+}
+RELATIONS = {"P551": "residence", "P17": "country"}
+
+
+def _graph(triples):
+    graph = Graph(graph_id="G_B")
+    ids = {}
+    for h, r, t in triples:
+        for label in (h, t):
+            if label not in ids:
+                ids[label] = f"entity_{len(ids)}"
+                graph.add_node(Node(node_id=ids[label], label=label))
+        graph.add_edge(Edge(source=ids[h], target=ids[t], relation=r))
+    return graph
+
+
+def test_strict_and_pair_scores():
+    evaluator = DocREDEvaluator(RELATIONS)
+    # 别名对齐 + 关系名规范化命中；关系名不同只在 pair 模式命中；未对齐实体计为假阳性
+    evaluator.add(SAMPLE, _graph([("alice", "Residence", "Paris"), ("Paris", "capital of", "France"), ("Bob", "country", "France")]))
+    scores = evaluator.score()
+    assert scores["gold"] == 2 and scores["predicted"] == 3 and scores["unaligned"] == 1
+    assert scores["strict"]["tp"] == 1 and scores["strict"]["precision"] == round(1 / 3, 4) and scores["strict"]["recall"] == 0.5
+    assert scores["pair"]["tp"] == 2 and scores["pair"]["recall"] == 1.0
+    assert normalize_text("The  Eiffel Tower ( Paris )") == "eiffel tower (paris)"
+
+
+def test_evaluate_batch_and_pareto(tmp_path):
+    from python_service.schemas.graph_schema import graph_to_dict
+    data_dir = tmp_path / "data" / "DocRED" / "data"
+    data_dir.mkdir(parents=True)
+    (data_dir / "dev.json").write_text(json.dumps([SAMPLE] * 4))
+    (data_dir / "rel_info.json").write_text(json.dumps(RELATIONS))
+    from python_service.services.dataset_service import DatasetService
+    svc = DatasetService()
+    svc._root = str(tmp_path)
+
+    def runner(triples):
+        graph = graph_to_dict(_graph(triples))
+        return lambda request: {"status": "success", "graph": {}, "intermediate_graphs": {"G_B": graph}}
+
+    rows = []
+    for name, triples in (("full", [("Alice", "residence", "Paris"), ("Paris", "country", "France")]),
+                          ("fast", [("Alice", "residence", "Paris")])):
+        out = tmp_path / "runs" / name
+        BatchRunner(BatchConfig(dataset_id="docred", split="dev"), output_dir=out, workers=1,
+                    dataset_service=svc, sample_runner=runner(triples)).run()
+        rows.append({"name": name, "scores": evaluate_batch(out, dataset_service=svc)})
+
+    assert rows[0]["scores"]["strict"]["f1"] == 1.0 and rows[0]["scores"]["documents"] == 4
+    assert rows[1]["scores"]["strict"]["recall"] == 0.5
+    rows[0]["scores"]["latency_ms"]["p50"], rows[1]["scores"]["latency_ms"]["p50"] = 100, 40
+    table = pareto_table(rows + [{"name": "slow", "scores": {**rows[1]["scores"], "latency_ms": {"p50": 200}}}])
+    assert [r["name"] for r in table] == ["fast", "full", "slow"]
+    assert [r["pareto"] for r in table] == [True, True, False]
@@ -0,0 +1,64 @@
+import json
+import pytest
+from python_service.services import dataset_service as ds_module
+from python_service.services.dataset_service import DatasetService
+from python_service.services.evidence_store import EvidenceStore, parse_dump_lines
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = EvidenceStore(tmp_path / "fever.sqlite")
+    monkeypatch.setattr(ds_module, "get_evidence_store", lambda: store)
+    return store
+
+
+def test_import_dump_keeps_fever_sentence_ids(store, tmp_path):
+    dump = tmp_path / "wiki-001.jsonl"
+    dump.write_text("\n".join(json.dumps(p) for p in [
+        {"id": "Nikolaj_Coster-Waldau", "text": "Nikolaj is an actor . He was born in Denmark .",
+         "lines": "0\tNikolaj is an actor .\tactor\n1\tHe was born in Denmark .\tDenmark"},
+        {"id": "Empty", "text": "", "lines": ""},
+    ]))
+    assert store.import_dump([tmp_path]) == 2
+    text, sentences = store.get_page("Nikolaj_Coster-Waldau")
+    assert sentences == ["Nikolaj is an actor .", "He was born in Denmark ."]
+    assert store.stats()["by_source"] == {"dump": 2} and store.generation == 1
+    assert parse_dump_lines("0\ta\n2\tc\tlink") == ["a", "", "c"]
+
+
+def test_prefetch_fetches_only_missing_pages(store, monkeypatch):
+    monkeypatch.delenv("PRISM_FEVER_OFFLINE", raising=False)
+    store.put_page("Known", "Already here.")
+    calls = []
+    report = store.prefetch(["Known", "New_Page", "New_Page", "Broken"], workers=2,
+                            fetcher=lambda t: calls.append(t) or (1 / 0 if t == "Broken" else f"{t} text. Second."))
+    assert sorted(calls) == ["Broken", "New_Page"]
+    assert report["fetched"] == 1 and report["failed"] == 1
+    assert store.get_page("New_Page")[1] == ["New_Page text.", "Second."]
+
+    monkeypatch.setenv("PRISM_FEVER_OFFLINE", "1")
+    assert store.prefetch(["Other"], fetcher=lambda t: pytest.fail("network used offline"))["missing"] == 1
+
+
+def test_normalize_fever_is_local_first(store, monkeypatch):
+    monkeypatch.setenv("PRISM_FEVER_OFFLINE", "1")
+    monkeypatch.setattr(ds_module, "fetch_wikipedia_page", lambda t: pytest.fail("network used"))
+    store.put_pages([("Some_Page", "First one. Second one.", ["First one .", "Second one ."])], source="dump")
+    svc = DatasetService()
+    raw = {"claim": "c", "label": "SUPPORTS", "evidence_wiki_url": "Some_Page", "evidence_sentence_id": 1}
+    norm = svc.normalize_sample("fever", "labelled_dev", 0, raw)
+    assert norm["context"] == "Second one ." and norm["evidence"]["evidence_text"] == "Second one ."
+    # 本地未收录且离线：退化为 claim
+    raw["evidence_wiki_url"] = "Unknown_Page"
+    assert svc.normalize_sample("fever", "labelled_dev", 0, raw)["context"] == "c"
+
+
+def test_generation_bumps_only_for_batches(store, monkeypatch):
+    monkeypatch.delenv("PRISM_FEVER_OFFLINE", raising=False)
+    # 按需抓取的单页回写不让预览索引失效
+    store.put_page("On_Demand", "Fetched while browsing.")
+    assert store.generation == 0
+    store.prefetch(["A", "B"], workers=2, fetcher=lambda t: f"{t} text.")
+    assert store.generation == 1
+    store.prefetch(["A"], fetcher=lambda t: pytest.fail("already local"))
+    assert store.generation == 1
@@ -21,3 +21,44 @@ def test_recursive_slot_resolution():
     orchestrator = UnifiedFactory.create_component("orchestrators", "dynamic_halting")
     assert hasattr(orchestrator, "extractor")
     assert not isinstance(orchestrator.extractor, str) # 应该是个对象
+
+def test_construction_plan_cached_until_catalog_changes(monkeypatch):
+    """构建计划按组件缓存，目录变化（generation 递增）后重新编译"""
+    params = {"data_filter": "example_filter"}
+    UnifiedFactory.create_component("orchestrators", "complex_example", params=params)
+    calls = []
+    original = engine.get_class
+    monkeypatch.setattr(engine, "get_class", lambda *a: calls.append(a) or original(*a))
+
+    orchestrator = UnifiedFactory.create_component("orchestrators", "complex_example", params=params)
+    assert calls == []
+    assert type(orchestrator.components["data_filter"]).__name__ == "ExampleFilterAppliance"
+
+    monkeypatch.setattr(engine, "generation", engine.generation + 1)
+    UnifiedFactory.create_component("orchestrators", "complex_example")
+    assert ("orchestrators", "complex_example") in calls
+
+def test_gpt_expander_shares_client(monkeypatch):
+    """相同 api_key/base_url 的展开器复用同一个 OpenAI 客户端"""
+    pytest.importorskip("openai")
+    from kgforge.components.expanders.utils.gpt_expander import GPTExpander
+    a = GPTExpander(api_key="sk-test-shared-client")
+    b = GPTExpander(api_key="sk-test-shared-client")
+    c = GPTExpander(api_key="sk-test-other-client")
+    assert a.client is b.client
+    assert a.client is not c.client
+
+
+def test_gpt_expander_client_cache_is_bounded(monkeypatch):
+    """客户端缓存按 LRU 淘汰，键不含明文 api_key"""
+    pytest.importorskip("openai")
+    from kgforge.components.expanders.utils import gpt_expander
+    monkeypatch.setattr(gpt_expander, "_CLIENT_CACHE", type(gpt_expander._CLIENT_CACHE)())
+    monkeypatch.setattr(gpt_expander, "CLIENT_CACHE_SIZE", 2)
+    first = gpt_expander.get_shared_client("sk-lru-1", "http://a")
+    gpt_expander.get_shared_client("sk-lru-2", "http://a")
+    assert gpt_expander.get_shared_client("sk-lru-1", "http://a") is first  # 刷新为最近使用
+    gpt_expander.get_shared_client("sk-lru-3", "http://a")
+    assert len(gpt_expander._CLIENT_CACHE) == 2
+    assert gpt_expander.get_shared_client("sk-lru-1", "http://a") is first
+    assert not any("sk-lru" in key for key in gpt_expander._CLIENT_CACHE)
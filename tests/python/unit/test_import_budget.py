@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from kgforge.utils.lazy_import import lazy_import, is_loaded
+
+project_root = Path(__file__).parent.parent.parent.parent.absolute()
+
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "sklearn", "openai"]
+# 冷启动导入全部组件模块并强制全量扫描的时间预算（秒），CI 机器较慢时可通过环境变量放宽
+IMPORT_BUDGET_S = float(os.getenv("PRISM_IMPORT_BUDGET_S", "1.0"))
+
+_PROBE = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+from python_service.core.engine import ComponentEngine
+engine = ComponentEngine(index_path=None)
+engine.scan_all(force=True)
+for module_name, _ in engine._iter_component_files():
+    importlib.import_module(module_name)
+elapsed = time.perf_counter() - t0
+heavy = sorted({m.split('.')[0] for m in sys.modules} & set(json.loads(sys.argv[1])))
+print(json.dumps({"elapsed": elapsed, "heavy": heavy}))
+"""
+
+
+def test_component_discovery_import_budget():
+    """组件发现与模块导入不得触发重型依赖，且冷启动耗时在预算内"""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(str(project_root / p) for p in ["core", "server/python", "server/python/python_service"])
+    env["PRISM_SPEC_INDEX"] = "off"
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(HEAVY_MODULES)],
+        capture_output=True, text=True, env=env, cwd=str(project_root), check=True,
+    )
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    assert report["heavy"] == []
+    assert report["elapsed"] < IMPORT_BUDGET_S, report
+
+
+def test_lazy_module_defers_and_reports_missing():
+    json_proxy = lazy_import("json")
+    assert not is_loaded(json_proxy)
+    assert json_proxy.dumps([1]) == "[1]"
+    assert is_loaded(json_proxy)
+
+    missing = lazy_import("kgforge_definitely_missing_dep", hint="测试组件")
+    with pytest.raises(ImportError, match="测试组件"):
+        missing.anything
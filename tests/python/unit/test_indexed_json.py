@@ -0,0 +1,46 @@
+import io
+import json
+import os
+import pytest
+from python_service.services.indexed_json import iter_json_array, open_indexed
+from python_service.services.dataset_service import DatasetService
+
+
+def test_iter_json_array_across_chunk_boundaries():
+    items = [{"title": f"文档 {i}", "sents": [["a", "b"]] * (i % 5), "n": 12345 + i} for i in range(200)] + [7, "x", None]
+    text = json.dumps(items, ensure_ascii=False, indent=1)
+    # 极小的块大小迫使元素与数字跨块
+    assert list(iter_json_array(io.StringIO(text), chunk_size=7)) == items
+    assert list(iter_json_array(io.StringIO("[ ]"))) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"data": []}')))
+
+
+def test_indexed_store_random_access_and_rebuild(tmp_path):
+    source = tmp_path / "dev.json"
+    source.write_text(json.dumps([{"i": i} for i in range(50)]))
+    store = open_indexed(source, tmp_path / "cache")
+    assert len(store) == 50
+    assert store[37] == {"i": 37} and store[-1] == {"i": 49}
+    with pytest.raises(IndexError):
+        store[50]
+
+    # 源文件变化后重建
+    source.write_text(json.dumps([{"i": i} for i in range(3)]))
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10**9))
+    assert len(open_indexed(source, tmp_path / "cache")) == 3
+
+
+def test_docred_split_served_from_index(tmp_path):
+    data_dir = tmp_path / "data" / "DocRED" / "data"
+    data_dir.mkdir(parents=True)
+    docs = [{"title": f"Doc {i}", "sents": [["Alice", "met", "Bob"]], "vertexSet": [], "labels": []} for i in range(30)]
+    (data_dir / "dev.json").write_text(json.dumps(docs))
+
+    svc = DatasetService()
+    svc._root = str(tmp_path)
+    assert svc.get_total("docred", "dev") == 30
+    assert svc.get_raw_sample("docred", "dev", 12)["title"] == "Doc 12"
+    page = svc.list_samples_preview("docred", "dev", page=2, page_size=10)
+    assert [s["index"] for s in page["samples"]] == list(range(10, 20))
+    assert (tmp_path / ".cache" / "datasets" / "docred" / "dev.jsonl").exists()
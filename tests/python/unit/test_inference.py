@@ -23,3 +23,22 @@ def test_inference_engine_error(engine):
     """测试错误处理"""
     with pytest.raises(RuntimeError):
         engine.run_dynamic(goal="", text="", orchestrator="non_existent")
+
+def test_pool_exhaustion_surfaces_as_503(engine, monkeypatch):
+    """实例池借不出成员时，PrismCapacityError 原样穿过 run_dynamic（503），不被包装成 500"""
+    from python_service.core.errors import PrismCapacityError
+    from python_service.core.pool import pools
+    from python_service.services.lifecycle import warmer
+
+    seed = object()
+    monkeypatch.setitem(warmer._instances, "orchestrators.exhausted", seed)
+    monkeypatch.setattr(pools, "_pool_config", lambda: {"default_size": 1, "checkout_timeout": 0.05})
+    monkeypatch.delitem(pools._pools, "orchestrators.exhausted", raising=False)
+    busy = pools.get_pool("orchestrators.exhausted", lambda: object(), seed=seed).checkout()
+    try:
+        with pytest.raises(PrismCapacityError) as exc:
+            engine.run_dynamic(goal="g", text="t", orchestrator="exhausted", isolated=False)
+        assert exc.value.status_code == 503
+    finally:
+        pools._pools.pop("orchestrators.exhausted", None)
+    assert busy is seed
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+import pytest
+from python_service.core.errors import PrismError, PrismResourceLimitError, PrismValidationError
+from python_service.services import isolation
+from python_service.services.isolation import IsolatedPool
+
+
+def _echo(request, on_stage):
+    from kgforge import get_logger
+    on_stage("G_B", {"nodes": {}, "edges": []})
+    get_logger("kgforge.test_isolation").info(f"echo {request['value']}")
+    return {"status": "success", "value": request["value"], "pid": os.getpid()}
+
+
+def _hang(request, on_stage):
+    time.sleep(60)
+
+
+def _hog(request, on_stage):
+    block = bytearray(256 << 20)
+    time.sleep(30)
+    return len(block)
+
+
+def _spin(request, on_stage):
+    while True:
+        pass
+
+
+def _spin_ignoring_sigxcpu(request, on_stage):
+    import signal
+    signal.signal(signal.SIGXCPU, signal.SIG_IGN)  # 模拟阻塞在 C 扩展中、收不到信号的任务
+    while True:
+        pass
+
+
+def _fail(request, on_stage):
+    if request["kind"] == "prism":
+        raise PrismValidationError("bad input")
+    raise ValueError("boom")
+
+
+def test_result_stage_and_log_forwarding(monkeypatch):
+    logs = []
+    monkeypatch.setattr("kgforge.utils.logger.dispatch_to_global_handlers", lambda record: logs.append(record.getMessage()))
+    pool = IsolatedPool(workers=1, target=_echo)
+    stages = []
+    try:
+        first = pool.run({"value": 1}, on_stage=lambda name, graph: stages.append(name))
+        second = pool.run({"value": 2})
+    finally:
+        pool.shutdown()
+    assert first["value"] == 1 and first["pid"] != os.getpid()
+    # worker 复用
+    assert second["pid"] == first["pid"]
+    assert stages == ["G_B"]
+    assert "echo 1" in logs and "echo 2" in logs
+
+
+def test_cancel_kills_blocked_worker():
+    pool = IsolatedPool(workers=1, target=_hang)
+    cancel = threading.Event()
+    threading.Timer(0.5, cancel.set).start()
+    start = time.monotonic()
+    try:
+        result = pool.run({}, cancel_event=cancel)
+    finally:
+        pool.shutdown()
+    assert result["status"] == "cancelled"
+    assert time.monotonic() - start < 10
+    assert pool.stats()["killed"]["cancelled"] == 1
+
+
+def test_memory_limit_kills_worker():
+    pool = IsolatedPool(workers=1, max_rss_mb=128, target=_hog)
+    with pytest.raises(PrismResourceLimitError) as exc:
+        pool.run({})
+    assert exc.value.status_code == 422 and exc.value.details["rss_mb"] > 128
+    assert pool.stats()["killed"]["memory"] == 1
+
+
+@pytest.mark.skipif(isolation.resource is None, reason="RLIMIT_CPU requires the resource module")
+def test_cpu_limit_stops_runaway_task():
+    pool = IsolatedPool(workers=1, cpu_seconds=1, target=_spin)
+    start = time.monotonic()
+    with pytest.raises(PrismResourceLimitError):
+        pool.run({})
+    assert time.monotonic() - start < 10
+    assert pool.stats()["killed"]["cpu"] == 1
+
+
+@pytest.mark.skipif(isolation.resource is None, reason="RLIMIT_CPU requires the resource module")
+def test_cpu_limit_keeps_hard_limit_and_reuses_worker():
+    pool = IsolatedPool(workers=1, cpu_seconds=30, target=_echo)
+    try:
+        first, second = pool.run({"value": 1}), pool.run({"value": 2})
+        assert second["pid"] == first["pid"] and pool.stats()["spawned"] == 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="CPU watchdog reads /proc")
+def test_cpu_watchdog_kills_worker_that_ignores_sigxcpu(monkeypatch):
+    monkeypatch.setattr(isolation, "CPU_GRACE_SECONDS", 1)
+    pool = IsolatedPool(workers=1, cpu_seconds=1, target=_spin_ignoring_sigxcpu)
+    start = time.monotonic()
+    with pytest.raises(PrismResourceLimitError) as exc:
+        pool.run({})
+    assert time.monotonic() - start < 10 and exc.value.details["cpu_s"] > 2
+    assert pool.stats()["killed"]["cpu"] == 1
+
+
+def test_errors_are_rebuilt_and_worker_survives():
+    pool = IsolatedPool(workers=1, target=_fail)
+    try:
+        with pytest.raises(PrismError) as exc:
+            pool.run({"kind": "prism"})
+        assert exc.value.code == "VALIDATION_ERROR" and exc.value.status_code == 422
+        with pytest.raises(RuntimeError, match="boom"):
+            pool.run({"kind": "runtime"})
+        assert pool.stats()["spawned"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_run_dynamic_isolated_end_to_end(monkeypatch):
+    from python_service.services.inference import InferenceEngine
+    pool = IsolatedPool(workers=1)
+    monkeypatch.setattr(isolation, "_pool", pool)
+    stages = []
+    try:
+        result = InferenceEngine().run_dynamic(
+            goal="g", text="Alice met Bob.", orchestrator="fuzz_test",
+            params={"delay_ms": 0, "max_loops": 1}, isolated=True,
+            on_stage=lambda name, graph: stages.append(name),
+        )
+    finally:
+        pool.shutdown()
+    assert result["status"] == "success" and result["graph"]["nodes"]
+    assert "G_B" in stages and isinstance(result["intermediate_graphs"], dict)
+
+
+def test_request_flag_cannot_disable_enforced_isolation(monkeypatch):
+    from python_service.api.routes import InferenceRequest
+    from python_service.services.inference import InferenceEngine
+    monkeypatch.setenv("PRISM_ISOLATION", "1")
+    dispatched = []
+    monkeypatch.setattr(InferenceEngine, "_run_isolated",
+                        lambda self, request, on_stage=None: dispatched.append(request) or {"status": "success"})
+    request = InferenceRequest(goal="g", text="t", isolated=False)
+    InferenceEngine().run_dynamic(goal=request.goal, text=request.text, isolated=request.isolated)
+    assert len(dispatched) == 1
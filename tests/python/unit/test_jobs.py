@@ -0,0 +1,114 @@
+import threading
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from python_service.core.errors import PrismRateLimitError
+from python_service.services.jobs import JobManager
+
+
+def _wait_done(manager, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not manager.get(job_id).done:
+        assert time.monotonic() < deadline, f"job {job_id} did not finish"
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_priority_order_and_persistence(tmp_path):
+    gate = threading.Event()
+    order = []
+
+    def runner(request):
+        if request["goal"] == "blocker":
+            gate.wait(5)
+        order.append(request["goal"])
+        return {"status": "success", "goal": request["goal"]}
+
+    manager = JobManager(max_workers=1, max_queue=10, store_dir=tmp_path, runner=runner)
+    blocker = manager.submit({"goal": "blocker"})
+    time.sleep(0.05)
+    low = manager.submit({"goal": "low"}, priority=0)
+    high = manager.submit({"goal": "high"}, priority=5)
+    gate.set()
+    _wait_done(manager, low.job_id)
+    _wait_done(manager, high.job_id)
+    assert order == ["blocker", "high", "low"]
+
+    # 结果已落盘（在释放锁后写入）：新的管理器实例（模拟重启）仍可查询
+    deadline = time.monotonic() + 5
+    while not (tmp_path / f"{high.job_id}.json").exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    reloaded = JobManager(store_dir=tmp_path, runner=runner).get(high.job_id)
+    assert reloaded.status == "succeeded" and reloaded.result["goal"] == "high"
+    assert [e["data"]["status"] for e in manager.get(blocker.job_id).events] == ["queued", "running", "succeeded"]
+
+
+def test_admission_control_and_cancel_queued(tmp_path):
+    gate = threading.Event()
+    manager = JobManager(max_workers=1, max_queue=1, store_dir=tmp_path, runner=lambda r: gate.wait(5) or {"status": "success"})
+    manager.submit({"goal": "running"})
+    time.sleep(0.05)
+    queued = manager.submit({"goal": "queued"})
+    with pytest.raises(PrismRateLimitError):
+        manager.submit({"goal": "rejected"})
+    assert manager.stats()["rejected"] == 1
+
+    assert manager.cancel(queued.job_id)
+    assert manager.get(queued.job_id).status == "cancelled"
+    gate.set()
+
+
+def test_cancel_before_pipeline_starts_is_not_lost(tmp_path):
+    from python_service.services.inference import CANCELLATION_EVENTS
+    started, release = threading.Event(), threading.Event()
+
+    def runner(request):
+        # 模拟 running 之后、编排器开始检查取消信号之前的窗口
+        started.set()
+        release.wait(5)
+        event = CANCELLATION_EVENTS.get(request["experiment_id"])
+        return {"status": "cancelled" if event is not None and event.is_set() else "success"}
+
+    manager = JobManager(max_workers=1, store_dir=tmp_path, runner=runner)
+    job = manager.submit({"goal": "g"})
+    assert started.wait(5)
+    assert manager.cancel(job.job_id)
+    release.set()
+    assert _wait_done(manager, job.job_id).status == "cancelled"
+    assert job.job_id not in CANCELLATION_EVENTS
+
+
+def test_status_follows_result_when_cancel_arrives_late(tmp_path):
+    release = threading.Event()
+    manager = JobManager(max_workers=1, store_dir=tmp_path, runner=lambda r: release.wait(5) and {"status": "success"})
+    job = manager.submit({"goal": "g"})
+    time.sleep(0.05)
+    manager.cancel(job.job_id)  # 管线不理会取消并完整跑完
+    release.set()
+    finished = _wait_done(manager, job.job_id)
+    assert finished.status == "succeeded" and finished.result == {"status": "success"}
+
+
+def test_job_routes_end_to_end(tmp_path, monkeypatch):
+    from python_service.api import job_routes
+    manager = JobManager(max_workers=1, store_dir=tmp_path)
+    monkeypatch.setattr(job_routes, "job_manager", manager)
+    app = FastAPI()
+    app.include_router(job_routes.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    resp = client.post("/api/v1/jobs", json={"goal": "g", "text": "t", "orchestrator": "fuzz_test",
+                                             "params": {"delay_ms": 0, "max_loops": 1}})
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+
+    # SSE 流在任务结束后以 end 事件收尾
+    with client.stream("GET", f"/api/v1/jobs/{job_id}/events") as stream:
+        body = "".join(stream.iter_text())
+    assert "event: end" in body and '"status": "succeeded"' in body
+
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["status"] == "success" and job["result"]["graph"]
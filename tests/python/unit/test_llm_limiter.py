@@ -0,0 +1,78 @@
+import time
+from types import SimpleNamespace
+import pytest
+from kgforge.utils.llm_limiter import LLMLimiter, TokenBucket, estimate_tokens, get_limiter, retry_after
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"status {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def _flaky(errors, usage=10):
+    """依次抛出 errors 中的异常，之后返回带 usage 的响应"""
+    calls = []
+
+    def fn():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=usage))
+    return fn, calls
+
+
+def test_token_bucket_reservation():
+    bucket = TokenBucket(per_minute=600)
+    assert bucket.reserve(600) == 0.0
+    # 额度用尽后按 10 个/秒 补充
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    bucket.refund(300)
+    assert bucket.reserve(100) == 0.0
+
+
+def test_requests_queue_when_rate_exhausted():
+    limiter = LLMLimiter("t", rpm=1200)
+    limiter.requests.reserve(1200)
+    start = time.monotonic()
+    limiter.call(lambda: "ok")
+    assert time.monotonic() - start >= 0.04
+    stats = limiter.stats()
+    assert stats["requests"] == 1 and stats["waited"] == 1 and stats["wait_ms_max"] >= 40
+
+
+def test_429_honours_retry_after_and_pauses_shared_calls():
+    limiter = LLMLimiter("t", tpm=600)
+    fn, calls = _flaky([FakeAPIError(429, {"retry-after": "0.2"})], usage=30)
+    limiter.call(fn, estimated_tokens=500)
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.2
+    stats = limiter.stats()
+    assert stats["throttled"] == 1 and stats["retries"] == 1 and stats["tokens"] == 30
+    # 预估额度按实际用量退回
+    assert limiter.tokens.tokens == pytest.approx(600 - 30, abs=10)
+
+
+def test_5xx_backoff_and_non_retryable_errors():
+    slept = []
+    limiter = LLMLimiter("t", max_retries=2, base_delay=1.0, sleep=slept.append)
+    fn, calls = _flaky([FakeAPIError(502), ConnectionError("reset")])
+    limiter.call(fn)
+    assert len(calls) == 3 and len(slept) == 2
+    assert 0 <= slept[0] <= 1.0 and 0 <= slept[1] <= 2.0
+
+    fn, calls = _flaky([FakeAPIError(400)])
+    with pytest.raises(FakeAPIError):
+        limiter.call(fn)
+    fn, calls = _flaky([FakeAPIError(503)] * 3)
+    with pytest.raises(FakeAPIError):
+        limiter.call(fn)
+    assert len(calls) == 3 and limiter.stats()["failed"] == 2
+
+
+def test_helpers():
+    assert retry_after(FakeAPIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after(FakeAPIError(429)) is None
+    assert estimate_tokens([{"content": "x" * 30}], completion_tokens=5) == 15
+    assert get_limiter("http://a", "m") is get_limiter("http://a", "m")
+    assert get_limiter("http://a", "m") is not get_limiter("http://b", "m")
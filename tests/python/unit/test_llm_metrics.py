@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+import pytest
+from kgforge.utils import llm_metrics
+from kgforge.utils.llm_callbacks import LLMUsageCallback
+from kgforge.utils.llm_metrics import LLMMetrics, instrument_openai
+from python_service.core.context import clear_experiment_id, get_current_llm_usage, set_experiment_id
+
+
+class FakeCompletions:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def create(self, **kwargs):
+        if self.fail:
+            raise RuntimeError("boom")
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20, total_tokens=120))
+
+
+def _client(fail=False):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(fail)), api_key="k")
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    fresh = LLMMetrics()
+    monkeypatch.setattr(llm_metrics, "llm_metrics", fresh)
+    monkeypatch.setattr(llm_metrics, "_prices", lambda: {"m1": {"prompt": 1.0, "completion": 2.0}})
+    return fresh
+
+
+def test_openai_wrapper_accounts_per_experiment(metrics):
+    client = instrument_openai(_client())
+    assert instrument_openai(client) is client and client.api_key == "k"
+    set_experiment_id("exp-llm")
+    try:
+        client.chat.completions.create(model="m1", messages=[])
+        client.chat.completions.create(model="m1", messages=[])
+        with pytest.raises(RuntimeError):
+            instrument_openai(_client(fail=True)).chat.completions.create(model="m2", messages=[])
+        usage = get_current_llm_usage().to_dict()
+    finally:
+        clear_experiment_id()
+    assert usage["calls"] == 3 and usage["errors"] == 1
+    assert usage["prompt_tokens"] == 200 and usage["total_tokens"] == 240
+    assert usage["by_model"]["m1"]["cost_usd"] == pytest.approx(0.28)
+    assert usage["cost_usd"] == pytest.approx(0.28) and usage["by_model"]["m2"]["cost_usd"] is None
+    # 进程级汇总同样计入；实验结束后不再累加
+    client.chat.completions.create(model="m1", messages=[])
+    assert metrics.usage.to_dict()["calls"] == 4
+
+
+def test_langchain_callback(metrics):
+    callback = LLMUsageCallback(model="m1")
+    callback.on_chat_model_start({}, [], run_id="a")
+    callback.on_llm_end(SimpleNamespace(llm_output={"token_usage": {"prompt_tokens": 7, "completion_tokens": 3}},
+                                        generations=[]), run_id="a")
+    message = SimpleNamespace(usage_metadata={"input_tokens": 5, "output_tokens": 1})
+    callback.on_llm_start({}, [], run_id="b")
+    callback.on_llm_end(SimpleNamespace(llm_output=None, generations=[[SimpleNamespace(message=message)]]), run_id="b")
+    callback.on_llm_start({}, [], run_id="c")
+    callback.on_llm_error(RuntimeError("x"), run_id="c")
+    entry = metrics.usage.to_dict()["by_model"]["m1"]
+    assert entry["calls"] == 3 and entry["errors"] == 1
+    assert entry["prompt_tokens"] == 12 and entry["completion_tokens"] == 4
+
+
+def test_retries_and_prometheus_rendering(metrics):
+    from kgforge.utils.llm_limiter import LLMLimiter
+
+    class Throttled(Exception):
+        status_code = 503
+
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise Throttled()
+        return "ok"
+
+    LLMLimiter("t", model='m"1', sleep=lambda s: None).call(fn)
+    llm_metrics.record_llm_call("m1", prompt_tokens=10, completion_tokens=5, latency_ms=300)
+    llm_metrics.record_llm_call("m1", latency_ms=200000, error=True)
+    text = metrics.render_prometheus()
+    assert 'prism_llm_retries_total{model="m\\"1"} 1' in text
+    assert 'prism_llm_calls_total{model="m1",status="error"} 1' in text
+    assert 'prism_llm_tokens_total{model="m1",type="prompt"} 10' in text
+    assert 'prism_llm_latency_ms_bucket{model="m1",le="250"} 0' in text
+    assert 'prism_llm_latency_ms_bucket{model="m1",le="500"} 1' in text
+    assert 'prism_llm_latency_ms_bucket{model="m1",le="+Inf"} 2' in text
+    assert 'prism_llm_cost_usd_total{model="m1"} 0.020000' in text
+    assert "# TYPE prism_llm_latency_ms histogram" in text
+
+
+def test_openai_path_does_not_import_langchain():
+    import os
+    import subprocess
+    import sys
+    code = ("import sys, kgforge.utils.llm_metrics, kgforge.components.expanders.utils.gpt_expander; "
+            "print('langchain_core' in sys.modules)")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in sys.path if p)}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert out.stdout.strip() == "False"
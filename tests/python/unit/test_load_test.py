@@ -0,0 +1,48 @@
+import itertools
+import threading
+import time
+from benchmarks.load_test import percentile, run_load
+
+
+def test_percentile_nearest_rank():
+    data = [float(i) for i in range(1, 101)]
+    assert percentile(data, 50) == 50.0
+    assert percentile(data, 99) == 99.0
+    assert percentile([], 95) == 0.0
+
+
+def test_run_load_closed_loop_counts_errors():
+    counter = itertools.count(1)
+    lock = threading.Lock()
+
+    def send():
+        # 多线程并发调用：加锁取号，保证恰好每 5 个失败 1 个
+        with lock:
+            n = next(counter)
+        ok = n % 5 != 0
+        return ok, "200" if ok else "500"
+
+    report = run_load(send, concurrency=4, total_requests=50)
+    assert report["requests"] == 50
+    assert report["errors"] == 10
+    assert report["error_rate"] == 0.2
+    assert report["status_codes"] == {"200": 40, "500": 10}
+
+
+def test_run_load_open_loop_respects_rate():
+    def send():
+        time.sleep(0.001)
+        return True, "200"
+
+    report = run_load(send, concurrency=2, rate=200, total_requests=20)
+    assert report["requests"] == 20
+    # 20 个请求按 200 req/s 排程，至少需要约 95ms
+    assert report["elapsed_s"] >= 0.09
+    assert report["latency"]["p99_ms"] >= report["service_latency"]["p50_ms"]
+
+
+def test_fuzz_orchestrator_node_count():
+    from kgforge.components.orchestration.modules.fuzz_test_orchestrator_appliance import FuzzTestOrchestratorAppliance
+    orch = FuzzTestOrchestratorAppliance(delay_ms=0, max_loops=0, node_count=40)
+    result = orch.run(goal="g", text="t")
+    assert len(result.get_graphs()["G_B"].nodes) == 41
@@ -0,0 +1,49 @@
+import logging
+import uuid
+import pytest
+from kgforge.utils import get_logger, setup_logger
+from kgforge.utils import logger as logger_module
+
+pytestmark = pytest.mark.skipif(logger_module.LOG_BACKEND == "legacy", reason="legacy backend selected")
+
+
+def test_loggers_share_single_queue_handler():
+    a = get_logger("kgforge.test_backend_a").logger
+    b = get_logger("kgforge.test_backend_b").logger
+    assert a.handlers[0] is b.handlers[0]
+    assert not any(isinstance(h, (logging.FileHandler, logging.StreamHandler)) for h in a.handlers)
+
+
+def test_queue_backend_writes_shared_file():
+    marker = f"queue-backend-{uuid.uuid4().hex}"
+    get_logger("kgforge.test_backend_file").info(marker)
+    setup_logger("kgforge.test_backend_console").info(f"{marker}-console-only")
+    logger_module.flush_logs()
+
+    content = (logger_module.DEFAULT_LOG_DIR / logger_module.DEFAULT_LOG_FILENAME).read_text(encoding="utf-8")
+    assert marker in content
+    # log_to_file=False 的 logger 不写入文件
+    assert f"{marker}-console-only" not in content
+
+
+def test_custom_format_falls_back_to_dedicated_handler():
+    lg = setup_logger("kgforge.test_backend_custom", format_string="%(message)s")
+    assert any(isinstance(h, logging.StreamHandler) for h in lg.handlers)
+
+
+def test_log_dir_is_configured_not_cwd_relative():
+    import os
+    from pathlib import Path
+    assert logger_module.DEFAULT_LOG_DIR == Path(os.environ["KGFORGE_LOG_DIR"]).resolve()
+    assert logger_module.DEFAULT_LOG_DIR.is_absolute()
+
+
+def test_queue_handler_enqueues_a_copy():
+    handler = logger_module._LazyQueueHandler(logger_module.queue.SimpleQueue(), to_file=False)
+    record = logging.LogRecord("kgforge.x", logging.INFO, __file__, 1, "msg %s", ("a",), None)
+    handler.handle(record)
+    queued = handler.queue.get_nowait()
+    assert queued is not record and queued.getMessage() == "msg a"
+    record.msg = "changed"
+    assert queued.getMessage() == "msg a"
+    assert not hasattr(record, "_kgforge_to_file")
@@ -0,0 +1,57 @@
+import threading
+import time
+import pytest
+from python_service.core.pool import InstancePool, PoolRegistry, pools
+from python_service.core.errors import PrismCapacityError
+from python_service.core.factory import UnifiedFactory
+from python_service.services.lifecycle import warmer
+
+
+def test_pool_blocks_when_exhausted_and_records_wait():
+    pool = InstancePool("t.one", builder=lambda: pytest.fail("size=1 must not grow"), size=1, seed=object())
+    first = pool.checkout()
+
+    def release():
+        time.sleep(0.1)
+        pool.checkin(first)
+
+    threading.Thread(target=release).start()
+    assert pool.checkout(timeout=5) is first
+    stats = pool.stats()
+    assert stats["waits"] == 1 and stats["wait_max_ms"] >= 50
+
+    with pytest.raises(PrismCapacityError):
+        pool.checkout(timeout=0.05)
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_pool_grows_up_to_size():
+    built = []
+    pool = InstancePool("t.grow", builder=lambda: built.append(object()) or built[-1], size=2, seed=object())
+    a, b = pool.checkout(), pool.checkout()
+    assert a is not b and len(built) == 1
+    assert pool.stats()["members"] == 2 and pool.stats()["in_use"] == 2
+
+
+def test_lease_reuses_and_returns_members():
+    registry = PoolRegistry()
+    seed = object()
+    with registry.lease():
+        a = registry.checkout("t.lease", lambda: object(), seed)
+        # 同一请求内重复借出复用同一成员，不会在 size=1 时自锁
+        assert registry.checkout("t.lease", lambda: object(), seed) is a
+        assert registry.stats()["t.lease"]["in_use"] == 1
+    assert registry.stats()["t.lease"]["in_use"] == 0
+    assert registry.checkout("t.lease", lambda: object(), seed) is None  # 无 lease
+
+
+def test_factory_checks_out_preloaded_instance(monkeypatch):
+    class Preloaded:
+        pass
+
+    instance = Preloaded()
+    monkeypatch.setitem(warmer._instances, "test.pooled", instance)
+    with UnifiedFactory.lease():
+        assert UnifiedFactory.create_component("test", "pooled") is instance
+        assert pools.stats()["test.pooled"]["in_use"] == 1
+    assert pools.stats()["test.pooled"]["in_use"] == 0
@@ -0,0 +1,96 @@
+import gc
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+import requests
+from python_service.services.prefork import check_fork_safe, freeze_heap, is_prefork_worker, shared_memory_report
+
+project_root = Path(__file__).parent.parent.parent.parent.absolute()
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork") or not os.path.exists("/proc/self/smaps_rollup"),
+                                reason="prefork 需要 os.fork 与 /proc")
+
+
+def test_forked_worker_shares_preloaded_pages():
+    weights = bytearray(64 * 1024 * 1024)  # 模拟预热后的模型权重
+    weights[::4096] = b"\x01" * len(weights[::4096])
+    freeze_heap()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        total = sum(weights[::4096])  # 只读访问
+        os.write(write_fd, b"x" if total else b"")
+        time.sleep(2)
+        os._exit(0)
+    try:
+        os.read(read_fd, 1)
+        report = shared_memory_report([pid])[pid]
+        assert report["Shared"] > 48 * 1024  # kB：权重页未被复制
+    finally:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        os.close(read_fd)
+        os.close(write_fd)
+        gc.unfreeze()
+
+
+def test_fork_refused_after_cuda_init(monkeypatch):
+    class _Cuda:
+        @staticmethod
+        def is_initialized():
+            return True
+
+    class _Torch:
+        cuda = _Cuda
+
+    monkeypatch.setitem(sys.modules, "torch", _Torch)
+    with pytest.raises(RuntimeError, match="CPU"):
+        check_fork_safe()
+    assert not is_prefork_worker()
+
+
+_SERVER = """
+import os, sys
+from fastapi import FastAPI
+from python_service.services.prefork import PreforkServer, is_prefork_worker
+app = FastAPI()
+
+@app.get("/pid")
+def pid():
+    return {"pid": os.getpid(), "worker": is_prefork_worker(), "cuda": os.environ.get("CUDA_VISIBLE_DEVICES")}
+
+sys.exit(PreforkServer(app, host="127.0.0.1", port=int(sys.argv[1]), workers=2, log_level="warning", warmup=False).run())
+"""
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_prefork_server_serves_and_stops():
+    port = _free_port()
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(str(project_root / p) for p in ["core", "server/python", "server/python/python_service"])
+    proc = subprocess.Popen([sys.executable, "-c", _SERVER, str(port)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                body = requests.get(f"http://127.0.0.1:{port}/pid", timeout=1).json()
+                break
+            except requests.RequestException:
+                assert time.monotonic() < deadline, "prefork server did not come up"
+                time.sleep(0.2)
+        assert body["pid"] != proc.pid  # 由 worker 而非主进程响应
+        assert body["worker"] is True and body["cuda"] == ""
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0
@@ -0,0 +1,45 @@
+import json
+import os
+from python_service.services.dataset_service import DatasetService
+
+
+def _docred_service(tmp_path, docs):
+    data_dir = tmp_path / "data" / "DocRED" / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / "dev.json").write_text(json.dumps(docs))
+    svc = DatasetService()
+    svc._root = str(tmp_path)
+    return svc
+
+
+def _doc(i, n_sents):
+    return {"title": f"Doc {i}", "sents": [["w"] * 3] * n_sents, "vertexSet": [[{}]] * i, "labels": [{"r": "P1"}] * (i % 3)}
+
+
+def test_paging_sorting_and_length_filter(tmp_path):
+    svc = _docred_service(tmp_path, [_doc(i, (i * 7) % 10 + 1) for i in range(25)])
+    page = svc.list_samples_preview("docred", "dev", page=3, page_size=10)
+    assert page["total"] == 25 and [s["index"] for s in page["samples"]] == list(range(20, 25))
+    first = page["samples"][0]
+    # 全文长度：每句 "w w w"（5 字符）以空格拼接
+    n = (20 * 7) % 10 + 1
+    assert first["context_length"] == 5 * n + (n - 1)
+    assert first["meta"] == {"sentence_count": n, "entity_count": 20, "relation_count": 2}
+
+    by_len = svc.list_samples_preview("docred", "dev", page=1, page_size=25, sort_by="context_length", descending=True)
+    lengths = [s["context_length"] for s in by_len["samples"]]
+    assert lengths == sorted(lengths, reverse=True)
+
+    short = svc.list_samples_preview("docred", "dev", page=1, page_size=100, max_length=11)
+    assert short["total"] == len([s for s in by_len["samples"] if s["context_length"] <= 11]) > 0
+    assert svc.list_samples_preview("docred", "dev", page=1, page_size=10, label="SUPPORTS")["total"] == 0
+
+
+def test_index_rebuilt_when_split_changes(tmp_path):
+    svc = _docred_service(tmp_path, [_doc(i, 1) for i in range(5)])
+    assert svc.list_samples_preview("docred", "dev", 1, 10)["total"] == 5
+    path = tmp_path / "data" / "DocRED" / "data" / "dev.json"
+    path.write_text(json.dumps([_doc(i, 2) for i in range(8)]))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    page = svc.list_samples_preview("docred", "dev", 1, 10)
+    assert page["total"] == 8 and page["samples"][0]["meta"]["sentence_count"] == 2
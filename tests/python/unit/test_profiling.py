@@ -0,0 +1,55 @@
+from kgforge.utils.profiling import profile_session, profile_span, profiled, current_span
+from kgforge.models import Graph
+from kgforge.models.experiment_result import ExperimentResult
+
+def test_span_noop_without_session():
+    """未开启会话时 profile_span 为空操作"""
+    with profile_span("orphan") as span:
+        assert span is None
+    assert current_span() is None
+
+def test_nested_spans_merge_and_count():
+    """同名子 Span 合并，调用次数累加"""
+    @profiled("work")
+    def work():
+        return sum(range(1000))
+
+    with profile_session("root") as root:
+        with profile_span("stage"):
+            for _ in range(3):
+                work()
+
+    tree = root.to_dict()
+    assert tree["name"] == "root"
+    assert tree["calls"] == 1
+    stage = tree["children"][0]
+    assert stage["name"] == "stage"
+    assert stage["children"][0]["name"] == "work"
+    assert stage["children"][0]["calls"] == 3
+    assert tree["wall_ms"] >= stage["wall_ms"]
+
+def test_nested_session_becomes_child():
+    """嵌套的会话作为子 Span 挂载到外层树"""
+    with profile_session("outer") as outer:
+        with profile_session("inner") as inner:
+            pass
+    assert outer.find("inner") is inner
+
+def test_experiment_result_log_profile():
+    with profile_session("run") as prof:
+        pass
+    result = ExperimentResult(graph=Graph())
+    result.log_profile(prof)
+    assert result.meta("profile")["name"] == "run"
+
+def test_inference_profile_in_metadata():
+    """/infer 结果在 metadata.profile 中返回全链路剖析树"""
+    from python_service.services.inference import InferenceEngine
+    output = InferenceEngine().run_dynamic(
+        goal="g", text="t", orchestrator="fuzz_test", params={"delay_ms": 0, "max_loops": 1}
+    )
+    profile = output["metadata"]["profile"]
+    assert profile["name"] == "infer"
+    names = [c["name"] for c in profile["children"]]
+    assert "factory.orchestrators.fuzz_test" in names
+    assert "run" in names and "serialize" in names
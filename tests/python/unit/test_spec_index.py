@@ -0,0 +1,90 @@
+import os
+import pytest
+from pathlib import Path
+from python_service.core.engine import ComponentEngine
+from python_service.core.spec_index import SpecIndex
+
+FUZZ_MODULE = "kgforge.components.orchestration.modules.fuzz_test_orchestrator_appliance"
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "spec_index.json"
+
+
+def _module_path(engine, module_name):
+    return next(p for m, p in engine._iter_component_files() if m == module_name)
+
+
+def test_static_introspection_matches_import(index_path):
+    engine = ComponentEngine(index_path=index_path)
+    for module in [FUZZ_MODULE, "kgforge.components.extractors.modules.example_generator_appliance",
+                   "kgforge.components.halting.modules.standard_haltings"]:
+        source = Path(_module_path(engine, module)).read_bytes()
+        assert engine._introspector.specs(module, source) == engine._import_specs(module)
+
+
+def test_catalog_served_from_persisted_index(index_path):
+    first = ComponentEngine(index_path=index_path).scan_all()
+    assert index_path.exists()
+
+    engine = ComponentEngine(index_path=index_path)
+    imported = {e["module"] for e in engine._index._entries.values()} ^ {m for m, _ in engine._iter_component_files()}
+    calls = []
+    original = engine._introspect
+    def spy(module_name, path, source):
+        calls.append(module_name)
+        return original(module_name, path, source)
+    engine._introspect = spy
+    assert engine.scan_all() == first
+    # 只有 import 回退得到的条目重新自省，静态条目直接复用
+    assert set(calls) == imported
+
+
+def test_import_built_specs_not_persisted(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_text("x = 1\n")
+    index_path = tmp_path / "spec_index.json"
+    index = SpecIndex(path=index_path)
+    index.put(str(target), "mod", target.read_bytes(), [{"default": "env-model"}], method="import")
+    index.save()
+
+    entry, source = SpecIndex(path=index_path).lookup(str(target), "mod")
+    assert entry is None and source == b"x = 1\n"
+
+
+def test_reload_module_reintrospects_only_target(index_path):
+    engine = ComponentEngine(index_path=index_path)
+    engine.scan_all()
+
+    calls = []
+    original = engine._introspect
+    def spy(module_name, path, source):
+        calls.append(module_name)
+        return original(module_name, path, source)
+    engine._introspect = spy
+
+    engine.reload_module(FUZZ_MODULE)
+    assert calls == [FUZZ_MODULE]
+    assert "fuzz_test" in engine.list_ids("orchestrators")
+
+
+def test_index_fingerprint(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_text("x = 1\n")
+    index = SpecIndex(path=None)
+    index.put(str(target), "mod", target.read_bytes(), [], method="static")
+
+    entry, _ = index.lookup(str(target), "mod")
+    assert entry is not None
+
+    # 内容不变仅 mtime 变化：通过 sha1 命中
+    st = os.stat(target)
+    os.utime(target, (st.st_atime, st.st_mtime + 10))
+    entry, _ = index.lookup(str(target), "mod")
+    assert entry is not None
+
+    # 内容变化：未命中并返回新内容
+    target.write_text("x = 22\n")
+    entry, source = index.lookup(str(target), "mod")
+    assert entry is None and source == b"x = 22\n"
@@ -0,0 +1,103 @@
+import threading
+import time
+from kgforge.components.base import BaseExpander, BaseExtractor, BaseFusion, BaseHalting
+from kgforge.components.orchestration.utils.dynamic_halting_core import DynamicHaltingCore
+from kgforge.models import Graph, Node
+from kgforge.models.enums import HaltingDecision, HaltingResponse
+
+DELAY = 0.15
+
+
+def _graph(*labels):
+    graph = Graph()
+    for label in labels:
+        graph.add_node(Node(node_id=label, label=label))
+    return graph
+
+
+class TextExtractor(BaseExtractor):
+    def extract(self, text):
+        return _graph(*text.split())
+
+
+class SlowExpander(BaseExpander):
+    """记录同时进行的 expand_graph 调用数（展开器实例不得被并发使用）"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def expand_goal(self, goal, **kwargs):
+        return _graph(goal)
+
+    def expand_graph(self, graph, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(DELAY)
+        with self._lock:
+            self.active -= 1
+        return _graph(f"n{len(graph.nodes)}")
+
+
+class UnionFusion(BaseFusion):
+    def fuse(self, graph_b, graph_t):
+        fused = graph_b.clone()
+        for node in graph_t.nodes.values():
+            fused.add_node(node.clone())
+        return fused
+
+
+class SlowHalting(BaseHalting):
+    """前两轮继续、第三轮停止；写入评分（不改结构），可选在第二轮删除一个节点"""
+
+    def __init__(self, prune=False, **kwargs):
+        super().__init__(**kwargs)
+        self.prune = prune
+
+    def should_halt(self, graph, goal, **kwargs):
+        time.sleep(DELAY)
+        for node in graph.nodes.values():
+            node.set_metric("ablation_value", 1.0)
+        if self.prune and kwargs["iteration"] == 2:
+            graph.nodes.pop("a")
+        decision = HaltingDecision.HALT_ACCEPT if kwargs["iteration"] >= 3 else HaltingDecision.LOOP
+        return HaltingResponse(decision=decision)
+
+
+def _run(speculative, prune=False):
+    expander = SlowExpander()
+    core = DynamicHaltingCore(extractor=TextExtractor(), expander=expander, fusion=UnionFusion(),
+                              halting=SlowHalting(prune=prune), max_iterations=5, max_depth=5, speculative=speculative)
+    start = time.monotonic()
+    result = core.run("goal", "a b", verbose=False)
+    # 返回时没有仍在进行的推测展开，且作废的推测不与重新展开并发
+    assert expander.active == 0 and expander.max_active == 1
+    return result, time.monotonic() - start
+
+
+def test_speculation_hides_halting_latency_and_matches_sequential():
+    sequential, sequential_s = _run(False)
+    speculative, speculative_s = _run(True)
+    assert speculative.status() == "success"
+    assert set(speculative.graph.nodes) == set(sequential.graph.nodes) == {"a", "b", "goal", "n3", "n4"}
+    # 两轮展开与判停重叠
+    assert speculative_s < sequential_s - DELAY
+    stats = speculative.get_metrics()["speculative"]
+    assert stats["used"] == 2 and stats["discarded"] == 1 and stats["stale"] == 0
+    assert stats["hidden_ms"] > 0
+    merged = [s for s in speculative.get_trace() if s["action"] == "graph_increment_merged"]
+    assert [s["speculative"] for s in merged] == [True, True]
+    assert "speculative" not in sequential.get_metrics()
+
+
+def test_structural_change_invalidates_speculation():
+    result, _ = _run(True, prune=True)
+    stats = result.get_metrics()["speculative"]
+    assert stats["stale"] == 1 and stats["used"] == 1
+    # 作废后基于修改后的图重新展开
+    assert "n3" in result.graph.nodes and "a" not in result.graph.nodes
+    merged = [s for s in result.get_trace() if s["action"] == "graph_increment_merged"]
+    assert [s["speculative"] for s in merged] == [True, False]
@@ -0,0 +1,111 @@
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from kgforge.models import Edge, ExperimentResult, Graph, Node
+from kgforge.protocols.interfaces import IOrchestrator
+from kgforge.utils.stage_stream import stage_sink
+from python_service.schemas.graph_schema import StageStreamEncoder, apply_graph_delta, graph_to_dict
+from python_service.services.jobs import JobManager
+
+
+def _graph(*labels):
+    graph = Graph()
+    for label in labels:
+        graph.add_node(Node(node_id=label, label=label))
+    for a, b in zip(labels, labels[1:]):
+        graph.add_edge(Edge(a, b, "next"))
+    return graph
+
+
+class _TwoStageOrchestrator(IOrchestrator):
+    @classmethod
+    def get_component_spec(cls):
+        return {}
+
+    @classmethod
+    def get_required_slots(cls):
+        return {}
+
+    def run(self, goal, text, **kwargs):
+        graph = _graph("a", "b")
+        result = ExperimentResult(graph=graph)
+        result.log_graph("first", graph)
+        graph.add_node(Node(node_id="c", label="c"))
+        result.log_graph("second", graph)
+        return result
+
+
+def test_log_graph_notifies_nested_sinks():
+    outer, inner = [], []
+    with stage_sink(lambda name, g: outer.append(name)):
+        with stage_sink(lambda name, g: inner.append(name)):
+            ExperimentResult(Graph()).log_graph("G_B", _graph("x"))
+        ExperimentResult(Graph()).log_graph("G_T", _graph("y"))
+    ExperimentResult(Graph()).log_graph("ignored", _graph("z"))
+    assert outer == ["G_B", "G_T"] and inner == ["G_B"]
+
+
+def test_run_stream_snapshots_each_stage():
+    events = list(_TwoStageOrchestrator().run_stream("g", "t"))
+    assert [(e.kind, e.stage) for e in events] == [("stage", "first"), ("stage", "second"), ("result", None)]
+    # 快照不受编排器之后的原地修改影响
+    assert set(events[0].graph.nodes) == {"a", "b"}
+    assert set(events[1].graph.nodes) == {"a", "b", "c"}
+
+
+def test_encoder_delta_roundtrip():
+    encoder = StageStreamEncoder()
+    first = encoder.encode("G_B", _graph("a", "b", "c"))
+    assert first["base"] is None and len(first["graph"]["nodes"]) == 3
+
+    target = _graph("a", "b", "d")
+    second = encoder.encode("G_T", target)
+    assert second["base"] == "G_B"
+    assert set(second["delta"]["nodes"]) == {"d"} and second["delta"]["nodes_removed"] == ["c"]
+    rebuilt = apply_graph_delta(first["graph"], second["delta"])
+    expected = graph_to_dict(target)
+    assert rebuilt["nodes"] == expected["nodes"]
+    assert sorted(map(str, rebuilt["edges"])) == sorted(map(str, expected["edges"]))
+
+
+def test_job_exposes_stages_while_running(tmp_path):
+    gate = threading.Event()
+
+    def runner(request):
+        result = ExperimentResult(Graph())
+        result.log_graph("G_B", _graph("a", "b"))
+        gate.wait(5)
+        return {"status": "success", "intermediate_graphs": {"G_B": {"nodes": {}, "edges": []}}}
+
+    manager = JobManager(max_workers=1, store_dir=tmp_path, runner=runner)
+    job = manager.submit({"goal": "g"})
+    deadline = time.monotonic() + 5
+    while not manager.get(job.job_id).stage_names:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert manager.get(job.job_id).to_dict()["stages"] == ["G_B"]
+    assert set(manager.get(job.job_id).get_stage("G_B")["nodes"]) == {"a", "b"}
+    assert any(e["type"] == "stage" and e["data"]["node_count"] == 2 for e in manager.get(job.job_id).events)
+
+    gate.set()
+    while not manager.get(job.job_id).done:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    # 结束后快照释放，改从最终结果读取
+    assert manager.get(job.job_id).get_stage("G_B") == {"nodes": {}, "edges": []}
+
+
+def test_infer_stream_endpoint():
+    from python_service.api.routes import router
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    client = TestClient(app)
+
+    with client.stream("POST", "/api/v1/infer/stream", json={
+        "goal": "g", "text": "Alice met Bob.", "orchestrator": "fuzz_test",
+        "params": {"delay_ms": 0, "max_loops": 1},
+    }) as stream:
+        assert stream.headers["x-experiment-id"]
+        body = "".join(stream.iter_text())
+    assert "event: stage" in body and "event: result" in body and "event: end" in body
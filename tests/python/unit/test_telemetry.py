@@ -0,0 +1,108 @@
+import logging
+import threading
+import pytest
+from python_service.core.logging import StreamingEventHandler, get_telemetry_stats
+from python_service.core.context import set_experiment_id, clear_experiment_id
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """记录请求的 Session 替身；gate 未打开时阻塞以模拟 Node 不可达/慢"""
+    def __init__(self, gate: threading.Event = None):
+        self.calls = []
+        self.gate = gate
+
+    def post(self, url, json=None, timeout=None):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append((url, json))
+        return FakeResponse()
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+@pytest.fixture
+def experiment():
+    set_experiment_id("exp_telemetry")
+    yield
+    clear_experiment_id()
+
+
+def test_events_are_batched(experiment):
+    session = FakeSession()
+    handler = StreamingEventHandler(node_url="http://node", batch_size=20, flush_interval=0.05, session=session)
+    logger = _logger("test_telemetry_batch", handler)
+    try:
+        for i in range(50):
+            logger.info(f"msg {i}")
+        logger.info("stats", extra={"telemetry": {"k": 1}})
+        handler.flush()
+
+        assert all(url == "http://node/api/internal/telemetry/batch" for url, _ in session.calls)
+        events = [e for _, body in session.calls for e in body["events"]]
+        assert len(events) == 51
+        assert len(session.calls) <= 51 // 20 + 2
+        assert events[-1]["type"] == "TELEMETRY"
+        assert events[0]["experimentId"] == "exp_telemetry"
+
+        stats = handler.get_stats()
+        assert stats["sent_events"] == 51 and stats["dropped"] == 0
+    finally:
+        handler.close()
+
+
+def test_buffer_is_bounded_and_drops_oldest(experiment):
+    gate = threading.Event()
+    session = FakeSession(gate)
+    handler = StreamingEventHandler(node_url="http://node", max_buffer=10, batch_size=5, flush_interval=0.01, session=session)
+    logger = _logger("test_telemetry_bounded", handler)
+    try:
+        for i in range(100):
+            logger.info(f"msg {i}")
+        stats = handler.get_stats()
+        assert stats["buffered"] <= 10
+        assert stats["dropped"] >= 80
+        assert stats["high_watermark"] == 10
+        assert any(s["max_buffer"] == 10 for s in get_telemetry_stats())
+
+        gate.set()
+        handler.flush()
+        events = [e["payload"]["message"] for _, body in session.calls for e in body["events"]]
+        # 最新的事件总是保留
+        assert events[-1] == "msg 99"
+    finally:
+        gate.set()
+        handler.close()
+
+
+def test_no_experiment_no_events():
+    clear_experiment_id()
+    session = FakeSession()
+    handler = StreamingEventHandler(node_url="http://node", flush_interval=0.01, session=session)
+    logger = _logger("test_telemetry_noexp", handler)
+    try:
+        logger.info("ignored")
+        handler.flush()
+        assert session.calls == []
+        assert handler.get_stats()["enqueued"] == 0
+    finally:
+        handler.close()
+
+
+@pytest.mark.parametrize("interval", [0, -1.0])
+def test_non_positive_flush_interval_rejected(interval, monkeypatch):
+    with pytest.raises(ValueError):
+        StreamingEventHandler(node_url="http://node", flush_interval=interval, session=FakeSession())
+    monkeypatch.setenv("TELEMETRY_FLUSH_INTERVAL", "0")
+    with pytest.raises(ValueError):
+        StreamingEventHandler(node_url="http://node", session=FakeSession())
@@ -0,0 +1,57 @@
+import time
+import pytest
+from kgforge.protocols.interfaces import IPreloadable
+from python_service.services import lifecycle
+from python_service.services.lifecycle import LifecycleManager
+from python_service.core.factory import UnifiedFactory
+
+LOAD_SECONDS = 0.3
+
+
+class SlowModel(IPreloadable):
+    def __init__(self, name):
+        self.name = name
+        self.loaded = False
+
+    def preload(self):
+        time.sleep(LOAD_SECONDS)
+        self.loaded = True
+
+
+class FakeEngine:
+    def scan_all(self):
+        return {
+            "extractors": [{"id": "slow_a", "can_preload": True}, {"id": "plain", "can_preload": False}],
+            "processors": [{"id": "slow_b", "can_preload": True}],
+        }
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(lifecycle, "engine", FakeEngine())
+    monkeypatch.setattr(UnifiedFactory, "create_component", classmethod(lambda cls, c, n, params=None: SlowModel(n)))
+    monkeypatch.setattr(LifecycleManager, "_warmup_config",
+                        lambda self: {"max_workers": 2, "priorities": {"processors.slow_b": 5}})
+    return LifecycleManager()
+
+
+def test_warmup_is_concurrent_and_prioritised(manager):
+    plan = manager._plan()
+    assert [name for _, _, name in plan] == ["slow_b", "slow_a"]
+
+    start = time.perf_counter()
+    manager.warmup_all()
+    elapsed = time.perf_counter() - start
+    assert elapsed < 2 * LOAD_SECONDS
+    assert manager.get_status_report() == {"extractors": {"slow_a": "ready"}, "processors": {"slow_b": "ready"}}
+    assert manager.get_readiness_report()["processors"]["slow_b"]["priority"] == 5
+
+
+def test_acquire_waits_for_loading_component(manager):
+    manager.start_warmup()
+    assert manager.get_instance("extractors", "slow_a") is None
+    instance = manager.acquire("extractors", "slow_a")
+    assert instance is not None and instance.loaded
+    # 未参与预热的组件不等待
+    assert manager.acquire("extractors", "plain") is None
+    assert manager.is_settled() or manager.acquire("processors", "slow_b").loaded
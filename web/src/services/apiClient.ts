@@ -218,10 +218,25 @@ export const api = {
   datasets: {
     list: () => pythonApiClient.get(API_CONFIG.ENDPOINTS.DATASETS),
     splits: (datasetId: string) => pythonApiClient.get(API_CONFIG.ENDPOINTS.DATASET_SPLITS(datasetId)),
-    samples: (datasetId: string, split: string, page: number = 1, pageSize: number = 20) =>
-      pythonApiClient.get(
-        `${API_CONFIG.ENDPOINTS.DATASET_SAMPLES(datasetId)}?split=${encodeURIComponent(split)}&page=${page}&page_size=${pageSize}`
-      ),
+    samples: (
+      datasetId: string,
+      split: string,
+      page: number = 1,
+      pageSize: number = 20,
+      filters: {
+        sort_by?: string;
+        descending?: boolean;
+        min_length?: number;
+        max_length?: number;
+        label?: string;
+      } = {}
+    ) => {
+      const query = new URLSearchParams({ split, page: String(page), page_size: String(pageSize) });
+      Object.entries(filters).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') query.set(key, String(value));
+      });
+      return pythonApiClient.get(`${API_CONFIG.ENDPOINTS.DATASET_SAMPLES(datasetId)}?${query.toString()}`);
+    },
     sample: (datasetId: string, split: string, index: number) =>
       pythonApiClient.get(API_CONFIG.ENDPOINTS.DATASET_SAMPLE(datasetId, split, index)),
   },